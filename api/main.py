@@ -1,10 +1,19 @@
 from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import Any, Dict, Iterator, Optional
+import json
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+from app.fire_ensemble import ensemble_pool, simulate_ensemble
+from app.fire_spread import FireSpreadSimulator, FuelGrid
+from app.model_registry import lifespan, registry
+from app.risk_grid import DEFAULT_RESOLUTION, get_risk_grid, model_available
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -27,54 +36,184 @@ class GridCell(BaseModel):
     historicalFires: int
     environmentalFactors: EnvironmentalFactors
 
+
+class IgnitionPoint(BaseModel):
+    lat: float
+    lng: float
+
+
+MAX_DURATION_HOURS = 72
+
 class SimulationParams(BaseModel):
     windSpeed: float
     windDirection: float
     humidity: float
     temperature: float
-    duration: int
+    duration: int = Field(gt=0, le=MAX_DURATION_HOURS)  # hours
+    ignitionPoint: Optional[IgnitionPoint] = None
+    droughtIndex: float = 300
+    fuelMoisture: Optional[float] = None
+    gridSize: int = 1000
+
+
+class EnsembleParams(SimulationParams):
+    members: int = 50
+    seed: Optional[int] = None
+
+
+DEFAULT_IGNITION = IgnitionPoint(lat=39.8283, lng=-74.5411)
+MAX_GRID_SIZE = 2000
+MAX_ENSEMBLE_MEMBERS = 500
+
+
+def _simulation_weather(params: SimulationParams) -> dict:
+    weather = {
+        "temperature": params.temperature,
+        "humidity": params.humidity,
+        "wind_speed": params.windSpeed,
+        "wind_direction": params.windDirection,
+        "drought_index": params.droughtIndex,
+    }
+    if params.fuelMoisture is not None:
+        weather["fuel_moisture"] = params.fuelMoisture
+    return weather
+
+
+MOCK_RISK_DATA = {
+    "data": [
+        {
+            "lat": 39.8283,
+            "lng": -74.5411,
+            "riskScore": 0.75,
+            "historicalFires": 3,
+            "environmentalFactors": {
+                "vegetation": {
+                    "density": 0.8,
+                    "fuelType": "pine",
+                    "ndvi": 0.6
+                },
+                "terrain": {
+                    "elevation": 50,
+                    "slope": 5
+                },
+                "vegetationRisk": 0.7
+            }
+        }
+    ]
+}
+
 
 @app.get("/api/risk-data")
-async def get_risk_data():
-    # Mock data - replace with actual data processing
+async def get_risk_data(resolution: float = DEFAULT_RESOLUTION,
+                        validTime: Optional[datetime] = None,
+                        limit: int = 500):
+    predictor = await run_in_threadpool(registry.get_predictor)
+    if not model_available(predictor):
+        # No trained model deployed yet: keep serving the sample cell
+        return MOCK_RISK_DATA
+    try:
+        grid = await run_in_threadpool(get_risk_grid, predictor, resolution, validTime)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # JSONResponse skips FastAPI's per-item encoding of the score grid
+    return JSONResponse({
+        "data": grid.top_cells(limit)
+                    .round({"lat": 6, "lng": 6, "riskScore": 3})
+                    .to_dict("records"),
+        "grid": grid.to_dict()
+    })
+
+
+def _stream_simulation(simulator: FireSpreadSimulator, ignition: IgnitionPoint,
+                       weather: dict, duration: int) -> Iterator[str]:
+    """Yield one NDJSON line per time step with only the newly ignited cells."""
+    grid = simulator.grid
+    yield json.dumps({
+        "type": "start",
+        "ignitionPoint": ignition.model_dump(),
+        "bounds": grid.bounds,
+        "shape": list(grid.shape),
+        "timeSteps": duration
+    }) + "\n"
+    burned_cells = 0
+    for step in simulator.iter_steps((ignition.lat, ignition.lng), weather, duration):
+        burned_cells += len(step.rows)
+        payload = step.to_dict(grid)
+        payload["burnedAreaAcres"] = burned_cells * grid.cell_area_acres
+        yield json.dumps(payload) + "\n"
+    yield json.dumps({"type": "complete",
+                      "burnedAreaAcres": burned_cells * grid.cell_area_acres}) + "\n"
+
+
+def _simulator(grid_size: int) -> FireSpreadSimulator:
+    return FireSpreadSimulator(FuelGrid.pinelands((grid_size, grid_size)))
+
+
+def _simulation_summary(simulator: FireSpreadSimulator, ignition: IgnitionPoint,
+                        weather: dict, duration: int) -> Dict[str, Any]:
+    """Run the whole simulation and summarize it; CPU-bound, so called in the threadpool."""
+    result = simulator.simulate((ignition.lat, ignition.lng), weather, duration)
     return {
-        "data": [
-            {
-                "lat": 39.8283,
-                "lng": -74.5411,
-                "riskScore": 0.75,
-                "historicalFires": 3,
-                "environmentalFactors": {
-                    "vegetation": {
-                        "density": 0.8,
-                        "fuelType": "pine",
-                        "ndvi": 0.6
-                    },
-                    "terrain": {
-                        "elevation": 50,
-                        "slope": 5
-                    },
-                    "vegetationRisk": 0.7
-                }
-            }
-        ]
+        "success": True,
+        "ignitionPoint": ignition.model_dump(),
+        "timeSteps": result.n_steps,
+        "burnedAreaAcres": result.burned_area_acres(),
+        "isochrones": result.isochrones()
     }
 
 @app.post("/api/simulate-fire")
-async def simulate_fire(params: SimulationParams):
+async def simulate_fire(params: SimulationParams, stream: bool = False):
+    if not 0 < params.gridSize <= MAX_GRID_SIZE:
+        raise HTTPException(status_code=400,
+                            detail=f"gridSize must be between 1 and {MAX_GRID_SIZE}")
+    ignition = params.ignitionPoint or DEFAULT_IGNITION
+    weather = _simulation_weather(params)
+    try:
+        simulator = await run_in_threadpool(_simulator, params.gridSize)
+        if stream:
+            # Validate the ignition point before the response starts streaming
+            simulator.grid.cell_index(ignition.lat, ignition.lng)
+            return StreamingResponse(
+                _stream_simulation(simulator, ignition, weather, params.duration),
+                media_type="application/x-ndjson"
+            )
+        return await run_in_threadpool(_simulation_summary, simulator, ignition, weather,
+                                       params.duration)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/simulate-fire/ensemble")
+async def simulate_fire_ensemble(params: EnsembleParams):
+    if not 0 < params.gridSize <= MAX_GRID_SIZE:
+        raise HTTPException(status_code=400,
+                            detail=f"gridSize must be between 1 and {MAX_GRID_SIZE}")
+    if not 0 < params.members <= MAX_ENSEMBLE_MEMBERS:
+        raise HTTPException(status_code=400,
+                            detail=f"members must be between 1 and {MAX_ENSEMBLE_MEMBERS}")
+    ignition = params.ignitionPoint or DEFAULT_IGNITION
     try:
-        # Mock simulation - replace with actual fire spread simulation
+        result = await run_in_threadpool(
+            simulate_ensemble,
+            FuelGrid.pinelands((params.gridSize, params.gridSize)),
+            (ignition.lat, ignition.lng),
+            _simulation_weather(params),
+            params.duration,
+            n_members=params.members,
+            seed=params.seed,
+            pool=ensemble_pool
+        )
         return {
             "success": True,
-            "prediction": [
-                {
-                    "lat": 39.8283,
-                    "lng": -74.5411,
-                    "intensity": 0.8,
-                    "timeStep": 1
-                }
-            ]
+            "ignitionPoint": ignition.model_dump(),
+            "members": result.n_members,
+            "burnedAreaAcres": result.area_percentiles(),
+            "burnProbability": result.probability_contours()
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
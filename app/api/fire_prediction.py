@@ -1,20 +1,15 @@
-from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any
 
-import pandas as pd
-import geopandas as gpd
-import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from lightgbm import LGBMClassifier
-from catboost import CatBoostClassifier
 from sklearn.metrics import classification_report
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 
-from app.data_processing.data_loader import DataLoader
+from app.data_processing.data_loader import SourceUnavailable
+from app.fire_window import JobQueueFull, fire_window_dataset_async, job_manager
+from app.model_registry import FIRE_WINDOW_FEATURES, registry
 
 router = APIRouter(prefix="/api/v1")
 
@@ -26,48 +21,70 @@ class PredictionRequest(BaseModel):
 class PredictionResponse(BaseModel):
     reports: Dict[str, Any]
 
+
+def _check_window(req: PredictionRequest) -> None:
+    if req.end_date.date() < req.start_date.date():
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date.")
+
+
+def _score_window(models: Dict[str, Any], df) -> Dict[str, Any]:
+    """Classification report of each pre-trained model on the window (CPU-bound)"""
+    X = df[FIRE_WINDOW_FEATURES]
+    y = df["label"]
+    return {
+        name: classification_report(y, model.predict(X), output_dict=True, zero_division=0)
+        for name, model in models.items()
+    }
+
 @router.post("/predict_fire_window", response_model=PredictionResponse)
 async def predict_fire_window(req: PredictionRequest):
-    # Load region boundary shapefile
-    boundary_path = Path("pinelands/pinelands.shp")
-    if not boundary_path.exists():
-        raise HTTPException(status_code=500, detail=f"Boundary shapefile not found at {boundary_path}")
-    boundary = gpd.read_file(boundary_path).to_crs("EPSG:4326")
-
-    # Instantiate loader and load historical fires
-    dl = DataLoader(Path("data"))
-    fires_gdf = dl._download_fire_history(boundary, req.start_date.year - 1, req.end_date.year)
-
-    # Generate features and labels
-    dates = pd.date_range(req.start_date, req.end_date, freq="D")
-    rows = []
-    fire_dates = fires_gdf["discovery_date"].dt.date
-    for date in dates:
-        env = dl.load_environmental_data(tuple(boundary.total_bounds), date, date)
-        tavg = env["TAVG"].mean() if not env.empty else np.nan
-        rhav = env["RHAV"].mean() if not env.empty else np.nan
-        awnd = env["AWND"].mean() if not env.empty else np.nan
-        next_date = date + timedelta(days=req.label_window)
-        fire_flag = int(any(fd >= date.date() and fd < next_date.date() for fd in fire_dates))
-        rows.append({"date": date, "TAVG": tavg, "RHAV": rhav, "AWND": awnd, "label": fire_flag})
-
-    df = pd.DataFrame(rows).dropna()
-    if df["label"].nunique() < 2:
-        raise HTTPException(status_code=400, detail="Not enough class variation for given window.")
-
-    X = df[["TAVG", "RHAV", "AWND"]]
-    y = df["label"]
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+    # Boundary, loader and trained models are shared through the model registry; the
+    # first use of each may load it from disk, so they are fetched in the threadpool
+    boundary = await run_in_threadpool(registry.get_boundary)
+    if boundary is None:
+        raise HTTPException(status_code=500,
+                            detail=registry.errors.get("boundary", "Boundary not loaded"))
+    models = await run_in_threadpool(registry.get_fire_window_models)
+    if not models:
+        raise HTTPException(
+            status_code=503,
+            detail=(f"No trained fire-window models in {registry.fire_window_model_dir}; "
+                    "run run_predictive_models.py")
+        )
+
+    _check_window(req)
+
+    # Historical fires and one bulk weather fetch for the whole window, loaded concurrently
+    dl = await run_in_threadpool(registry.get_data_loader)
+    try:
+        df = await fire_window_dataset_async(dl, boundary, req.start_date, req.end_date,
+                                             req.label_window)
+    except SourceUnavailable as e:
+        raise HTTPException(status_code=503, detail=f"Data source unavailable: {e}")
+    if df.empty:
+        raise HTTPException(status_code=400, detail="No environmental data for given window.")
+
+    # Inference only: score the window with the pre-trained models
+    return {"reports": await run_in_threadpool(_score_window, models, df)}
+
+
+@router.post("/fire_window_jobs", status_code=202)
+async def submit_fire_window_job(req: PredictionRequest):
+    """Queue background training of the fire-window models on a date window"""
+    _check_window(req)
+    try:
+        job = await run_in_threadpool(job_manager.submit, req.start_date, req.end_date,
+                                      req.label_window)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return job.to_dict()
 
-    models = {
-        "RandomForest": RandomForestClassifier(n_estimators=100, random_state=42),
-        "LightGBM": LGBMClassifier(random_state=42),
-        "CatBoost": CatBoostClassifier(verbose=0, random_state=42),
-    }
-    reports = {}
-    for name, model in models.items():
-        model.fit(X_train, y_train)
-        preds = model.predict(X_test)
-        reports[name] = classification_report(y_test, preds, output_dict=True)
 
-    return {"reports": reports}
+@router.get("/fire_window_jobs/{job_id}")
+async def get_fire_window_job(job_id: str):
+    """Status of a training job, with its classification reports once completed"""
+    # May wait for a finished job's models to be promoted
+    job = await run_in_threadpool(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown fire-window job {job_id}")
+    return job.to_dict()
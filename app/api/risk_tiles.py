@@ -0,0 +1,40 @@
+"""XYZ risk map tile endpoint."""
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
+
+from ..config import TILE_CACHE_DIR
+from ..model_registry import registry
+from ..risk_grid import RiskGrid, get_risk_grid, model_available
+from ..risk_tiles import MAX_ZOOM, TileCache, render_tile
+
+router = APIRouter()
+
+# Tiles are cached per prediction run; a new run invalidates them
+tile_cache = TileCache(TILE_CACHE_DIR / 'risk')
+
+
+def _cached_tile(grid: RiskGrid, z: int, x: int, y: int) -> bytes:
+    """The tile from the cache, rendered and stored on a miss (blocking: disk I/O)."""
+    tile_cache.ensure_run(grid.run_id)
+    png = tile_cache.get(z, x, y)
+    if png is None:
+        png = render_tile(grid, z, x, y)
+        tile_cache.put(z, x, y, png)
+    return png
+
+
+@router.get("/tiles/risk/{z}/{x}/{y}.png")
+async def get_risk_tile(z: int, x: int, y: int) -> Response:
+    """Web-mercator PNG tile of the current risk grid."""
+    if not 0 <= z <= MAX_ZOOM or not (0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile not found")
+    predictor = await run_in_threadpool(registry.get_predictor)
+    if not model_available(predictor):
+        raise HTTPException(status_code=503, detail="Risk model not available")
+    grid = await run_in_threadpool(get_risk_grid, predictor)
+    png = await run_in_threadpool(_cached_tile, grid, z, x, y)
+    return Response(
+        content=png,
+        media_type="image/png",
+        headers={"Cache-Control": "public, max-age=300", "ETag": f'"{grid.run_id}-{z}-{x}-{y}"'}
+    )
@@ -1,4 +1,5 @@
 from dotenv import load_dotenv
+from pathlib import Path
 import os
 
 # Load environment variables
@@ -7,6 +8,49 @@ load_dotenv()
 # API Keys
 VISUAL_CROSSING_API_KEY = os.getenv('VISUAL_CROSSING_API_KEY', 'YOUR_API_KEY')
 
+# Data and trained model locations
+DATA_DIR = Path(os.getenv('DATA_DIR', 'data'))
+BOUNDARY_PATH = Path(os.getenv('BOUNDARY_PATH', 'pinelands/pinelands.shp'))
+RISK_MODEL_PATH = Path(os.getenv('RISK_MODEL_PATH', 'models/wildfire_predictor.pkl'))
+FIRE_WINDOW_MODEL_DIR = Path(os.getenv('FIRE_WINDOW_MODEL_DIR', 'models/fire_window'))
+
+# National FPA-FOD fire occurrence archive. Downloads are always test-read as zip
+# archives; set FPA_FOD_SHA256 to also check them against a known digest
+FPA_FOD_URL = os.getenv(
+    'FPA_FOD_URL',
+    'https://www.fs.usda.gov/rds/archive/products/RDS-2013-0009.4/FPA_FOD_20170508.zip')
+FPA_FOD_SHA256 = os.getenv('FPA_FOD_SHA256') or None
+
+# Background fire-window training jobs: artifact store, worker processes and queue bound
+FIRE_WINDOW_JOB_DIR = Path(os.getenv('FIRE_WINDOW_JOB_DIR', 'models/fire_window_jobs'))
+FIRE_WINDOW_JOB_WORKERS = int(os.getenv('FIRE_WINDOW_JOB_WORKERS', '2'))
+FIRE_WINDOW_MAX_PENDING_JOBS = int(os.getenv('FIRE_WINDOW_MAX_PENDING_JOBS', '8'))
+
+# Worker processes shared by all fire-spread ensemble requests (0: the CPU count)
+ENSEMBLE_WORKERS = int(os.getenv('ENSEMBLE_WORKERS', '0'))
+
+# Seconds each data source (weather, traffic, buildings, ...) may take in a concurrent load
+DATA_SOURCE_TIMEOUT = float(os.getenv('DATA_SOURCE_TIMEOUT', '30'))
+
+# Furthest (in days) a catalogued satellite scene may be from the requested date
+SATELLITE_MAX_DAYS = int(os.getenv('SATELLITE_MAX_DAYS', '16'))
+
+# Seconds between rescans of the raw imagery directory for scenes added by hand
+SCENE_RESCAN_SECONDS = float(os.getenv('SCENE_RESCAN_SECONDS', '300'))
+
+# Cores the ensemble model may use in total (0: all available) and how its members
+# run side by side: 'serial', 'thread' or 'process'
+ML_N_JOBS = int(os.getenv('ML_N_JOBS', '0'))
+ML_EXECUTION = os.getenv('ML_EXECUTION', 'thread')
+
+# Optuna studies of the ensemble model's members ('' keeps them in memory) and the
+# pruner that stops poor trials between CV folds: 'median', 'hyperband' or 'none'
+OPTUNA_STORAGE = os.getenv('OPTUNA_STORAGE', 'models/optuna.sqlite')
+OPTUNA_PRUNER = os.getenv('OPTUNA_PRUNER', 'median')
+
+# On-disk cache of rendered map tiles
+TILE_CACHE_DIR = Path(os.getenv('TILE_CACHE_DIR', 'data/tiles'))
+
 # Pine Barrens Region Configuration
 PINE_BARRENS = {
     'center': [39.8, -74.5],  # Latitude, Longitude
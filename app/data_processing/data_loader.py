@@ -1,16 +1,87 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-import os
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import pandas as pd
 import geopandas as gpd
 import numpy as np
-import rasterio
-from rasterio.mask import mask
-from shapely.geometry import box
-import requests
-import zipfile
 from datetime import datetime, timedelta
 
+from ..config import (
+    DATA_SOURCE_TIMEOUT,
+    FPA_FOD_SHA256,
+    FPA_FOD_URL,
+    SATELLITE_MAX_DAYS,
+    SCENE_RESCAN_SECONDS,
+)
+from ..logger import logger
+from .downloader import download_file, extract_member
+from .fire_history_cache import FireHistoryCache, region_key
+from .fire_store import FireOccurrenceStore
+from .imagery import read_window, write_cog
+from .land_use import ensure_flatgeobuf, land_use_layer
+from .noaa import NoaaWeatherStore, daily_frame
+from .scene_catalog import SceneCatalog
+
+
+class SourceUnavailable(RuntimeError):
+    """Raised when a data source a caller cannot do without failed or timed out."""
+
+
+# Shared by every event loop; unlike the loop's default executor, asyncio.run does not
+# wait on it at shutdown, so a source abandoned after its timeout cannot stall the caller
+_source_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix='data-source')
+
+
+async def run_blocking(fn: Callable[..., Any], *args) -> Any:
+    """Await a blocking loader on a worker thread, keeping the event loop free."""
+    return await asyncio.get_running_loop().run_in_executor(_source_pool, partial(fn, *args))
+
+
+async def load_sources(loader: Any,
+                       calls: Dict[str, Tuple[str, tuple]],
+                       timeouts: Optional[Dict[str, float]] = None,
+                       default_timeout: float = DATA_SOURCE_TIMEOUT
+                       ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Load ``{name: (method, args)}`` from ``loader`` concurrently, each under its own timeout.
+
+    A method's ``<method>_async`` counterpart is awaited when the loader defines one;
+    otherwise the blocking method runs in a worker thread. The whole load takes about as
+    long as the slowest source rather than the sum of them. Returns ``(results, errors)``:
+    a source that raised or timed out maps to None, with the reason kept in ``errors``.
+    A timed-out thread is not interrupted; its result is simply discarded.
+    """
+    timeouts = timeouts or {}
+
+    async def load(method: str, args: tuple) -> Any:
+        native = getattr(loader, f'{method}_async', None)
+        if asyncio.iscoroutinefunction(native):
+            return await native(*args)
+        return await run_blocking(getattr(loader, method), *args)
+
+    names = list(calls)
+    limits = [timeouts.get(name, default_timeout) for name in names]
+    outcomes = await asyncio.gather(
+        *(asyncio.wait_for(load(*calls[name]), limit) for name, limit in zip(names, limits)),
+        return_exceptions=True
+    )
+    results, errors = {}, {}
+    for name, limit, outcome in zip(names, limits, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[name] = f"timed out after {limit:g}s"
+        elif isinstance(outcome, Exception):
+            errors[name] = f"{type(outcome).__name__}: {outcome}"
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results[name] = outcome
+            continue
+        logger.warning(f"Data source {name} unavailable: {errors[name]}")
+        results[name] = None
+    return results, errors
+
+
 class DataLoader:
     """Handles loading and preprocessing of various data sources"""
     
@@ -23,31 +94,40 @@ class DataLoader:
         # Create directories if they don't exist
         for dir_path in [self.raw_dir, self.processed_dir, self.geo_dir]:
             dir_path.mkdir(parents=True, exist_ok=True)
+
+        # Daily NOAA records per bounding box, partitioned by month
+        self.weather_store = NoaaWeatherStore(self.processed_dir / 'noaa')
+
+        # Region-filtered fire history, reused across calls and processes
+        self.fire_cache = FireHistoryCache(self.processed_dir / 'fire_history_cache')
+
+        # Footprint/date index of the satellite scenes in raw_dir
+        self.scene_catalog = SceneCatalog(self.processed_dir / 'scenes.sqlite')
     
     def load_environmental_data(self,
                               bbox: Tuple[float, float, float, float],
                               start_date: datetime,
                               end_date: datetime) -> pd.DataFrame:
         """Load environmental data from NOAA API"""
-        base_url = "https://www.ncdc.noaa.gov/cdo-web/api/v2/data"
-        params = {
-            "datasetid": "GHCND",
-            "locationid": f"BBOX:{bbox[0]},{bbox[1]},{bbox[2]},{bbox[3]}",
-            "startdate": start_date.strftime("%Y-%m-%d"),
-            "enddate": end_date.strftime("%Y-%m-%d"),
-            "units": "metric"
-        }
-        headers = {"token": os.getenv("NOAA_API_KEY")}
-        # Attempt NOAA API fetch
-        try:
-            resp = requests.get(base_url, params=params, headers=headers)
-            data = resp.json()
-            results = data.get("results")
-        except Exception:
-            results = None
-        if results:
-            df = pd.DataFrame(results)
-            df["date"] = pd.to_datetime(df["date"])
+        # Only days not already in the local store are requested, in concurrent windows
+        records = self.weather_store.fetch(tuple(bbox), start_date, end_date)
+        return self._environmental_frame(records, start_date, end_date)
+
+    async def load_environmental_data_async(self,
+                                            bbox: Tuple[float, float, float, float],
+                                            start_date: datetime,
+                                            end_date: datetime) -> pd.DataFrame:
+        """Async counterpart of load_environmental_data, for use inside an event loop"""
+        records = await self.weather_store.fetch_async(tuple(bbox), start_date, end_date)
+        return self._environmental_frame(records, start_date, end_date)
+
+    def _environmental_frame(self,
+                             records: pd.DataFrame,
+                             start_date: datetime,
+                             end_date: datetime) -> pd.DataFrame:
+        """Daily observations, or synthetic data when NOAA returned nothing"""
+        df = daily_frame(records)
+        if not df.empty:
             return df
         # Fallback deterministic synthetic data
         dates = pd.date_range(start_date, end_date, freq="D")
@@ -65,41 +145,97 @@ class DataLoader:
         """Alias for load_environmental_data"""
         return self.load_environmental_data(*args, **kwargs)
 
+    async def load_weather_data_async(self, *args, **kwargs) -> Any:
+        """Alias for load_environmental_data_async"""
+        return await self.load_environmental_data_async(*args, **kwargs)
+
+    def load_traffic_data(self, region: gpd.GeoDataFrame, date: datetime) -> gpd.GeoDataFrame:
+        """Road segments with congestion risk in the region, for the given day when dated"""
+        traffic = self._load_layer('traffic', region, ['congestion_risk'])
+        if 'date' in traffic.columns:
+            day = pd.Timestamp(date).normalize()
+            traffic = traffic[pd.to_datetime(traffic['date']).dt.normalize() == day]
+        return traffic
+
+    def load_buildings(self, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Building footprints in the region"""
+        return self._load_layer('buildings', region)
+
+    def load_camping_sites(self, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Campgrounds and camping areas in the region"""
+        return self._load_layer('camping_sites', region)
+
+    async def load_traffic_data_async(self, region: gpd.GeoDataFrame,
+                                      date: datetime) -> gpd.GeoDataFrame:
+        return await run_blocking(self.load_traffic_data, region, date)
+
+    async def load_buildings_async(self, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        return await run_blocking(self.load_buildings, region)
+
+    async def load_camping_sites_async(self, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        return await run_blocking(self.load_camping_sites, region)
+
+    def _load_layer(self,
+                    name: str,
+                    region: gpd.GeoDataFrame,
+                    columns: Optional[List[str]] = None) -> gpd.GeoDataFrame:
+        """Features of ``geo/<name>.geojson`` intersecting the region (empty if it is absent)"""
+        path = self.geo_dir / f'{name}.geojson'
+        if not path.exists():
+            # Placeholder - no public feed is wired up for this layer yet
+            return gpd.GeoDataFrame(columns=(columns or []) + ['geometry'], geometry='geometry',
+                                    crs=region.crs)
+        layer = gpd.read_file(path)
+        if region.crs is not None and layer.crs is not None:
+            region = region.to_crs(layer.crs)
+        return layer[layer.intersects(region.unary_union)]
+
     def load_land_use_data(self, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         """Load land use data from local files or NLCD"""
         land_use_path = self.geo_dir / 'land_use.geojson'
         
-        if land_use_path.exists():
-            land_use = gpd.read_file(land_use_path)
-        else:
+        if not land_use_path.exists():
             # Download from NLCD (National Land Cover Database)
             # This is a placeholder - actual implementation would use NLCD API
             land_use = self._download_nlcd_data(region)
             land_use.to_file(land_use_path, driver='GeoJSON')
         
-        return gpd.sjoin(land_use, region, how='inner', predicate='intersects')
+        # Parsed once per process from a FlatGeobuf copy; a query is an STRtree probe
+        return land_use_layer(ensure_flatgeobuf(land_use_path)).clip(region)
     
     def load_satellite_imagery(self,
                              bbox: Tuple[float, float, float, float],
-                             date: datetime) -> np.ndarray:
-        """Load satellite imagery for the specified region and date"""
+                             date: datetime,
+                             resolution: Optional[float] = None) -> np.ndarray:
+        """Load satellite imagery for the specified region and date
+
+        ``resolution`` is the wanted pixel size in the scene's CRS units; coarser requests
+        are served from the scene's overviews instead of its full-resolution pixels.
+        """
         # Create a filename based on bbox and date
         filename = f"satellite_{date.strftime('%Y%m%d')}_{bbox[0]}_{bbox[1]}_{bbox[2]}_{bbox[3]}.tif"
         image_path = self.raw_dir / filename
-        
-        if image_path.exists():
-            with rasterio.open(image_path) as src:
-                return src.read()
-        else:
+
+        # Scans convert new scenes (including ones saved before COGs were written here)
+        # to COGs as they are catalogued, so none is rewritten for a request
+        self.scene_catalog.refresh(self.raw_dir, SCENE_RESCAN_SECONDS)
+        if not image_path.exists():
+            # Any catalogued scene (or mosaic of scenes) covering the bbox near the date will do
+            found = self.scene_catalog.mosaic(bbox, date, resolution, max_days=SATELLITE_MAX_DAYS)
+            if found is not None:
+                return found[0]
+
             # Download new imagery
             # This is a placeholder - actual implementation would use specific satellite API
             imagery = self._download_satellite_imagery(bbox, date)
             
-            # Save to file
-            with rasterio.open(image_path, 'w', **imagery['profile']) as dst:
-                dst.write(imagery['data'])
-            
-            return imagery['data']
+            # Save as a Cloud-Optimized GeoTIFF: tiled, with overviews
+            write_cog(image_path, imagery['data'], imagery['profile'])
+            self.scene_catalog.add(image_path, date.date() if isinstance(date, datetime) else date)
+
+        # Only the tiles of the matching pyramid level that cover the bbox are read
+        data, _ = read_window(image_path, bbox, resolution=resolution)
+        return data
 
     def load_satellite_data(self, *args, **kwargs) -> Any:
         """Alias for load_satellite_imagery"""
@@ -111,6 +247,12 @@ class DataLoader:
                             end_year: int) -> gpd.GeoDataFrame:
         """Load historical fire data for the specified region and time period"""
         fire_history_path = self.geo_dir / 'fire_history.geojson'
+        self.fire_cache.ensure_source(self.raw_dir / 'fire_occurrence.csv')
+        source_mtime = fire_history_path.stat().st_mtime_ns if fire_history_path.exists() else None
+        key = region_key(region, 'historical_fires', start_year, end_year, source_mtime)
+        cached = self.fire_cache.get(key)
+        if cached is not None:
+            return cached
         
         if fire_history_path.exists():
             fire_history = gpd.read_file(fire_history_path)
@@ -120,7 +262,9 @@ class DataLoader:
             fire_history = self._download_fire_history(region, start_year, end_year)
             fire_history.to_file(fire_history_path, driver='GeoJSON')
         
-        return gpd.sjoin(fire_history, region, how='inner', predicate='intersects')
+        result = gpd.sjoin(fire_history, region, how='inner', predicate='intersects')
+        self.fire_cache.put(key, result)
+        return result
     
     def prepare_model_features(self,
                              region: gpd.GeoDataFrame,
@@ -154,6 +298,57 @@ class DataLoader:
         }
         features = pd.DataFrame([data])
         return features
+
+    def prepare_model_features_batch(self,
+                                     regions: gpd.GeoDataFrame,
+                                     date: datetime) -> pd.DataFrame:
+        """Feature rows for many regions at once, indexed like ``regions``
+
+        Each source is loaded once for the regions' union and the per-region aggregates
+        come from spatial joins and groupbys. NOAA daily records carry no station
+        coordinates, so every region gets the weather of the union's bounding box.
+        """
+        cells = gpd.GeoDataFrame({'region': np.arange(len(regions))},
+                                 geometry=regions.geometry.values, crs=regions.crs)
+        union = gpd.GeoDataFrame(geometry=[cells.unary_union], crs=cells.crs)
+
+        # One weather fetch over the union's bounding box
+        env_data = self.load_environmental_data(union.total_bounds, date - timedelta(days=30), date)
+
+        # Land use: most common landcover per region (smallest code on ties, like Series.mode)
+        land_use = self._join_regions(self.load_land_use_data(union), cells)
+        counts = land_use.groupby(['region', 'landcover']).size().rename('n').reset_index()
+        counts = counts.sort_values(['region', 'n', 'landcover'], ascending=[True, False, True])
+        vegetation = counts.drop_duplicates('region').set_index('region')['landcover']
+
+        # Historical fires: count and most recent date per region
+        fires = self._join_regions(
+            self.load_historical_fires(union, date.year - 10, date.year), cells)
+        fire_dates = pd.DataFrame({'region': fires['region'].values,
+                                   'date': pd.to_datetime(fires['date']).values})
+        fire_count = fire_dates.groupby('region').size()
+        last_fire = fire_dates.groupby('region')['date'].max()
+
+        positions = pd.RangeIndex(len(regions))
+        features = pd.DataFrame({
+            'temperature': env_data['TAVG'].mean(),
+            'humidity': env_data['RHAV'].mean(),
+            'wind_speed': env_data['AWND'].mean(),
+            'vegetation_type': vegetation.reindex(positions).values,
+            'historical_fire_count': fire_count.reindex(positions, fill_value=0).values,
+            'days_since_last_fire': (pd.Timestamp(date) - last_fire.reindex(positions)).dt.days
+                                    .fillna(9999).astype(int).values
+        }, index=regions.index)
+        return features
+
+    @staticmethod
+    def _join_regions(layer: gpd.GeoDataFrame, cells: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Rows of ``layer`` tagged with the ``region`` of every cell they intersect"""
+        layer = layer.drop(columns=[c for c in ('index_left', 'index_right', 'region')
+                                    if c in layer.columns])
+        if layer.crs is not None and cells.crs is not None and layer.crs != cells.crs:
+            layer = layer.to_crs(cells.crs)
+        return gpd.sjoin(layer, cells, how='inner', predicate='intersects')
     
     def _download_nlcd_data(self, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
         """Download land cover data from NLCD"""
@@ -167,57 +362,51 @@ class DataLoader:
         # Placeholder - implement actual satellite imagery API interaction
         pass
     
+    def _fire_occurrence_csv(self) -> Path:
+        """Path of the national fire occurrence CSV, downloading it if missing."""
+        file = self.raw_dir / 'fire_occurrence.csv'
+        # If missing, download the national Interagency Fire Occurrence dataset
+        if not file.exists():
+            # Segmented and resumable; an interrupted download picks up where it stopped
+            zip_path = download_file(FPA_FOD_URL, self.raw_dir / 'FPA_FOD_20170508.zip',
+                                     sha256=FPA_FOD_SHA256, check_zip=True)
+            # Stream the CSV out of the archive to fire_occurrence.csv
+            extract_member(zip_path, '.csv', file)
+            zip_path.unlink()
+        return file
+
+    def fire_store(self) -> FireOccurrenceStore:
+        """Columnar fire occurrence store, converted from the CSV on first use."""
+        store = FireOccurrenceStore(self._fire_occurrence_csv(),
+                                    self.processed_dir / 'fire_occurrence')
+        return store.ensure()
+
     def _download_fire_history(self,
                              region: gpd.GeoDataFrame,
                              start_year: int,
                              end_year: int) -> gpd.GeoDataFrame:
         """Download historical fire data"""
-        file = self.raw_dir / 'fire_occurrence.csv'
-        # If missing, download the national Interagency Fire Occurrence dataset
-        if not file.exists():
-            url = 'https://www.fs.usda.gov/rds/archive/products/RDS-2013-0009.4/FPA_FOD_20170508.zip'
-            # Download the zipped dataset
-            resp = requests.get(url, stream=True)
-            resp.raise_for_status()
-            zip_path = self.raw_dir / 'FPA_FOD_20170508.zip'
-            with open(zip_path, 'wb') as zf:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    zf.write(chunk)
-            # Extract CSV and rename to fire_occurrence.csv
-            with zipfile.ZipFile(zip_path, 'r') as zf:
-                csv_file = next((n for n in zf.namelist() if n.endswith('.csv')), None)
-                if csv_file:
-                    zf.extract(csv_file, path=self.raw_dir)
-                    (self.raw_dir / csv_file).rename(file)
-            zip_path.unlink()
-        # Read full dataset
-        df = pd.read_csv(file)
-        # Drop invalid coordinates
-        df = df.dropna(subset=['LATITUDE', 'LONGITUDE'])
-        # Parse dates
-        df['discovery_date'] = pd.to_datetime(df.get('DISCOVERY_DATE', df.get('discovery_date')), errors='coerce')
-        df['containment_date'] = pd.to_datetime(df.get('CONTAINMENT_DATE', df.get('containment_date')), errors='coerce')
-        # Filter by year window
-        df = df[(df['discovery_date'].dt.year >= start_year) & (df['discovery_date'].dt.year <= end_year)]
-        # Remove coordinate outliers
-        df = df[~((df['LATITUDE'] == 0) & (df['LONGITUDE'] == 0))]
-        # Deduplicate by FOD_ID if present
-        if 'FOD_ID' in df.columns:
-            df = df.drop_duplicates(subset=['FOD_ID'])
-        # Prune to needed fields
-        fields = ['FOD_ID', 'LATITUDE', 'LONGITUDE', 'discovery_date', 'containment_date']
-        fields = [f for f in fields if f in df.columns]
-        df = df[fields]
-        # Convert to GeoDataFrame
+        self.fire_cache.ensure_source(self._fire_occurrence_csv())
+        key = region_key(region, 'fire_history', start_year, end_year)
+        cached = self.fire_cache.get(key)
+        if cached is not None:
+            return cached
+        region = region.to_crs('EPSG:4326')
+        # Read only the year partitions and row groups overlapping the region's bounds
+        df = self.fire_store().query(tuple(region.total_bounds), start_year, end_year)
+        gdf = self._fires_in_region(df, region)
+        # Write out CSV for spot-checking
+        out_csv = self.processed_dir / 'cleaned_fire_history.csv'
+        df.to_csv(out_csv, index=False)
+        self.fire_cache.put(key, gdf)
+        return gdf
+
+    def _fires_in_region(self, df: pd.DataFrame, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Fire records as points, filtered to the region (EPSG:4326)"""
         gdf = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df['LONGITUDE'], df['LATITUDE']), crs='EPSG:4326')
-        # Filter to the provided region-of-interest
-        region = region.to_crs(gdf.crs)
         try:
             gdf = gpd.sjoin(gdf, region, how='inner', predicate='within')
         except Exception:
             # If spatial join fails, proceed without filtering
             pass
-        # Write out CSV for spot-checking
-        out_csv = self.processed_dir / 'cleaned_fire_history.csv'
-        df.to_csv(out_csv, index=False)
         return gdf
@@ -0,0 +1,229 @@
+"""Resumable, segmented HTTP downloads and streaming extraction from zip archives.
+
+A download probes the server with a one-byte Range request. When ranges are
+supported, the file is split into fixed-size segments that are fetched concurrently
+into a preallocated ``.part`` file. Finished segments are recorded in a sidecar JSON
+file, so an interrupted download only refetches the segments that did not complete.
+The sidecar also records the server's ETag and Last-Modified; segments are requested
+with ``If-Range``, and a resume against a changed file starts over rather than
+mixing bytes of two versions. The finished file is checked against an expected
+SHA-256 (when one is known), and zip archives are test-read member by member,
+before it replaces the destination.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import requests
+
+SEGMENT_BYTES = 8 * 1024 * 1024
+READ_BYTES = 1024 * 1024
+
+
+class DownloadError(IOError):
+    """Raised when a download is incomplete or fails verification."""
+
+
+def if_range_validator(etag: Optional[str], last_modified: Optional[str]) -> Optional[str]:
+    """Value for ``If-Range``: a strong ETag, else Last-Modified (weak ETags are not allowed)."""
+    if etag and not etag.startswith('W/'):
+        return etag
+    return last_modified
+
+
+def sha256sum(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BYTES), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class SegmentedDownload:
+    """Download of ``url`` to ``dest`` in concurrent, resumable Range segments."""
+
+    def __init__(self,
+                 url: str,
+                 dest: Path,
+                 sha256: Optional[str] = None,
+                 segment_bytes: int = SEGMENT_BYTES,
+                 max_workers: int = 4,
+                 timeout: float = 60.0,
+                 check_zip: bool = False):
+        self.url = url
+        self.dest = Path(dest)
+        self.sha256 = sha256.lower() if sha256 else None
+        self.segment_bytes = segment_bytes
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.check_zip = check_zip
+        # Validators of the file being fetched, as reported by the probe
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.part = self.dest.with_name(self.dest.name + '.part')
+        self.state_path = self.dest.with_name(self.dest.name + '.part.json')
+        self._state_lock = threading.Lock()
+        self._sessions = threading.local()
+
+    def run(self) -> Path:
+        """Fetch whatever is missing, verify the file and move it into place."""
+        size, ranged = self._probe()
+        if ranged and size:
+            self._fetch_segments(size)
+        else:
+            self._fetch_whole()
+        self._verify(size)
+        os.replace(self.part, self.dest)
+        self.state_path.unlink(missing_ok=True)
+        return self.dest
+
+    def segments(self, size: int) -> List[Tuple[int, int]]:
+        """Inclusive (first, last) byte offsets of each segment."""
+        return [(start, min(start + self.segment_bytes, size) - 1)
+                for start in range(0, size, self.segment_bytes)]
+
+    def _session(self) -> requests.Session:
+        # One pooled session per worker thread
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            session = self._sessions.session = requests.Session()
+        return session
+
+    def _probe(self) -> Tuple[Optional[int], bool]:
+        """Total size and whether the server honours Range requests."""
+        with self._session().get(self.url, headers={'Range': 'bytes=0-0'}, stream=True,
+                                 timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            self.etag = resp.headers.get('ETag')
+            self.last_modified = resp.headers.get('Last-Modified')
+            content_range = resp.headers.get('Content-Range', '')
+            if resp.status_code == 206 and '/' in content_range:
+                total = content_range.rsplit('/', 1)[1]
+                return (int(total) if total.isdigit() else None), total.isdigit()
+            length = resp.headers.get('Content-Length')
+            return (int(length) if length and length.isdigit() else None), False
+
+    def _load_state(self, size: int) -> List[int]:
+        """Indices of the segments a previous attempt finished, if it matches this one."""
+        if not (self.state_path.exists() and self.part.exists()):
+            return []
+        try:
+            state = json.loads(self.state_path.read_text())
+        except ValueError:
+            return []
+        # A changed ETag or Last-Modified means the finished segments hold another version
+        same = (state.get('url') == self.url and state.get('size') == size
+                and state.get('segment_bytes') == self.segment_bytes
+                and state.get('etag') == self.etag
+                and state.get('last_modified') == self.last_modified
+                and self.part.stat().st_size == size)
+        return list(state.get('done', [])) if same else []
+
+    def _save_state(self, size: int, done: List[int]) -> None:
+        tmp = self.state_path.with_name(self.state_path.name + '.tmp')
+        tmp.write_text(json.dumps({'url': self.url, 'size': size,
+                                   'segment_bytes': self.segment_bytes,
+                                   'etag': self.etag, 'last_modified': self.last_modified,
+                                   'done': sorted(done)}))
+        os.replace(tmp, self.state_path)
+
+    def _fetch_segments(self, size: int) -> None:
+        done = self._load_state(size)
+        if not done:
+            self.part.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.part, 'wb') as f:
+                f.truncate(size)
+            self._save_state(size, done)
+        segments = self.segments(size)
+        finished = set(done)
+        pending = [i for i in range(len(segments)) if i not in finished]
+
+        def fetch(index: int) -> None:
+            first, last = segments[index]
+            self._fetch_range(first, last)
+            with self._state_lock:
+                done.append(index)
+                self._save_state(size, done)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # list() re-raises the first failed segment; finished ones stay recorded
+            list(pool.map(fetch, pending))
+
+    def _fetch_range(self, first: int, last: int) -> None:
+        headers = {'Range': f'bytes={first}-{last}'}
+        validator = if_range_validator(self.etag, self.last_modified)
+        if validator:
+            # The server sends the whole (new) file instead of the range if it changed
+            headers['If-Range'] = validator
+        with self._session().get(self.url, headers=headers, stream=True,
+                                 timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            if resp.status_code != 206 and validator:
+                raise DownloadError(f"{self.url} changed on the server during the download")
+            if resp.status_code != 206:
+                raise DownloadError(f"Server ignored range {first}-{last} of {self.url}")
+            written = 0
+            with open(self.part, 'r+b') as f:
+                f.seek(first)
+                for block in resp.iter_content(chunk_size=READ_BYTES):
+                    f.write(block)
+                    written += len(block)
+        if written != last - first + 1:
+            raise DownloadError(f"Short read for bytes {first}-{last} of {self.url}: got {written}")
+
+    def _fetch_whole(self) -> None:
+        """Single sequential stream, for servers without Range support."""
+        self.part.parent.mkdir(parents=True, exist_ok=True)
+        with self._session().get(self.url, stream=True, timeout=self.timeout) as resp:
+            resp.raise_for_status()
+            with open(self.part, 'wb') as f:
+                for block in resp.iter_content(chunk_size=READ_BYTES):
+                    f.write(block)
+
+    def _verify(self, size: Optional[int]) -> None:
+        actual_size = self.part.stat().st_size
+        if size is not None and actual_size != size:
+            raise DownloadError(f"{self.url}: expected {size} bytes, got {actual_size}")
+        if self.sha256 and sha256sum(self.part) != self.sha256:
+            self._discard()
+            raise DownloadError(f"{self.url}: SHA-256 mismatch")
+        if self.check_zip:
+            try:
+                with zipfile.ZipFile(self.part) as zf:
+                    bad = zf.testzip()
+            except (zipfile.BadZipFile, zlib.error, EOFError) as e:
+                bad = str(e)
+            if bad is not None:
+                self._discard()
+                raise DownloadError(f"{self.url}: corrupt zip archive ({bad})")
+
+    def _discard(self) -> None:
+        # A corrupt file cannot be resumed; start from scratch next time
+        self.part.unlink(missing_ok=True)
+        self.state_path.unlink(missing_ok=True)
+
+
+def download_file(url: str, dest: Path, sha256: Optional[str] = None, **kwargs) -> Path:
+    """Download ``url`` to ``dest``, resuming any earlier partial attempt."""
+    return SegmentedDownload(url, dest, sha256=sha256, **kwargs).run()
+
+
+def extract_member(archive: Path, suffix: str, dest: Path) -> Path:
+    """Stream the first member ending in ``suffix`` straight to ``dest``."""
+    with zipfile.ZipFile(archive) as zf:
+        member = next((n for n in zf.namelist() if n.endswith(suffix)), None)
+        if member is None:
+            raise DownloadError(f"No {suffix} member in {archive.name}")
+        tmp = dest.with_name(dest.name + '.part')
+        # Reading the member to the end also checks its CRC
+        with zf.open(member) as src, open(tmp, 'wb') as out:
+            shutil.copyfileobj(src, out, READ_BYTES)
+    os.replace(tmp, dest)
+    return dest
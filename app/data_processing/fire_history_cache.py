@@ -0,0 +1,107 @@
+"""Size-bounded on-disk cache of region-filtered fire history.
+
+Results are stored as GeoParquet files named by a hash of the region geometry, its
+CRS and the year range. The cache is tied to the source fire occurrence CSV: when
+the CSV's mtime or size changes, every entry is dropped.
+"""
+import hashlib
+import json
+import shutil
+import threading
+from pathlib import Path
+from typing import Hashable, List, Optional
+
+import geopandas as gpd
+
+from ..logger import logger
+
+SOURCE_STAMP = '_source.json'
+
+
+def region_key(region: gpd.GeoDataFrame, *parts: Hashable) -> str:
+    """Hash of the region's geometries and CRS together with ``parts``."""
+    digest = hashlib.sha1()
+    digest.update(str(region.crs).encode())
+    for geom in region.geometry:
+        digest.update(geom.wkb if geom is not None else b'')
+    digest.update(repr(parts).encode())
+    return digest.hexdigest()
+
+
+class FireHistoryCache:
+    """GeoDataFrames keyed by ``region_key``, evicted least recently used by size."""
+
+    def __init__(self, directory: Path, max_disk_bytes: int = 512 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._source_stamp: Optional[List] = None
+        self._lock = threading.Lock()
+
+    def ensure_source(self, source: Path) -> None:
+        """Drop every entry if ``source`` changed since the entries were written."""
+        stat = source.stat() if source.exists() else None
+        stamp = [source.name, stat.st_mtime_ns if stat else None, stat.st_size if stat else None]
+        with self._lock:
+            if stamp == self._source_stamp:
+                return
+            stamp_path = self.directory / SOURCE_STAMP
+            if not stamp_path.exists() or json.loads(stamp_path.read_text()) != stamp:
+                shutil.rmtree(self.directory, ignore_errors=True)
+                self.directory.mkdir(parents=True, exist_ok=True)
+                stamp_path.write_text(json.dumps(stamp))
+            self._source_stamp = stamp
+
+    def get(self, key: str) -> Optional[gpd.GeoDataFrame]:
+        path = self._path(key)
+        with self._lock:
+            if not path.exists():
+                self.misses += 1
+                return None
+            try:
+                data = gpd.read_parquet(path)
+            except Exception as e:
+                logger.warning(f"Dropping unreadable fire history cache entry {path.name}: {e}")
+                path.unlink(missing_ok=True)
+                self.misses += 1
+                return None
+            path.touch()  # mtime doubles as the cache's recency
+            self.hits += 1
+            return data
+
+    def put(self, key: str, data: gpd.GeoDataFrame) -> None:
+        path = self._path(key)
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            try:
+                data.to_parquet(path)
+            except Exception as e:
+                # Columns Parquet cannot hold are simply not cached
+                logger.warning(f"Could not cache fire history {key}: {e}")
+                path.unlink(missing_ok=True)
+                return
+            if self._disk_bytes() > self.max_disk_bytes:
+                self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._source_stamp = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f'{key}.parquet'
+
+    def _disk_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob('*.parquet'))
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until the cache is back to 90% of its limit."""
+        files = sorted(self.directory.glob('*.parquet'), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        target = self.max_disk_bytes * 0.9
+        for path in files:
+            if total <= target:
+                break
+            total -= path.stat().st_size
+            path.unlink()
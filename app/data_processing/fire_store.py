@@ -0,0 +1,203 @@
+"""Columnar store of the FPA-FOD fire occurrence records.
+
+The national CSV is converted once into a Parquet dataset partitioned by discovery
+year. Only the fields the app uses are kept, with dates already parsed. Within each
+year the rows are ordered along a Z-order curve of their coordinates and written in
+small row groups, so the latitude/longitude statistics of the row groups act as a
+spatial index: a (bounds, start_year, end_year) query only reads the partitions and
+row groups that can match. The store is rebuilt when the source CSV changes.
+
+Building never holds the national table either: chunks are appended to one
+ParquetWriter per year, and each year (a small fraction of the records) is then
+deduplicated, Z-ordered and rewritten on its own.
+
+The CSV itself is only ever streamed: ``iter_fire_records`` reads it in chunks of
+the needed columns with compact dtypes and filters each chunk before it is kept, so
+peak memory follows the matching rows rather than the national dataset.
+"""
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+FIRE_FIELDS = ['FOD_ID', 'LATITUDE', 'LONGITUDE', 'discovery_date', 'containment_date']
+# float32 keeps coordinates to about a metre; dates are parsed per chunk
+FIRE_DTYPES = {'FOD_ID': 'int64', 'LATITUDE': 'float32', 'LONGITUDE': 'float32'}
+CHUNK_ROWS = 250_000
+ROW_GROUP_SIZE = 16_384
+CELL_SIZE = 0.1  # degrees per Z-order cell
+MANIFEST = '_manifest.json'
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """Insert a zero bit between each of the low 16 bits."""
+    v = v.astype(np.uint32)
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    return (v | (v << 1)) & 0x55555555
+
+
+def zorder_cells(lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+    """Z-order (Morton) key of the CELL_SIZE grid cell containing each point."""
+    row = np.clip(((np.asarray(lat) + 90) / CELL_SIZE).astype(np.int64), 0, 0xFFFF)
+    col = np.clip(((np.asarray(lng) + 180) / CELL_SIZE).astype(np.int64), 0, 0xFFFF)
+    return _spread_bits(col) | (_spread_bits(row) << 1)
+
+
+def fire_csv_columns(source: Path) -> dict:
+    """Map of the CSV columns to read onto their FIRE_FIELDS names."""
+    header = pd.read_csv(source, nrows=0).columns
+    columns = {}
+    for field in FIRE_FIELDS:
+        # The FPA-FOD export uses upper case; cleaned extracts use the field names
+        for name in (field.upper(), field):
+            if name in header:
+                columns[name] = field
+                break
+    return columns
+
+
+def clean_fire_records(df: pd.DataFrame) -> pd.DataFrame:
+    """Records with valid coordinates and parsed dates, reduced to FIRE_FIELDS."""
+    df = df.dropna(subset=['LATITUDE', 'LONGITUDE'])
+    df = df[~((df['LATITUDE'] == 0) & (df['LONGITUDE'] == 0))]
+    df = df.assign(
+        discovery_date=pd.to_datetime(df.get('discovery_date'), errors='coerce'),
+        containment_date=pd.to_datetime(df.get('containment_date'), errors='coerce')
+    )
+    return df[[f for f in FIRE_FIELDS if f in df.columns]]
+
+
+def iter_fire_records(source: Path,
+                      start_year: Optional[int] = None,
+                      end_year: Optional[int] = None,
+                      bounds: Optional[Tuple[float, float, float, float]] = None,
+                      chunksize: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Cleaned records discovered in [start_year, end_year] inside (minx, miny, maxx, maxy),
+    read ``chunksize`` rows at a time."""
+    columns = fire_csv_columns(source)
+    dtypes = {name: FIRE_DTYPES[field] for name, field in columns.items() if field in FIRE_DTYPES}
+    with pd.read_csv(source, usecols=list(columns), dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            chunk = clean_fire_records(chunk.rename(columns=columns))
+            keep = chunk['discovery_date'].notna()
+            if start_year is not None:
+                keep &= chunk['discovery_date'].dt.year >= start_year
+            if end_year is not None:
+                keep &= chunk['discovery_date'].dt.year <= end_year
+            if bounds is not None:
+                minx, miny, maxx, maxy = bounds
+                keep &= (chunk['LONGITUDE'].between(minx, maxx)
+                         & chunk['LATITUDE'].between(miny, maxy))
+            if keep.any():
+                yield chunk[keep]
+
+
+def read_fire_records(source: Path, *args, **kwargs) -> pd.DataFrame:
+    """All records from ``iter_fire_records``, without duplicate FOD_IDs."""
+    chunks = list(iter_fire_records(source, *args, **kwargs))
+    if not chunks:
+        return clean_fire_records(pd.DataFrame(columns=list(fire_csv_columns(source).values())))
+    df = pd.concat(chunks, ignore_index=True)
+    if 'FOD_ID' in df.columns:
+        df = df.drop_duplicates(subset=['FOD_ID'])
+    return df
+
+
+class FireOccurrenceStore:
+    """Year-partitioned, spatially ordered Parquet copy of ``fire_occurrence.csv``."""
+
+    def __init__(self, source: Path, path: Path):
+        self.source = Path(source)
+        self.path = Path(path)
+
+    def _source_stamp(self) -> dict:
+        stat = self.source.stat()
+        return {'source': self.source.name, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+
+    def is_current(self) -> bool:
+        manifest = self.path / MANIFEST
+        if not manifest.exists():
+            return False
+        stamp = json.loads(manifest.read_text())
+        return all(stamp.get(k) == v for k, v in self._source_stamp().items())
+
+    def ensure(self) -> 'FireOccurrenceStore':
+        """Build the store unless it is up to date with the source CSV."""
+        if not self.is_current():
+            self.build()
+        return self
+
+    def build(self, chunksize: int = CHUNK_ROWS) -> None:
+        """Convert the source CSV into the partitioned Parquet dataset, chunk by chunk."""
+        # Write next to the live store and swap it in once complete
+        staging = self.path.with_name(self.path.name + '.building')
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        fields = list(clean_fire_records(
+            pd.DataFrame(columns=list(fire_csv_columns(self.source).values()))).columns)
+
+        # Pass 1: append each chunk's rows to its year's spill file, in CSV order
+        writers: Dict[int, pq.ParquetWriter] = {}
+        try:
+            for chunk in iter_fire_records(self.source, chunksize=chunksize):
+                fields = list(chunk.columns)
+                for year, part in chunk.groupby(chunk['discovery_date'].dt.year):
+                    table = pa.Table.from_pandas(part, preserve_index=False)
+                    writer = writers.get(int(year))
+                    if writer is None:
+                        partition = staging / f'year={int(year)}'
+                        partition.mkdir()
+                        writer = writers[int(year)] = pq.ParquetWriter(
+                            partition / 'spill.parquet', table.schema)
+                    writer.write_table(table.cast(writer.schema))
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        # Pass 2: one year at a time, drop repeated FOD_IDs and order rows along the Z-curve
+        rows = 0
+        for year in sorted(writers):
+            rows += self._sort_partition(staging / f'year={year}')
+        stamp = dict(self._source_stamp(), rows=rows, fields=fields)
+        (staging / MANIFEST).write_text(json.dumps(stamp))
+        shutil.rmtree(self.path, ignore_errors=True)
+        staging.rename(self.path)
+
+    @staticmethod
+    def _sort_partition(partition: Path) -> int:
+        """Rewrite a year's spill file as its Z-ordered part file; returns its row count."""
+        spill = partition / 'spill.parquet'
+        part = pq.read_table(spill).to_pandas()
+        if 'FOD_ID' in part.columns:
+            part = part.drop_duplicates(subset=['FOD_ID'])
+        order = np.argsort(zorder_cells(part['LATITUDE'], part['LONGITUDE']), kind='stable')
+        table = pa.Table.from_pandas(part.iloc[order], preserve_index=False)
+        pq.write_table(table, partition / 'part-0.parquet', row_group_size=ROW_GROUP_SIZE)
+        spill.unlink()
+        return len(part)
+
+    def query(self,
+              bounds: Optional[Tuple[float, float, float, float]],
+              start_year: int,
+              end_year: int) -> pd.DataFrame:
+        """Records discovered in [start_year, end_year] inside (minx, miny, maxx, maxy)."""
+        fields = json.loads((self.path / MANIFEST).read_text())['fields']
+        if not any(self.path.glob('year=*')):
+            return pd.DataFrame(columns=fields)
+        dataset = ds.dataset(self.path, format='parquet', partitioning='hive')
+        condition = (ds.field('year') >= start_year) & (ds.field('year') <= end_year)
+        if bounds is not None:
+            minx, miny, maxx, maxy = bounds
+            condition &= (
+                (ds.field('LONGITUDE') >= minx) & (ds.field('LONGITUDE') <= maxx) &
+                (ds.field('LATITUDE') >= miny) & (ds.field('LATITUDE') <= maxy)
+            )
+        return dataset.to_table(columns=fields, filter=condition).to_pandas()
@@ -0,0 +1,151 @@
+"""Windowed, overview-aware satellite scene reads and Cloud-Optimized GeoTIFF writing.
+
+Scenes are stored as Cloud-Optimized GeoTIFFs (COGs): internally tiled, with a
+pyramid of downsampled overviews stored ahead of the full-resolution tiles. A read
+for a bounding box computes the pixel window it covers and picks the coarsest
+pyramid level that is still at least as fine as the requested resolution, so GDAL
+only touches the tiles of that level which intersect the window. The same reader
+works on ``http(s)://`` COG URLs, where those tiles are fetched with Range requests.
+"""
+import math
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import rasterio
+from affine import Affine
+from rasterio.crs import CRS
+from rasterio.enums import Resampling
+from rasterio.errors import WindowError
+from rasterio.io import MemoryFile
+from rasterio.shutil import copy as rio_copy
+from rasterio.warp import transform_bounds
+from rasterio.windows import Window, from_bounds
+
+COG_BLOCKSIZE = 512       # tile edge in pixels; a multiple of 16 as GeoTIFF requires
+OVERVIEW_RESAMPLING = 'average'
+# Creation options replaced by the COG layout
+LAYOUT_KEYS = ('driver', 'tiled', 'blockxsize', 'blockysize', 'compress', 'interleave')
+
+# GDAL options that keep remote COG reads to the header and the tiles needed
+COG_READ_ENV = {
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
+    'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif,.tiff',
+    'GDAL_HTTP_MERGE_CONSECUTIVE_RANGES': 'YES',
+}
+
+
+def overview_factors(width: int, height: int, blocksize: int = COG_BLOCKSIZE) -> List[int]:
+    """Decimation factors 2, 4, 8, ... until the coarsest level fits in one tile."""
+    factors = []
+    factor = 2
+    while max(width, height) / (factor // 2) > blocksize:
+        factors.append(factor)
+        factor *= 2
+    return factors
+
+
+def write_cog(path: Path,
+              data: np.ndarray,
+              profile: Dict[str, Any],
+              blocksize: int = COG_BLOCKSIZE,
+              resampling: str = OVERVIEW_RESAMPLING,
+              tags: Optional[Dict[str, str]] = None) -> Path:
+    """Write ``(bands, rows, cols)`` pixels as a tiled, compressed GeoTIFF with overviews."""
+    path = Path(path)
+    count, height, width = data.shape
+    profile = {k: v for k, v in profile.items() if k not in LAYOUT_KEYS}
+    profile.update(driver='GTiff', count=count, height=height, width=width, dtype=data.dtype.name)
+    options = {'tiled': True, 'blockxsize': blocksize, 'blockysize': blocksize,
+               'compress': 'deflate'}
+    with MemoryFile() as mem:
+        with mem.open(**profile, **options) as tmp:
+            tmp.write(data)
+            if tags:
+                tmp.update_tags(**tags)
+            factors = overview_factors(width, height, blocksize)
+            if factors:
+                tmp.build_overviews(factors, Resampling[resampling])
+                tmp.update_tags(ns='rio_overview', resampling=resampling)
+        # Copying with the source overviews puts them ahead of the full-resolution tiles
+        with mem.open() as src:
+            part = path.with_name(path.name + '.part')
+            rio_copy(src, part, driver='GTiff', copy_src_overviews=True, **options)
+    os.replace(part, path)
+    return path
+
+
+def is_cog(path: Union[Path, str]) -> bool:
+    """Whether the GeoTIFF is tiled and carries the overviews its size calls for."""
+    with rasterio.open(path) as src:
+        tiled = src.profile.get('tiled', False)
+        blocksize = src.block_shapes[0][0] if tiled else COG_BLOCKSIZE
+        wanted = overview_factors(src.width, src.height, blocksize)
+        return bool(tiled) and (not wanted or bool(src.overviews(1)))
+
+
+def convert_to_cog(src_path: Path, dst_path: Optional[Path] = None, **kwargs) -> Path:
+    """Rewrite a (stripped, overview-less) GeoTIFF as a COG, in place by default.
+
+    Dataset tags (e.g. the acquisition date) are carried over.
+    """
+    with rasterio.open(src_path) as src:
+        data = src.read()
+        profile = src.profile
+        tags = src.tags()
+    return write_cog(dst_path or src_path, data, profile, tags=tags, **kwargs)
+
+
+def pyramid_level(native_res: float, factors: Sequence[int], resolution: Optional[float]) -> int:
+    """Largest decimation factor whose pixels are no coarser than ``resolution`` (1 = full)."""
+    if not resolution:
+        return 1
+    usable = [f for f in factors if native_res * f <= resolution * (1 + 1e-9)]
+    return max(usable, default=1)
+
+
+def pixel_window(window: Window, width: int, height: int) -> Window:
+    """Whole pixels covering ``window``, clipped to a ``width`` x ``height`` raster."""
+    eps = 1e-6  # bounds that sit on pixel edges should not pull in a neighbour
+    col0 = max(0, math.floor(window.col_off + eps))
+    row0 = max(0, math.floor(window.row_off + eps))
+    col1 = min(width, math.ceil(window.col_off + window.width - eps))
+    row1 = min(height, math.ceil(window.row_off + window.height - eps))
+    if col1 <= col0 or row1 <= row0:
+        raise WindowError(f"{window} does not intersect the raster")
+    return Window(col0, row0, col1 - col0, row1 - row0)
+
+
+def read_window(path: Union[Path, str],
+                bbox: Tuple[float, float, float, float],
+                resolution: Optional[float] = None,
+                bands: Optional[Sequence[int]] = None,
+                bbox_crs: Optional[str] = 'EPSG:4326',
+                resampling: str = 'nearest') -> Tuple[np.ndarray, Affine]:
+    """Pixels of the scene inside ``bbox`` and their transform.
+
+    ``resolution`` is the wanted pixel size in the scene's CRS units; the read comes
+    from the matching overview level, or full resolution when it is None. The bbox is
+    clipped to the scene, so a bbox outside it yields an array with no rows.
+    """
+    with rasterio.Env(**COG_READ_ENV), rasterio.open(path) as src:
+        if bbox_crs and src.crs and src.crs != CRS.from_user_input(bbox_crs):
+            bbox = transform_bounds(bbox_crs, src.crs, *bbox)
+        try:
+            window = pixel_window(from_bounds(*bbox, transform=src.transform),
+                                  src.width, src.height)
+        except WindowError:
+            empty = np.empty((len(bands) if bands else src.count, 0, 0), dtype=src.dtypes[0])
+            return empty, src.transform
+
+        factor = pyramid_level(abs(src.res[0]), src.overviews(1), resolution)
+        out_height = max(1, math.ceil(window.height / factor))
+        out_width = max(1, math.ceil(window.width / factor))
+        indexes = list(bands) if bands else list(range(1, src.count + 1))
+        # A decimated out_shape makes GDAL serve the read from the overview with that factor
+        data = src.read(indexes, window=window, out_shape=(len(indexes), out_height, out_width),
+                        resampling=Resampling[resampling])
+        transform = src.window_transform(window) * Affine.scale(window.width / out_width,
+                                                                window.height / out_height)
+    return data, transform
@@ -0,0 +1,118 @@
+"""Land-use polygons kept in a FlatGeobuf copy and a process-wide spatial index.
+
+``land_use.geojson`` is converted once to FlatGeobuf, whose packed Hilbert R-tree
+lets ``read_land_use`` read only the features inside a bbox. Writing that index
+reorders the features, so the copy keeps each feature's GeoJSON row number in a
+column that ``read_land_use`` restores as the index. The whole layer is
+loaded once per process (and again only when the file changes) and its STRtree is
+built on load, so a region query is an index probe plus an exact join over the few
+candidates. Recent region clips are kept in memory as well.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import geopandas as gpd
+
+from .fire_history_cache import region_key
+
+CLIP_CACHE_SIZE = 64  # region clips kept per layer
+SOURCE_INDEX = 'source_row'  # FlatGeobuf column holding the GeoJSON row number
+
+_layers: Dict[Path, 'LandUseLayer'] = {}
+_layers_lock = threading.Lock()
+# (mtime_ns, size) of FlatGeobuf copies known to carry the source row column
+_checked_copies: Dict[Path, Tuple[int, int]] = {}
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _has_source_index(fgb: Path) -> bool:
+    """Whether ``fgb`` has the source row column; read once per file version."""
+    stamp = _file_stamp(fgb)
+    if _checked_copies.get(fgb) == stamp:
+        return True
+    if SOURCE_INDEX not in gpd.read_file(fgb, rows=1).columns:
+        return False
+    _checked_copies[fgb] = stamp
+    return True
+
+
+def ensure_flatgeobuf(geojson: Path) -> Path:
+    """FlatGeobuf copy of ``geojson``, rewritten whenever the GeoJSON is newer.
+
+    Copies written before the source row column was added are rewritten as well.
+    """
+    fgb = geojson.with_suffix('.fgb')
+    if (not fgb.exists() or fgb.stat().st_mtime_ns < geojson.stat().st_mtime_ns
+            or not _has_source_index(fgb)):
+        tmp = fgb.with_name(fgb.stem + '.part.fgb')
+        gdf = gpd.read_file(geojson)
+        gdf[SOURCE_INDEX] = gdf.index
+        gdf.to_file(tmp, driver='FlatGeobuf', SPATIAL_INDEX='YES')
+        os.replace(tmp, fgb)
+        _checked_copies[fgb] = _file_stamp(fgb)
+    return fgb
+
+
+def read_land_use(path: Path,
+                  bbox: Optional[Tuple[float, float, float, float]] = None) -> gpd.GeoDataFrame:
+    """Features of a land-use file, only those intersecting ``bbox`` (layer CRS) if given.
+
+    Features of a FlatGeobuf copy get their GeoJSON row numbers back as the index.
+    """
+    gdf = gpd.read_file(path, bbox=bbox)
+    if SOURCE_INDEX in gdf.columns:
+        gdf = gdf.set_index(SOURCE_INDEX).rename_axis(None)
+    return gdf
+
+
+class LandUseLayer:
+    """One loaded land-use layer with its spatial index built."""
+
+    def __init__(self, gdf: gpd.GeoDataFrame, stamp: Optional[Tuple[int, int]] = None):
+        self.gdf = gdf
+        self.stamp = stamp
+        self.gdf.sindex  # build the STRtree now rather than on the first query
+        self._clips: 'OrderedDict[str, gpd.GeoDataFrame]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def clip(self, region: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        """Same rows as ``gpd.sjoin(layer, region, predicate='intersects')``"""
+        # The join carries the region's attributes, so they are part of the key
+        attributes = region.drop(columns=region.geometry.name).to_json()
+        key = region_key(region, tuple(region.index), attributes)
+        with self._lock:
+            if key in self._clips:
+                self._clips.move_to_end(key)
+                return self._clips[key].copy()
+        if region.crs is not None and self.gdf.crs is not None and region.crs != self.gdf.crs:
+            region = region.to_crs(self.gdf.crs)
+        # Bounding-box probe of the index; the exact predicate runs on the candidates only
+        candidates = set()
+        for geom in region.geometry.values:
+            candidates.update(self.gdf.sindex.query(geom).tolist())
+        subset = self.gdf.iloc[sorted(candidates)]
+        result = gpd.sjoin(subset, region, how='inner', predicate='intersects')
+        with self._lock:
+            self._clips[key] = result
+            while len(self._clips) > CLIP_CACHE_SIZE:
+                self._clips.popitem(last=False)
+        return result.copy()
+
+
+def land_use_layer(path: Path) -> LandUseLayer:
+    """Process-wide layer for ``path``, reloaded when the file's size or mtime changes."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _layers_lock:
+        layer = _layers.get(path)
+        if layer is None or layer.stamp != stamp:
+            layer = _layers[path] = LandUseLayer(read_land_use(path), stamp)
+        return layer
@@ -0,0 +1,177 @@
+"""NOAA CDO daily weather with a local, date-partitioned store.
+
+A request for a date range only fetches the days the store has not seen for that
+bounding box. Missing days are grouped into windows of at most ``window_days``,
+which are fetched concurrently over one pooled ``httpx.AsyncClient``; each window
+follows the API's offset pagination. Records are stored in one Parquet file per
+bounding box and month, and the days each window covered (with or without records)
+are remembered so they are not requested again. Days close to today are always
+refetched, since NOAA publishes observations with a delay.
+"""
+import asyncio
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+
+import httpx
+import pandas as pd
+
+from ..logger import logger
+from ..utils import run_sync
+
+CDO_URL = "https://www.ncdc.noaa.gov/cdo-web/api/v2/data"
+PAGE_LIMIT = 1000         # largest page the CDO API serves
+WINDOW_DAYS = 31          # days per request window
+MAX_CONCURRENCY = 5       # CDO allows five requests per second per token
+RECENT_DAYS = 7           # days before today that are never treated as complete
+COVERED_FILE = 'covered.json'
+
+
+def date_windows(days: pd.DatetimeIndex,
+                 window_days: int = WINDOW_DAYS) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+    """Split sorted days into contiguous (first, last) windows of at most ``window_days``."""
+    windows = []
+    start = prev = None
+    for day in days:
+        if start is not None and (day - prev).days == 1 and (day - start).days < window_days:
+            prev = day
+            continue
+        if start is not None:
+            windows.append((start, prev))
+        start = prev = day
+    if start is not None:
+        windows.append((start, prev))
+    return windows
+
+
+def daily_frame(records: pd.DataFrame) -> pd.DataFrame:
+    """Wide per-date observations; long CDO records (datatype, value) are pivoted."""
+    if records.empty or not {'datatype', 'value'} <= set(records.columns):
+        return records.reset_index(drop=True)
+    wide = records.pivot_table(index='date', columns='datatype', values='value', aggfunc='mean')
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+class NoaaWeatherStore:
+    """GHCND daily records per bounding box, fetched once and kept on disk."""
+
+    # Overridden in tests with an ``httpx.MockTransport``
+    transport: ClassVar[Optional[httpx.AsyncBaseTransport]] = None
+
+    def __init__(self,
+                 directory: Path,
+                 window_days: int = WINDOW_DAYS,
+                 max_concurrency: int = MAX_CONCURRENCY,
+                 timeout: float = 30.0):
+        self.directory = Path(directory)
+        self.window_days = window_days
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+
+    def fetch(self, bbox: Tuple[float, float, float, float], start_date: datetime,
+              end_date: datetime) -> pd.DataFrame:
+        return run_sync(self.fetch_async(bbox, start_date, end_date))
+
+    async def fetch_async(self,
+                          bbox: Tuple[float, float, float, float],
+                          start_date: datetime,
+                          end_date: datetime) -> pd.DataFrame:
+        """Stored records between the dates (inclusive), fetching any missing days first."""
+        box_dir = self.directory / self.bbox_key(bbox)
+        days = pd.date_range(pd.Timestamp(start_date).normalize(),
+                             pd.Timestamp(end_date).normalize(), freq='D')
+        covered = self._covered(box_dir)
+        missing = days[~days.isin(covered)]
+        token = os.getenv("NOAA_API_KEY")
+        if len(missing) and token:
+            windows = date_windows(missing, self.window_days)
+            limits = httpx.Limits(max_connections=self.max_concurrency)
+            async with httpx.AsyncClient(limits=limits, timeout=self.timeout,
+                                         transport=self.transport,
+                                         headers={"token": token}) as client:
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                results = await asyncio.gather(
+                    *(self._fetch_window(client, semaphore, bbox, first, last)
+                      for first, last in windows),
+                    return_exceptions=True
+                )
+            for (first, last), records in zip(windows, results):
+                if isinstance(records, Exception):
+                    logger.warning(f"NOAA fetch {first.date()}..{last.date()} failed: {records}")
+                    continue
+                self._save(box_dir, first, last, records)
+        return self._read(box_dir, days)
+
+    @staticmethod
+    def bbox_key(bbox: Tuple[float, float, float, float]) -> str:
+        return hashlib.sha1(",".join(f"{v:.4f}" for v in bbox).encode()).hexdigest()[:12]
+
+    async def _fetch_window(self,
+                            client: httpx.AsyncClient,
+                            semaphore: asyncio.Semaphore,
+                            bbox: Tuple[float, float, float, float],
+                            first: pd.Timestamp,
+                            last: pd.Timestamp) -> List[Dict[str, Any]]:
+        """Every page of records for one window."""
+        params = {
+            "datasetid": "GHCND",
+            "locationid": f"BBOX:{bbox[0]},{bbox[1]},{bbox[2]},{bbox[3]}",
+            "startdate": first.strftime("%Y-%m-%d"),
+            "enddate": last.strftime("%Y-%m-%d"),
+            "units": "metric",
+            "limit": PAGE_LIMIT
+        }
+        records: List[Dict[str, Any]] = []
+        offset = 1  # CDO offsets are 1-based
+        while True:
+            async with semaphore:
+                resp = await client.get(CDO_URL, params=dict(params, offset=offset))
+            resp.raise_for_status()
+            data = resp.json() or {}
+            page = data.get("results") or []
+            records.extend(page)
+            count = data.get("metadata", {}).get("resultset", {}).get("count", len(records))
+            offset += PAGE_LIMIT
+            if not page or offset > count:
+                return records
+
+    def _covered(self, box_dir: Path) -> pd.DatetimeIndex:
+        path = box_dir / COVERED_FILE
+        if not path.exists():
+            return pd.DatetimeIndex([])
+        return pd.DatetimeIndex(pd.to_datetime(json.loads(path.read_text())))
+
+    def _save(self, box_dir: Path, first: pd.Timestamp, last: pd.Timestamp,
+              records: List[Dict[str, Any]]) -> None:
+        box_dir.mkdir(parents=True, exist_ok=True)
+        if records:
+            df = pd.DataFrame(records)
+            df["date"] = pd.to_datetime(df["date"])
+            for month, part in df.groupby(df["date"].dt.strftime("%Y-%m")):
+                path = box_dir / f"{month}.parquet"
+                if path.exists():
+                    part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+                    # Recent days are refetched, so the same record can arrive twice
+                    part = part.drop_duplicates()
+                part.to_parquet(path, index=False)
+        # Days close to today may still gain observations, so they stay missing
+        complete_until = pd.Timestamp.now().normalize() - pd.Timedelta(days=RECENT_DAYS)
+        days = pd.date_range(first, min(last, complete_until), freq='D')
+        covered = self._covered(box_dir).union(days)
+        (box_dir / COVERED_FILE).write_text(json.dumps([d.strftime("%Y-%m-%d") for d in covered]))
+
+    def _read(self, box_dir: Path, days: pd.DatetimeIndex) -> pd.DataFrame:
+        if days.empty:
+            return pd.DataFrame()
+        months = sorted(set(days.strftime("%Y-%m")))
+        paths = [box_dir / f"{m}.parquet" for m in months]
+        parts = [pd.read_parquet(path) for path in paths if path.exists()]
+        if not parts:
+            return pd.DataFrame()
+        df = pd.concat(parts, ignore_index=True)
+        df = df[df["date"].dt.normalize().isin(days)].sort_values("date", kind="stable")
+        return df.reset_index(drop=True)
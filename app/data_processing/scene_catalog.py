@@ -0,0 +1,257 @@
+"""SQLite catalog of local satellite scenes, indexed by footprint and acquisition date.
+
+Each GeoTIFF under the imagery directory is converted to a Cloud-Optimized GeoTIFF
+if it is not one yet, then gets one row with its path, acquisition
+date, CRS, band count, pixel size and EPSG:4326 footprint; the footprints also live in
+an R-tree virtual table, so "scenes intersecting this bbox around this date" is an
+index lookup rather than a directory listing. Files are re-indexed when their size or
+mtime changes; ``refresh`` rescans a directory at most once per interval, so lookups
+on the request path do not list the directory every time. When no single scene
+covers a bbox, the nearest-dated scenes that together cover it are mosaicked,
+preferring closer dates where they overlap.
+"""
+import re
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import rasterio
+from affine import Affine
+from rasterio.crs import CRS
+from rasterio.errors import RasterioIOError
+from rasterio.merge import merge
+from rasterio.warp import transform_bounds
+from shapely.geometry import box
+from shapely.ops import unary_union
+
+from ..logger import logger
+from .imagery import convert_to_cog, is_cog, read_window
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scenes (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    acquired TEXT NOT NULL,
+    crs TEXT,
+    bands INTEGER NOT NULL,
+    resolution REAL NOT NULL,
+    minx REAL NOT NULL, miny REAL NOT NULL, maxx REAL NOT NULL, maxy REAL NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS scenes_acquired ON scenes (acquired);
+CREATE VIRTUAL TABLE IF NOT EXISTS scene_footprints USING rtree (id, minx, maxx, miny, maxy);
+"""
+
+INSERT_SCENE = """
+INSERT INTO scenes (path, acquired, crs, bands, resolution, minx, miny, maxx, maxy, mtime_ns, size)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Scenes whose footprint intersects a bbox (R-tree probe) with at least some bands
+FIND_SCENES = """
+SELECT s.path, s.acquired, s.crs, s.bands, s.resolution, s.minx, s.miny, s.maxx, s.maxy
+FROM scene_footprints f JOIN scenes s ON s.id = f.id
+WHERE f.minx <= ? AND f.maxx >= ? AND f.miny <= ? AND f.maxy >= ? AND s.bands >= ?
+"""
+
+# satellite_YYYYMMDD_... and most provider names carry the acquisition date
+FILENAME_DATE = re.compile(r'(?<!\d)(\d{4})(\d{2})(\d{2})(?!\d)')
+
+
+@dataclass(frozen=True)
+class Scene:
+    path: Path
+    acquired: date
+    crs: Optional[str]
+    bands: int
+    resolution: float
+    bounds: Tuple[float, float, float, float]  # EPSG:4326
+
+    @property
+    def footprint(self):
+        return box(*self.bounds)
+
+
+def acquisition_date(src, path: Path) -> Optional[date]:
+    """Acquisition date from the ACQUISITION_DATE / TIFFTAG_DATETIME tags or the filename."""
+    tags = src.tags()
+    for value in (tags.get('ACQUISITION_DATE'), tags.get('TIFFTAG_DATETIME')):
+        if value:
+            try:
+                return datetime.strptime(value[:10].replace(':', '-'), '%Y-%m-%d').date()
+            except ValueError:
+                pass
+    match = FILENAME_DATE.search(path.stem)
+    if match:
+        try:
+            return date(*map(int, match.groups()))
+        except ValueError:
+            pass
+    return None
+
+
+class SceneCatalog:
+    """Footprint and date index over the GeoTIFF scenes in a directory."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(SCHEMA)
+        # Monotonic time of the last scan of each directory
+        self._scanned: Dict[Path, float] = {}
+        self._scan_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path)
+
+    def add(self, path: Path, acquired: Optional[date] = None) -> Optional[Scene]:
+        """Index (or re-index) one scene; returns None when its date cannot be told.
+
+        A scene that is not a COG yet is rewritten as one first, so that reads on the
+        request path always find tiles and overviews.
+        """
+        path = Path(path).resolve()
+        if not is_cog(path):
+            convert_to_cog(path)
+        stat = path.stat()
+        with rasterio.open(path) as src:
+            acquired = acquired or acquisition_date(src, path)
+            if acquired is None:
+                logger.warning(f"Not cataloguing {path.name}: no acquisition date")
+                return None
+            # Rasters without a CRS are taken to be in lon/lat already
+            bounds = tuple(src.bounds)
+            if src.crs and src.crs != CRS.from_epsg(4326):
+                bounds = transform_bounds(src.crs, 'EPSG:4326', *bounds)
+            scene = Scene(path, acquired, src.crs.to_string() if src.crs else None,
+                          src.count, float(abs(src.res[0])), tuple(float(v) for v in bounds))
+        with closing(self._connect()) as conn, conn:
+            self._delete(conn, [str(path)])
+            cur = conn.execute(
+                INSERT_SCENE,
+                (str(path), acquired.isoformat(), scene.crs, scene.bands, scene.resolution,
+                 *scene.bounds, stat.st_mtime_ns, stat.st_size))
+            minx, miny, maxx, maxy = scene.bounds
+            conn.execute("INSERT INTO scene_footprints VALUES (?, ?, ?, ?, ?)",
+                         (cur.lastrowid, minx, maxx, miny, maxy))
+        return scene
+
+    def scan(self, directory: Path, pattern: str = '*.tif') -> int:
+        """Bring the catalog in line with ``directory``; returns how many files were (re)indexed."""
+        directory = Path(directory).resolve()
+        with closing(self._connect()) as conn:
+            rows = conn.execute("SELECT path, mtime_ns, size FROM scenes").fetchall()
+        known = {path: (mtime_ns, size) for path, mtime_ns, size in rows
+                 if Path(path).parent == directory}
+        on_disk = {}
+        for path in directory.glob(pattern):
+            stat = path.stat()
+            on_disk[str(path)] = (stat.st_mtime_ns, stat.st_size)
+        indexed = 0
+        for path, stamp in on_disk.items():
+            if known.get(path) != stamp:
+                try:
+                    indexed += self.add(Path(path)) is not None
+                except RasterioIOError as e:
+                    logger.warning(f"Not cataloguing {path}: {e}")
+        gone = [p for p in known if p not in on_disk]
+        if gone:
+            with closing(self._connect()) as conn, conn:
+                self._delete(conn, gone)
+        return indexed
+
+    def refresh(self, directory: Path, max_age: float, pattern: str = '*.tif') -> int:
+        """``scan`` the directory unless it was scanned less than ``max_age`` seconds ago."""
+        directory = Path(directory).resolve()
+        with self._scan_lock:
+            last = self._scanned.get(directory)
+            if last is not None and time.monotonic() - last < max_age:
+                return 0
+            indexed = self.scan(directory, pattern)
+            self._scanned[directory] = time.monotonic()
+            return indexed
+
+    def find(self,
+             bbox: Tuple[float, float, float, float],
+             on: date,
+             max_days: Optional[int] = None,
+             min_bands: int = 1) -> List[Scene]:
+        """Scenes intersecting the EPSG:4326 bbox, nearest to ``on`` first.
+
+        Finer pixels break ties between equally near dates.
+        """
+        on = _as_date(on)
+        query = FIND_SCENES
+        params = [bbox[2], bbox[0], bbox[3], bbox[1], min_bands]
+        if max_days is not None:
+            query += "AND s.acquired BETWEEN ? AND ?"
+            window = timedelta(days=max_days)
+            params += [(on - window).isoformat(), (on + window).isoformat()]
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, params).fetchall()
+        scenes = [Scene(Path(r[0]), date.fromisoformat(r[1]), r[2], r[3], r[4], tuple(r[5:9]))
+                  for r in rows]
+        scenes.sort(key=lambda s: (abs((s.acquired - on).days), s.resolution, str(s.path)))
+        return scenes
+
+    def best(self, bbox: Tuple[float, float, float, float], on: date, **kwargs) -> Optional[Scene]:
+        """The nearest-dated scene that covers the whole bbox, if any."""
+        area = box(*bbox)
+        return next((s for s in self.find(bbox, on, **kwargs) if s.footprint.covers(area)), None)
+
+    def cover(self, bbox: Tuple[float, float, float, float], on: date, **kwargs) -> List[Scene]:
+        """Scenes that together cover the bbox, nearest-dated first; empty if they cannot."""
+        best = self.best(bbox, on, **kwargs)
+        if best is not None:
+            return [best]
+        area = box(*bbox)
+        chosen, covered = [], None
+        for scene in self.find(bbox, on, **kwargs):
+            if covered is not None and covered.covers(scene.footprint.intersection(area)):
+                continue
+            # One pixel grid per mosaic: scenes in another CRS cannot be merged directly
+            if chosen and scene.crs != chosen[0].crs:
+                continue
+            chosen.append(scene)
+            covered = (scene.footprint if covered is None
+                       else unary_union([covered, scene.footprint]))
+            if covered.covers(area):
+                return chosen
+        return []
+
+    def mosaic(self,
+               bbox: Tuple[float, float, float, float],
+               on: date,
+               resolution: Optional[float] = None,
+               **kwargs) -> Optional[Tuple[np.ndarray, Affine]]:
+        """Pixels covering the bbox from the best scene or a mosaic; None if it is uncovered."""
+        scenes = self.cover(bbox, on, **kwargs)
+        if not scenes:
+            return None
+        if len(scenes) == 1:
+            return read_window(scenes[0].path, bbox, resolution=resolution)
+        crs = scenes[0].crs
+        bounds = transform_bounds('EPSG:4326', crs, *bbox) if crs else bbox
+        # Earlier (nearer-dated) scenes win where footprints overlap
+        return merge([str(s.path) for s in scenes], bounds=bounds,
+                     res=resolution or min(s.resolution for s in scenes), method='first')
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, paths: Iterable[str]) -> None:
+        for path in paths:
+            row = conn.execute("SELECT id FROM scenes WHERE path = ?", (path,)).fetchone()
+            if row:
+                conn.execute("DELETE FROM scene_footprints WHERE id = ?", row)
+                conn.execute("DELETE FROM scenes WHERE id = ?", row)
+
+
+def _as_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
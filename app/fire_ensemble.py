@@ -0,0 +1,279 @@
+"""Monte Carlo burn-probability ensembles for the fire spread simulator.
+
+Each ensemble member perturbs the forecast wind speed, wind direction, humidity and
+fuel moisture and runs FireSpreadSimulator independently. Members run in a process
+pool whose workers map the fuel-class raster from shared memory instead of receiving
+a pickled copy per task, and send back only the cropped burned mask of their run.
+
+The server shares one bounded pool (``ensemble_pool``) across requests; the lifespan
+starts and shuts it down. Its workers use the ``spawn`` start method, because forking
+a threaded server can copy locks held by other threads into the child.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from multiprocessing import get_context, shared_memory
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from rasterio.windows import Window, transform as window_transform
+
+from .config import ENSEMBLE_WORKERS
+from .fire_spread import (
+    MOISTURE_OF_EXTINCTION,
+    REFERENCE_FUEL_MOISTURE,
+    FireSpreadSimulator,
+    FuelGrid,
+    _bounding_box,
+    polygonize_mask,
+)
+
+DEFAULT_PROBABILITY_LEVELS = (0.1, 0.5, 0.9)
+
+# Grids a pool worker keeps attached, most recently used last; concurrent
+# ensembles interleave their members on the shared pool
+WORKER_GRID_CACHE = 4
+
+# Per-process state of pool workers: simulators keyed by shared-memory name
+_worker: "OrderedDict[str, Tuple[shared_memory.SharedMemory, FireSpreadSimulator]]" = OrderedDict()
+
+
+@dataclass
+class WeatherPerturbation:
+    """Standard deviations of the forecast error drawn for each ensemble member."""
+    wind_speed: float = 0.2        # fraction of the forecast speed (log-normal)
+    wind_direction: float = 20.0   # degrees
+    humidity: float = 5.0          # percentage points
+    fuel_moisture: float = 1.5     # percentage points
+
+
+@dataclass
+class BurnProbabilityResult:
+    """Outcome of an ensemble run."""
+    probability: np.ndarray         # float32, fraction of members that burned each cell
+    member_areas_acres: np.ndarray  # burned area of each member
+    grid: FuelGrid
+
+    @property
+    def n_members(self) -> int:
+        return len(self.member_areas_acres)
+
+    def area_percentiles(self, percentiles: Sequence[float] = (10, 50, 90)) -> Dict[str, float]:
+        """Burned-area percentiles across members, keyed like ``p50``."""
+        values = np.percentile(self.member_areas_acres, percentiles)
+        return {f'p{p:g}': float(v) for p, v in zip(percentiles, values)}
+
+    def probability_contours(self, levels: Sequence[float] = DEFAULT_PROBABILITY_LEVELS) -> Dict:
+        """Areas burned with at least each probability level, as a GeoJSON FeatureCollection."""
+        features = []
+        box = _bounding_box(self.probability > 0)
+        if box is None:
+            return {'type': 'FeatureCollection', 'features': features}
+        r0, r1, c0, c1 = box
+        probability = self.probability[r0:r1, c0:c1]
+        transform = window_transform(Window(c0, r0, c1 - c0, r1 - r0), self.grid.transform)
+        for level in sorted(levels):
+            mask = probability >= level
+            if not mask.any():
+                continue
+            features.append({
+                'type': 'Feature',
+                'geometry': polygonize_mask(mask, transform),
+                'properties': {
+                    'probability': level,
+                    'areaAcres': float(np.count_nonzero(mask) * self.grid.cell_area_acres)
+                }
+            })
+        return {'type': 'FeatureCollection', 'features': features}
+
+
+class EnsemblePool:
+    """Bounded process pool shared by ensemble runs, started with ``spawn``.
+
+    Members of concurrent ensembles queue on the same workers, so the number of
+    simulation processes never exceeds ``max_workers`` however many requests run.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> ProcessPoolExecutor:
+        """Create the executor if it is not running and return it."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = _spawn_executor(self.max_workers)
+            return self._executor
+
+    def shutdown(self) -> None:
+        """Stop the workers; a later ``start`` creates new ones."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+ensemble_pool = EnsemblePool(ENSEMBLE_WORKERS)
+
+
+def perturb_weather(weather: Mapping[str, Sequence],
+                    n_members: int,
+                    perturbation: Optional[WeatherPerturbation] = None,
+                    seed: Optional[int] = None) -> List[Dict[str, np.ndarray]]:
+    """Draw per-member weather columns around a forecast.
+
+    Each member gets one error per field, applied to every step, so a member
+    represents a consistently biased forecast. Fields not perturbed are passed through.
+    """
+    perturbation = perturbation or WeatherPerturbation()
+    rng = np.random.default_rng(seed)
+    wind_speed = np.asarray(weather['wind_speed'], dtype=np.float64)
+    wind_direction = np.asarray(weather['wind_direction'], dtype=np.float64)
+    humidity = np.asarray(weather['humidity'], dtype=np.float64)
+    fuel_moisture = np.asarray(weather.get('fuel_moisture', REFERENCE_FUEL_MOISTURE),
+                               dtype=np.float64)
+
+    members = []
+    for _ in range(n_members):
+        speed_error = rng.normal(0.0, perturbation.wind_speed)
+        member = {name: np.asarray(values) for name, values in weather.items()}
+        member.update({
+            # Log-normal speed error keeps speeds positive and the ensemble mean unbiased
+            'wind_speed': wind_speed * np.exp(speed_error - perturbation.wind_speed ** 2 / 2),
+            'wind_direction': (wind_direction + rng.normal(0.0, perturbation.wind_direction)) % 360,
+            'humidity': np.clip(humidity + rng.normal(0.0, perturbation.humidity), 1.0, 100.0),
+            'fuel_moisture': np.clip(fuel_moisture + rng.normal(0.0, perturbation.fuel_moisture),
+                                     1.0, MOISTURE_OF_EXTINCTION)
+        })
+        members.append(member)
+    return members
+
+
+def simulate_ensemble(grid: FuelGrid,
+                      ignition: Tuple[float, float],
+                      weather: Mapping[str, Sequence],
+                      duration_hours: int,
+                      n_members: int = 50,
+                      perturbation: Optional[WeatherPerturbation] = None,
+                      seed: Optional[int] = None,
+                      step_minutes: float = 60.0,
+                      max_workers: Optional[int] = None,
+                      pool: Optional[EnsemblePool] = None) -> BurnProbabilityResult:
+    """Run a perturbed-weather ensemble and return per-cell burn probabilities.
+
+    Args:
+        grid: Fuel raster to burn.
+        ignition: Ignition (lat, lng).
+        weather: Forecast columns as accepted by ``FireSpreadSimulator.head_fire_rates``.
+        duration_hours: Length of each member's run.
+        n_members: Number of ensemble members.
+        perturbation: Forecast error distribution; defaults to WeatherPerturbation().
+        seed: Seed for the member draws. Results do not depend on ``max_workers``.
+        step_minutes: Weather step length.
+        max_workers: Worker processes of a pool created for this call; defaults to
+            the CPU count. 1 runs in-process. Ignored when ``pool`` is given.
+        pool: Shared pool to run the members on, e.g. ``ensemble_pool``.
+    """
+    if n_members < 1:
+        raise ValueError("n_members must be at least 1")
+    grid.cell_index(*ignition)  # fail fast on ignitions outside the grid
+    members = perturb_weather(weather, n_members, perturbation, seed)
+    max_workers = min(max_workers or os.cpu_count() or 1, n_members)
+
+    counts = np.zeros(grid.shape, dtype=np.int32)
+    areas = np.empty(n_members)
+    runs = _run_members(grid, ignition, members, duration_hours, step_minutes,
+                        max_workers, pool)
+    for i, (box, burned) in enumerate(runs):
+        if box is not None:
+            r0, r1, c0, c1 = box
+            counts[r0:r1, c0:c1] += burned
+        areas[i] = np.count_nonzero(burned) * grid.cell_area_acres
+
+    return BurnProbabilityResult(
+        probability=(counts / n_members).astype(np.float32),
+        member_areas_acres=areas,
+        grid=grid
+    )
+
+
+def _run_members(grid: FuelGrid,
+                 ignition: Tuple[float, float],
+                 members: List[Dict[str, np.ndarray]],
+                 duration_hours: int,
+                 step_minutes: float,
+                 max_workers: int,
+                 pool: Optional[EnsemblePool] = None):
+    """Yield each member's burned window, in member order."""
+    if pool is None and max_workers == 1:
+        simulator = FireSpreadSimulator(grid)
+        for member in members:
+            yield _burned_window(simulator, ignition, member, duration_hours, step_minutes)
+        return
+
+    classes = np.ascontiguousarray(grid.classes)
+    shm = shared_memory.SharedMemory(create=True, size=max(classes.nbytes, 1))
+    executor: Optional[Executor] = None
+    try:
+        np.ndarray(classes.shape, dtype=classes.dtype, buffer=shm.buf)[:] = classes
+        grid_spec = (shm.name, classes.shape, classes.dtype.str, grid.compositions, grid.bounds)
+        if pool is not None:
+            runner = pool.start()
+        else:
+            runner = executor = _spawn_executor(max_workers)
+        yield from runner.map(_run_member, repeat(grid_spec), repeat(ignition), members,
+                              repeat(duration_hours), repeat(step_minutes))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+        shm.close()
+        shm.unlink()
+
+
+def _spawn_executor(max_workers: int) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=get_context('spawn'))
+
+
+def _attached_simulator(grid_spec: Tuple) -> FireSpreadSimulator:
+    """Simulator over the shared fuel raster named in ``grid_spec``, attached once per worker."""
+    shm_name, shape, dtype, compositions, bounds = grid_spec
+    if shm_name in _worker:
+        _worker.move_to_end(shm_name)
+        return _worker[shm_name][1]
+    shm = shared_memory.SharedMemory(name=shm_name)
+    classes = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    simulator = FireSpreadSimulator(FuelGrid(classes, compositions, dict(bounds)))
+    _worker[shm_name] = (shm, simulator)
+    while len(_worker) > WORKER_GRID_CACHE:
+        stale_shm, stale_simulator = _worker.popitem(last=False)[1]
+        del stale_simulator  # releases the view so the mapping can close
+        stale_shm.close()
+    return simulator
+
+
+def _run_member(grid_spec: Tuple,
+                ignition: Tuple[float, float],
+                weather: Dict[str, np.ndarray],
+                duration_hours: int,
+                step_minutes: float):
+    return _burned_window(_attached_simulator(grid_spec), ignition, weather,
+                          duration_hours, step_minutes)
+
+
+def _burned_window(simulator: FireSpreadSimulator,
+                   ignition: Tuple[float, float],
+                   weather: Mapping[str, Sequence],
+                   duration_hours: int,
+                   step_minutes: float):
+    """Bounding box of one member's burned cells and the boolean mask inside it."""
+    result = simulator.simulate(ignition, weather, duration_hours, step_minutes)
+    burned = np.isfinite(result.arrival_minutes)
+    box = _bounding_box(burned)
+    if box is None:
+        return None, np.zeros((0, 0), dtype=bool)
+    r0, r1, c0, c1 = box
+    return box, burned[r0:r1, c0:c1]
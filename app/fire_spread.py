@@ -0,0 +1,444 @@
+"""Grid-based fire spread simulation for the Pine Barrens.
+
+Implements a minimum-travel-time spread engine over a fuel-class raster. Per-cell
+head-fire rates come from FirefighterBill's spread-rate model, shaped into an
+elliptical spread pattern by wind speed and scaled by the terrain influence of
+the wind direction. Arrival times are relaxed across a 16-neighbour stencil with
+NumPy, one weather step at a time, restricted to the active part of the grid.
+
+The stencil resolves bearings only as finely as its directions lie apart (about 41
+degrees around east-west on the default Pinelands grid, whose cells are taller than
+they are wide), while a strong wind's ellipse is narrower than that. Each stencil
+direction therefore stands for the sector of bearings nearest to it, and the
+ellipse is kept wide enough to spread across the widest sector; otherwise a wind
+blowing between two stencil bearings would barely move the fire.
+"""
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import rasterio
+from rasterio.features import shapes
+from rasterio.transform import from_bounds
+from rasterio.windows import Window, transform as window_transform
+from shapely.geometry import mapping, shape
+from shapely.ops import unary_union
+
+from .config import PINE_BARRENS
+from .firefighter_bill import FirefighterBill, VegetationType, build_fuel_composition
+
+FEET_PER_DEGREE_LAT = 364000.0
+SQUARE_FEET_PER_ACRE = 43560.0
+METERS_PER_SECOND_PER_MPH = 0.44704
+COMPASS_POINTS = ['N', 'NE', 'E', 'SE', 'S', 'SW', 'W', 'NW']
+
+# Dead fuel moisture (%) the FirefighterBill rates are calibrated for, and the
+# moisture of extinction for Pinelands litter and shrub fuels
+REFERENCE_FUEL_MOISTURE = 6.0
+MOISTURE_OF_EXTINCTION = 25.0
+
+# 16-neighbour stencil as (row, col) offsets; rows increase southward. The knight's-move
+# offsets keep elongated wind-driven ellipses from collapsing onto the grid axes.
+NEIGHBOUR_OFFSETS = [
+    (-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1),
+    (-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1),
+]
+STENCIL_REACH = 2
+# Bearings sampled across each stencil direction's sector
+SECTOR_SAMPLES = 33
+
+
+def _crossed_cells(dr: int, dc: int) -> List[Tuple[int, int]]:
+    """Offsets (relative to the source) of the cells a knight's move passes between."""
+    if abs(dr) == 2:
+        return [(dr // 2, 0), (dr // 2, dc)]
+    if abs(dc) == 2:
+        return [(0, dc // 2), (dr, dc // 2)]
+    return []
+
+
+# Default Pinelands fuel: Pine-Scrub Oak mix
+PINE_SCRUB_FUELS = [VegetationType.PITCH_PINE, VegetationType.SCRUB_OAK]
+
+
+def degrees_to_compass(degrees: float) -> str:
+    """Convert a bearing in degrees to the nearest 8-point compass direction."""
+    return COMPASS_POINTS[int(((degrees % 360) + 22.5) // 45) % 8]
+
+
+def moisture_damping(fuel_moisture: np.ndarray) -> np.ndarray:
+    """Rothermel moisture damping coefficient for a dead fuel moisture in percent."""
+    ratio = np.clip(np.asarray(fuel_moisture, dtype=np.float64) / MOISTURE_OF_EXTINCTION, 0.0, 1.0)
+    return np.clip(1 - 2.59 * ratio + 5.11 * ratio ** 2 - 3.52 * ratio ** 3, 0.0, 1.0)
+
+
+def length_to_breadth_ratio(wind_speed: np.ndarray) -> np.ndarray:
+    """Fire ellipse length-to-breadth ratio for a wind speed in mph (Anderson, 1983)."""
+    wind_ms = wind_speed * METERS_PER_SECOND_PER_MPH
+    ratio = 0.936 * np.exp(0.2566 * wind_ms) + 0.461 * np.exp(-0.1548 * wind_ms) - 0.397
+    return np.clip(ratio, 1.0, 8.0)
+
+
+@dataclass
+class FuelGrid:
+    """Raster of fuel classes covering a lat/lng bounding box.
+
+    ``classes`` indexes rows of ``compositions`` (a fuel-composition matrix as used by
+    ``FirefighterBill.predict_fire_behavior_batch``); negative classes are non-burnable.
+    Row 0 is the northern edge.
+    """
+    classes: np.ndarray
+    compositions: np.ndarray
+    bounds: Dict[str, float]
+
+    @classmethod
+    def pinelands(cls,
+                  shape: Tuple[int, int] = (1000, 1000),
+                  fuel_types: Sequence[VegetationType] = PINE_SCRUB_FUELS) -> 'FuelGrid':
+        """Uniform fuel raster over the Pine Barrens bounds."""
+        return cls(
+            classes=np.zeros(shape, dtype=np.int16),
+            compositions=build_fuel_composition([list(fuel_types)]),
+            bounds=dict(PINE_BARRENS['bounds'])
+        )
+
+    @classmethod
+    def from_geotiff(cls,
+                     path: Path,
+                     fuel_classes: Sequence[Sequence[VegetationType]]) -> 'FuelGrid':
+        """Load a single-band EPSG:4326 fuel-class GeoTIFF.
+
+        Pixel values index ``fuel_classes``; nodata and negative pixels are non-burnable.
+        """
+        with rasterio.open(path) as src:
+            classes = src.read(1).astype(np.int16)
+            if src.nodata is not None:
+                classes[src.read(1) == src.nodata] = -1
+            bounds = {'north': src.bounds.top, 'south': src.bounds.bottom,
+                      'east': src.bounds.right, 'west': src.bounds.left}
+        classes[classes >= len(fuel_classes)] = -1
+        return cls(classes=classes, compositions=build_fuel_composition(fuel_classes),
+                   bounds=bounds)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.classes.shape
+
+    @property
+    def transform(self):
+        """Affine transform from pixel to lng/lat coordinates."""
+        rows, cols = self.shape
+        b = self.bounds
+        return from_bounds(b['west'], b['south'], b['east'], b['north'], cols, rows)
+
+    @property
+    def cell_size_ft(self) -> Tuple[float, float]:
+        """Cell (height, width) in feet."""
+        rows, cols = self.shape
+        b = self.bounds
+        mid_lat = np.radians((b['north'] + b['south']) / 2)
+        height = (b['north'] - b['south']) / rows * FEET_PER_DEGREE_LAT
+        width = (b['east'] - b['west']) / cols * FEET_PER_DEGREE_LAT * np.cos(mid_lat)
+        return float(height), float(width)
+
+    @property
+    def cell_area_acres(self) -> float:
+        height, width = self.cell_size_ft
+        return height * width / SQUARE_FEET_PER_ACRE
+
+    def cell_centers(self, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitude and longitude of cell centres."""
+        b = self.bounds
+        n_rows, n_cols = self.shape
+        lat = b['north'] - (np.asarray(rows) + 0.5) * (b['north'] - b['south']) / n_rows
+        lng = b['west'] + (np.asarray(cols) + 0.5) * (b['east'] - b['west']) / n_cols
+        return lat, lng
+
+    def cell_index(self, lat: float, lng: float) -> Tuple[int, int]:
+        """Row and column of the cell containing a point."""
+        b = self.bounds
+        rows, cols = self.shape
+        if not (b['south'] <= lat <= b['north'] and b['west'] <= lng <= b['east']):
+            raise ValueError(f"Point ({lat}, {lng}) is outside the fuel grid")
+        row = min(int((b['north'] - lat) / (b['north'] - b['south']) * rows), rows - 1)
+        col = min(int((lng - b['west']) / (b['east'] - b['west']) * cols), cols - 1)
+        return row, col
+
+
+@dataclass
+class SpreadStep:
+    """Cells that ignited during one simulation step (the perimeter delta)."""
+    time_step: int  # 1-based
+    end_minutes: float
+    rows: np.ndarray
+    cols: np.ndarray
+    arrival_minutes: np.ndarray  # float32, one entry per ignited cell
+
+    def to_dict(self, grid: FuelGrid) -> Dict:
+        """JSON-ready step with ignited cells as [lat, lng, arrivalMinutes] triples."""
+        lat, lng = grid.cell_centers(self.rows, self.cols)
+        cells = np.column_stack([lat.round(6), lng.round(6), self.arrival_minutes.round(1)])
+        return {
+            'type': 'step',
+            'timeStep': self.time_step,
+            'arrivalMinutes': self.end_minutes,
+            'ignitedCells': len(self.rows),
+            'cells': cells.tolist()
+        }
+
+
+@dataclass
+class SpreadResult:
+    """Arrival-time field of a completed spread simulation."""
+    arrival_minutes: np.ndarray  # float32, inf where the fire never arrived
+    step_minutes: float
+    n_steps: int
+    grid: FuelGrid
+
+    @property
+    def cell_area_acres(self) -> float:
+        return self.grid.cell_area_acres
+
+    def burned_area_acres(self, minutes: Optional[float] = None) -> float:
+        """Area burned by the given time (defaults to the end of the run)."""
+        minutes = self.step_minutes * self.n_steps if minutes is None else minutes
+        return float(np.count_nonzero(self.arrival_minutes <= minutes) * self.cell_area_acres)
+
+    def isochrones(self) -> Dict:
+        """Fire perimeters at the end of each step as a GeoJSON FeatureCollection."""
+        features = []
+        burned = np.isfinite(self.arrival_minutes)
+        if not burned.any():
+            return {'type': 'FeatureCollection', 'features': features}
+        rows = np.flatnonzero(burned.any(axis=1))
+        cols = np.flatnonzero(burned.any(axis=0))
+        window = Window(cols[0], rows[0], cols[-1] - cols[0] + 1, rows[-1] - rows[0] + 1)
+        arrival = self.arrival_minutes[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+        transform = window_transform(window, self.grid.transform)
+        for step in range(1, self.n_steps + 1):
+            minutes = step * self.step_minutes
+            mask = arrival <= minutes
+            if not mask.any():
+                continue
+            features.append({
+                'type': 'Feature',
+                'geometry': polygonize_mask(mask, transform),
+                'properties': {
+                    'timeStep': step,
+                    'arrivalMinutes': minutes,
+                    'areaAcres': float(np.count_nonzero(mask) * self.cell_area_acres)
+                }
+            })
+        return {'type': 'FeatureCollection', 'features': features}
+
+
+class FireSpreadSimulator:
+    """Minimum-travel-time fire spread over a FuelGrid."""
+
+    def __init__(self, grid: FuelGrid, bill: Optional[FirefighterBill] = None):
+        self.grid = grid
+        self.bill = bill or FirefighterBill()
+        height, width = grid.cell_size_ft
+        offsets = np.array(NEIGHBOUR_OFFSETS, dtype=np.float64)
+        self._distances = np.hypot(offsets[:, 0] * height, offsets[:, 1] * width)
+        # Travel time along an edge averages the inverse rates of every cell it crosses
+        self._crossed = [_crossed_cells(dr, dc) for dr, dc in NEIGHBOUR_OFFSETS]
+        self._cells_per_edge = np.array([2 + len(c) for c in self._crossed], dtype=np.float64)
+        # Bearing of each neighbour offset between cell centres, clockwise from north
+        self._bearings = np.degrees(np.arctan2(offsets[:, 1] * width, -offsets[:, 0] * height))
+        # Sector of each direction: halfway to the neighbouring stencil bearing on either side
+        order = np.argsort(self._bearings)
+        ordered = self._bearings[order]
+        gaps = np.diff(np.append(ordered, ordered[0] + 360))
+        after, before = np.empty_like(gaps), np.empty_like(gaps)
+        after[order], before[order] = gaps, np.roll(gaps, 1)
+        fraction = np.linspace(0.0, 1.0, SECTOR_SAMPLES)
+        self._sector_bearings = (self._bearings[:, None] - before[:, None] / 2
+                                 + fraction * (before + after)[:, None] / 2)
+        self._sector_cosines = np.cos(np.radians(self._sector_bearings - self._bearings[:, None]))
+        # Narrowest ellipse that still spreads at half its head rate halfway across the
+        # widest gap between stencil bearings
+        self.max_eccentricity = 1 / (2 - np.cos(np.radians(gaps.max() / 2)))
+
+    def head_fire_rates(self, weather: Mapping[str, Sequence], n_steps: int) -> np.ndarray:
+        """Head-fire spread rate (ft/min) per step and fuel class, shape (n_steps, n_classes).
+
+        Weather columns follow ``predict_fire_behavior_batch`` except that
+        ``wind_direction`` is a bearing in degrees (the direction the wind blows from).
+        An optional ``fuel_moisture`` column (1-hour dead fuel moisture, %) damps the
+        rates relative to REFERENCE_FUEL_MOISTURE. Columns hold one value per step, or
+        a single value for the whole run.
+        """
+        n_classes = len(self.grid.compositions)
+        columns = {
+            name: np.broadcast_to(np.asarray(weather[name], dtype=np.float64), (n_steps,))
+            for name in ['temperature', 'humidity', 'wind_speed', 'wind_direction', 'drought_index']
+        }
+        compass = np.array([degrees_to_compass(d) for d in columns['wind_direction']])
+        rows = {name: np.repeat(values, n_classes) for name, values in columns.items()}
+        rows['wind_direction'] = np.repeat(compass, n_classes)
+        behavior = self.bill.predict_fire_behavior_batch(
+            rows, np.tile(self.grid.compositions, (n_steps, 1))
+        )
+        terrain = np.array([self.bill._calculate_terrain_influence(d) for d in compass])
+        if 'fuel_moisture' in weather:
+            moisture = np.broadcast_to(np.asarray(weather['fuel_moisture'], dtype=np.float64),
+                                       (n_steps,))
+            damping = moisture_damping(moisture) / moisture_damping(REFERENCE_FUEL_MOISTURE)
+            terrain = terrain * damping
+        return behavior.spread_rate.reshape(n_steps, n_classes) * terrain[:, None]
+
+    def directional_factors(self, wind_speed: float, wind_direction: float) -> np.ndarray:
+        """Fraction of the head-fire rate achieved toward each neighbour.
+
+        Uses the polar form of an ellipse with the ignition at its rear focus, so the
+        rate is 1 in the downwind direction and (1 - e) / (1 + e) directly upwind.
+        Each neighbour gets the fastest ellipse rate in its sector projected onto its
+        own bearing, so a head between two stencil bearings still drives both, and
+        the eccentricity is capped at ``max_eccentricity``.
+        """
+        ratio = length_to_breadth_ratio(np.float64(wind_speed))
+        eccentricity = min(np.sqrt(ratio ** 2 - 1) / ratio, self.max_eccentricity)
+        heading = (wind_direction + 180) % 360
+        theta = np.radians(self._sector_bearings - heading)
+        rates = (1 - eccentricity) / (1 - eccentricity * np.cos(theta))
+        return (rates * self._sector_cosines).max(axis=1)
+
+    def simulate(self,
+                 ignition: Tuple[float, float],
+                 weather: Mapping[str, Sequence],
+                 duration_hours: int,
+                 step_minutes: float = 60.0) -> SpreadResult:
+        """Spread a fire from an ignition (lat, lng) point for the given duration."""
+        n_steps = int(round(duration_hours * 60 / step_minutes))
+        arrival = None
+        for arrival, _, _ in self._propagate(ignition, weather, n_steps, step_minutes):
+            pass
+        if arrival is None:
+            arrival = self._initial_arrival(ignition)
+        return SpreadResult(
+            arrival_minutes=arrival.astype(np.float32),
+            step_minutes=step_minutes,
+            n_steps=n_steps,
+            grid=self.grid
+        )
+
+    def iter_steps(self,
+                   ignition: Tuple[float, float],
+                   weather: Mapping[str, Sequence],
+                   duration_hours: int,
+                   step_minutes: float = 60.0) -> Iterator[SpreadStep]:
+        """Run a simulation lazily, yielding only the cells that ignited in each step."""
+        n_steps = int(round(duration_hours * 60 / step_minutes))
+        propagation = self._propagate(ignition, weather, n_steps, step_minutes)
+        for step, (arrival, rows, cols) in enumerate(propagation, start=1):
+            yield SpreadStep(
+                time_step=step,
+                end_minutes=step * step_minutes,
+                rows=rows,
+                cols=cols,
+                arrival_minutes=arrival[rows, cols].astype(np.float32)
+            )
+
+    def _initial_arrival(self, ignition: Tuple[float, float]) -> np.ndarray:
+        arrival = np.full(self.grid.shape, np.inf)
+        row, col = self.grid.cell_index(*ignition)
+        if self.grid.classes[row, col] >= 0:
+            arrival[row, col] = 0.0
+        return arrival
+
+    def _propagate(self,
+                   ignition: Tuple[float, float],
+                   weather: Mapping[str, Sequence],
+                   n_steps: int,
+                   step_minutes: float) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """Advance the arrival-time field step by step.
+
+        Yields the (shared, updated in place) arrival array and the row and column
+        indices of the cells that ignited during the step.
+        """
+        arrival = self._initial_arrival(ignition)
+        if n_steps <= 0:
+            return
+        classes = self.grid.classes
+        burnable = classes >= 0
+        rates = self.head_fire_rates(weather, n_steps)
+        wind_speed = np.broadcast_to(np.asarray(weather['wind_speed'], dtype=np.float64),
+                                     (n_steps,))
+        wind_direction = np.broadcast_to(np.asarray(weather['wind_direction'], dtype=np.float64),
+                                         (n_steps,))
+
+        for step in range(n_steps):
+            t_start, t_end = step * step_minutes, (step + 1) * step_minutes
+            with np.errstate(divide='ignore'):
+                inverse_rate = np.where(burnable, 1.0 / rates[step][np.maximum(classes, 0)], np.inf)
+            # Edge travel time per unit of summed inverse rate, per neighbour direction
+            edge_cost = (self._distances / self._cells_per_edge
+                         / self.directional_factors(wind_speed[step], wind_direction[step]))
+
+            window = _bounding_box(np.isfinite(arrival), margin=STENCIL_REACH)
+            while window is not None:
+                r0, r1, c0, c1 = window
+                sub = arrival[r0:r1, c0:c1]
+                inv = inverse_rate[r0:r1, c0:c1]
+                changed = np.zeros(sub.shape, dtype=bool)
+                for (dr, dc), crossed, cost in zip(NEIGHBOUR_OFFSETS, self._crossed, edge_cost):
+                    target = _offset_view(sub, dr, dc, 0, 0)
+                    inv_sum = _offset_view(inv, dr, dc, 0, 0) + _offset_view(inv, dr, dc, -dr, -dc)
+                    for mr, mc in crossed:
+                        inv_sum = inv_sum + _offset_view(inv, dr, dc, mr - dr, mc - dc)
+                    candidate = _offset_view(sub, dr, dc, -dr, -dc) + cost * inv_sum
+                    better = (candidate < target) & (candidate <= t_end)
+                    np.copyto(target, candidate, where=better)
+                    _offset_view(changed, dr, dc, 0, 0)[better] = True
+                box = _bounding_box(changed)
+                window = None if box is None else (
+                    max(r0 + box[0] - STENCIL_REACH, 0),
+                    min(r0 + box[1] + STENCIL_REACH, arrival.shape[0]),
+                    max(c0 + box[2] - STENCIL_REACH, 0),
+                    min(c0 + box[3] + STENCIL_REACH, arrival.shape[1])
+                )
+
+            box = _bounding_box(np.isfinite(arrival))
+            if box is None:
+                yield arrival, np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+                continue
+            r0, r1, c0, c1 = box
+            sub = arrival[r0:r1, c0:c1]
+            ignited = sub <= t_end
+            if step > 0:
+                ignited &= sub > t_start
+            rows, cols = np.nonzero(ignited)
+            yield arrival, rows + r0, cols + c0
+
+
+def polygonize_mask(mask: np.ndarray, transform) -> Dict:
+    """Dissolve the True cells of ``mask`` into one GeoJSON (Multi)Polygon geometry."""
+    polygons = [
+        shape(geom) for geom, _ in shapes(mask.astype(np.uint8), mask=mask, transform=transform)
+    ]
+    return mapping(unary_union(polygons))
+
+
+def _offset_view(array: np.ndarray, dr: int, dc: int, r: int, c: int) -> np.ndarray:
+    """View of the cells at (r, c) from every target of an edge with offset (dr, dc).
+
+    Targets are the cells whose source (target - (dr, dc)) lies inside ``array``;
+    ``(0, 0)`` selects the targets themselves and ``(-dr, -dc)`` their sources.
+    """
+    rows, cols = array.shape
+    r_start, c_start = max(dr, 0) + r, max(dc, 0) + c
+    return array[r_start:r_start + rows - abs(dr), c_start:c_start + cols - abs(dc)]
+
+
+def _bounding_box(mask: np.ndarray, margin: int = 0) -> Optional[Tuple[int, int, int, int]]:
+    """Row/column slice bounds of the True cells in ``mask``, grown by ``margin``."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return (
+        max(rows[0] - margin, 0), min(rows[-1] + 1 + margin, mask.shape[0]),
+        max(cols[0] - margin, 0), min(cols[-1] + 1 + margin, mask.shape[1])
+    )
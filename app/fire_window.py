@@ -0,0 +1,369 @@
+"""Fire-window classifiers: daily weather features, fire labels and background training.
+
+Training jobs run in a process pool so request handlers never fit models. A job is
+identified by its (start_date, end_date, label_window); its trained models and
+classification reports are stored under ``FIRE_WINDOW_JOB_DIR/<job_id>`` and reused
+by any later request for the same window. When a job finishes, its models are also
+copied to ``FIRE_WINDOW_MODEL_DIR`` and reloaded by the model registry, so the most
+recently finished job is the one ``POST /api/v1/predict_fire_window`` serves.
+"""
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import CancelledError, Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import classification_report
+from sklearn.model_selection import train_test_split
+
+from .config import (
+    BOUNDARY_PATH,
+    DATA_DIR,
+    FIRE_WINDOW_JOB_DIR,
+    FIRE_WINDOW_JOB_WORKERS,
+    FIRE_WINDOW_MAX_PENDING_JOBS,
+    FIRE_WINDOW_MODEL_DIR,
+)
+from .data_processing.data_loader import DataLoader, SourceUnavailable, load_sources
+from .logger import logger
+from .model_registry import (
+    FIRE_WINDOW_FEATURES,
+    ModelRegistry,
+    load_boundary,
+    registry,
+    save_fire_window_models,
+)
+
+RESULT_FILE = 'result.json'
+
+
+def daily_weather(env: pd.DataFrame, dates: pd.DatetimeIndex) -> pd.DataFrame:
+    """Mean of each weather feature per day on ``dates``; days without observations are NaN."""
+    if env.empty:
+        return pd.DataFrame(np.nan, index=dates, columns=FIRE_WINDOW_FEATURES)
+    days = pd.to_datetime(env["date"]).dt.normalize()
+    return env.groupby(days)[FIRE_WINDOW_FEATURES].mean().reindex(dates)
+
+
+def fire_window_labels(dates: pd.DatetimeIndex, fire_dates: pd.Series,
+                       label_window: int) -> np.ndarray:
+    """1 for each date with a fire discovered in [date, date + label_window days), else 0."""
+    fires = np.sort(pd.to_datetime(fire_dates).dropna().to_numpy().astype("datetime64[D]"))
+    days = dates.to_numpy().astype("datetime64[D]")
+    # Count of fires before the window end minus count before its start
+    first = np.searchsorted(fires, days, side="left")
+    end = np.searchsorted(fires, days + np.timedelta64(label_window, "D"), side="left")
+    return (end > first).astype(int)
+
+
+def fire_window_dataset(dl: DataLoader, boundary, start_date, end_date,
+                        label_window: int) -> pd.DataFrame:
+    """Daily weather features and fire labels over the window, one bulk weather fetch."""
+    dates = pd.date_range(start_date, end_date, freq="D").normalize()
+    if dates.empty:
+        return pd.DataFrame(columns=FIRE_WINDOW_FEATURES + ["label"])
+    fires = dl._download_fire_history(boundary, dates[0].year - 1, dates[-1].year)
+    env = dl.load_environmental_data(tuple(boundary.total_bounds), dates[0], dates[-1])
+    return _window_frame(dates, env, fires, label_window)
+
+
+async def fire_window_dataset_async(dl: DataLoader, boundary, start_date, end_date,
+                                    label_window: int,
+                                    timeouts: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """fire_window_dataset for request handlers: fire history and weather load concurrently."""
+    dates = pd.date_range(start_date, end_date, freq="D").normalize()
+    if dates.empty:
+        return pd.DataFrame(columns=FIRE_WINDOW_FEATURES + ["label"])
+    sources, errors = await load_sources(dl, {
+        'fires': ('_download_fire_history', (boundary, dates[0].year - 1, dates[-1].year)),
+        'weather': ('load_environmental_data', (tuple(boundary.total_bounds), dates[0], dates[-1])),
+    }, timeouts)
+    if errors:
+        raise SourceUnavailable("; ".join(f"{name}: {reason}" for name, reason in errors.items()))
+    return _window_frame(dates, sources['weather'], sources['fires'], label_window)
+
+
+def _window_frame(dates: pd.DatetimeIndex, env: pd.DataFrame, fires: pd.DataFrame,
+                  label_window: int) -> pd.DataFrame:
+    df = daily_weather(env, dates)
+    df["label"] = fire_window_labels(dates, fires["discovery_date"], label_window)
+    return df.dropna()
+
+
+def fire_window_classifiers() -> Dict[str, Any]:
+    """Untrained RandomForest, LightGBM and CatBoost classifiers."""
+    # Imported lazily: the boosting libraries are only needed where models are fit
+    from sklearn.ensemble import RandomForestClassifier
+    from lightgbm import LGBMClassifier
+    from catboost import CatBoostClassifier
+    return {
+        'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
+        'LightGBM': LGBMClassifier(random_state=42),
+        'CatBoost': CatBoostClassifier(verbose=0, random_state=42, allow_writing_files=False)
+    }
+
+
+def fit_fire_window_classifiers(X: pd.DataFrame, y: pd.Series,
+                                classifiers: Optional[Dict[str, Any]] = None
+                                ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Fit each classifier on a 70/30 split; returns (trained models, test reports)."""
+    classifiers = fire_window_classifiers() if classifiers is None else classifiers
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+    trained, reports = {}, {}
+    if y_train.nunique() < 2:
+        logger.warning("Skipping fire-window training: only one class in training labels")
+        return trained, reports
+    for name, model in classifiers.items():
+        try:
+            model.fit(X_train, y_train)
+        except Exception as e:
+            logger.warning(f"Error training {name}: {e}")
+            continue
+        trained[name] = model
+        reports[name] = classification_report(y_test, model.predict(X_test), output_dict=True,
+                                              zero_division=0)
+    return trained, reports
+
+
+def train_fire_window_job(start_date: str, end_date: str, label_window: int, artifact_dir: str,
+                          data_dir: str = str(DATA_DIR),
+                          boundary_path: str = str(BOUNDARY_PATH)) -> Dict[str, Any]:
+    """Worker entry point: fit the classifiers on one window and store models and reports."""
+    boundary = load_boundary(Path(boundary_path))
+    df = fire_window_dataset(DataLoader(Path(data_dir)), boundary, start_date, end_date,
+                             label_window)
+    if df.empty:
+        raise ValueError("No environmental data for given window.")
+    trained, reports = fit_fire_window_classifiers(df[FIRE_WINDOW_FEATURES], df["label"])
+    if not trained:
+        raise ValueError("Training window needs both fire and no-fire days.")
+    artifact_dir = Path(artifact_dir)
+    save_fire_window_models(trained, artifact_dir)
+    result = {'start_date': start_date, 'end_date': end_date, 'label_window': label_window,
+              'reports': reports, 'finished_at': datetime.now().isoformat()}
+    (artifact_dir / RESULT_FILE).write_text(json.dumps(result))
+    return result
+
+
+class JobQueueFull(RuntimeError):
+    """Raised when the number of queued and running jobs is at its bound."""
+
+
+@dataclass
+class FireWindowJob:
+    job_id: str
+    start_date: str
+    end_date: str
+    label_window: int
+    status: str = 'queued'  # queued, running, completed or failed
+    submitted_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    reports: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def pending(self) -> bool:
+        return self.status in ('queued', 'running')
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'label_window': self.label_window,
+            'status': self.status,
+            'submitted_at': self.submitted_at,
+            'finished_at': self.finished_at,
+            'reports': self.reports,
+            'error': self.error
+        }
+
+
+class FireWindowJobManager:
+    """Submits training jobs to a bounded process pool and keeps their results."""
+
+    def __init__(self,
+                 artifact_dir: Path = FIRE_WINDOW_JOB_DIR,
+                 max_workers: int = FIRE_WINDOW_JOB_WORKERS,
+                 max_pending: int = FIRE_WINDOW_MAX_PENDING_JOBS,
+                 train_fn: Callable[..., Dict[str, Any]] = train_fire_window_job,
+                 executor_factory: Optional[Callable[[int], Executor]] = None,
+                 data_dir: Path = DATA_DIR,
+                 boundary_path: Path = BOUNDARY_PATH,
+                 model_dir: Optional[Path] = FIRE_WINDOW_MODEL_DIR,
+                 model_registry: Optional[ModelRegistry] = registry):
+        self.artifact_dir = Path(artifact_dir)
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.train_fn = train_fn
+        # Spawned, not forked: the parent runs the event loop and the shared pools' threads
+        self.executor_factory = executor_factory or (
+            lambda n: ProcessPoolExecutor(max_workers=n, mp_context=get_context('spawn')))
+        self.data_dir = data_dir
+        self.boundary_path = boundary_path
+        # Where finished jobs' models are promoted to (None: keep them as job artifacts only)
+        self.model_dir = None if model_dir is None else Path(model_dir)
+        self.model_registry = model_registry
+        self._executor: Optional[Executor] = None
+        self._jobs: Dict[str, FireWindowJob] = {}
+        # Reentrant: status queries settle finished jobs while holding it
+        self._lock = threading.RLock()
+        # Completed jobs whose models are not promoted yet. Promotion copies files and
+        # reloads the registry, so it runs under its own lock, never the one above
+        self._unpromoted: List[FireWindowJob] = []
+        self._promote_lock = threading.Lock()
+
+    @staticmethod
+    def job_id(start_date: date, end_date: date, label_window: int) -> str:
+        key = f"{start_date.isoformat()}|{end_date.isoformat()}|{label_window}"
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def submit(self, start_date: datetime, end_date: datetime, label_window: int) -> FireWindowJob:
+        """Queue training for the window, or return the job already covering it."""
+        start, end = pd.Timestamp(start_date).date(), pd.Timestamp(end_date).date()
+        job_id = self.job_id(start, end, label_window)
+        with self._lock:
+            job = self._jobs.get(job_id) or self._stored(job_id)
+            if job is not None and job.status != 'failed':
+                return job
+            if self._pending_count() >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} fire-window jobs already queued or running")
+            job = FireWindowJob(job_id, start.isoformat(), end.isoformat(), label_window,
+                                submitted_at=datetime.now().isoformat())
+            self._jobs[job_id] = job
+            job.future = self._get_executor().submit(
+                self.train_fn, job.start_date, job.end_date, label_window,
+                str(self.artifact_dir / job_id), str(self.data_dir), str(self.boundary_path)
+            )
+            logger.info(f"Submitted fire-window job {job_id} for {job.start_date}..{job.end_date}")
+        # Added after releasing the lock: a job that is already done runs it right here
+        job.future.add_done_callback(partial(self._on_done, job))
+        return job
+
+    def get(self, job_id: str) -> Optional[FireWindowJob]:
+        """The job with its current status, including completed jobs from earlier processes."""
+        with self._lock:
+            job = self._jobs.get(job_id) or self._stored(job_id)
+            if job is not None:
+                self._refresh(job)
+        self._promote_finished()
+        return job
+
+    def pending_count(self) -> int:
+        count = self._pending_count()
+        self._promote_finished()
+        return count
+
+    def _pending_count(self) -> int:
+        with self._lock:
+            for job in self._jobs.values():
+                self._refresh(job)
+            return sum(job.pending for job in self._jobs.values())
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, cancelling queued jobs; a later ``submit`` starts a new one."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = self.executor_factory(self.max_workers)
+        return self._executor
+
+    def _refresh(self, job: FireWindowJob) -> None:
+        # The done callback can lag behind the future itself, so settle finished jobs here too
+        if job.future is None or not job.pending:
+            return
+        if job.future.done():
+            self._finish(job, job.future)
+        elif job.future.running():
+            job.status = 'running'
+
+    def _on_done(self, job: FireWindowJob, future: Future) -> None:
+        self._finish(job, future)
+        self._promote_finished()
+
+    def _finish(self, job: FireWindowJob, future: Future) -> None:
+        with self._lock:
+            if not job.pending:
+                return
+            try:
+                result = future.result()
+                job.reports = result['reports']
+                job.finished_at = result['finished_at']
+                job.status = 'completed'
+            except CancelledError:
+                job.error = 'cancelled at shutdown'
+                job.finished_at = datetime.now().isoformat()
+                job.status = 'failed'
+                return
+            except Exception as e:
+                job.error = str(e)
+                job.finished_at = datetime.now().isoformat()
+                job.status = 'failed'
+                logger.warning(f"Fire-window job {job.job_id} failed: {e}")
+                return
+            self._unpromoted.append(job)
+
+    def _promote_finished(self) -> None:
+        """Promote the models of jobs completed so far; call without holding ``_lock``."""
+        # Callers also wait here for a promotion another thread has under way
+        with self._promote_lock:
+            while True:
+                with self._lock:
+                    if not self._unpromoted:
+                        return
+                    job = self._unpromoted.pop(0)
+                self._promote(job)
+
+    def _promote(self, job: FireWindowJob) -> None:
+        """Serve the job's models: copy them to ``model_dir`` and reload the registry's."""
+        if self.model_dir is None:
+            return
+        sources = {path.name: path for path in (self.artifact_dir / job.job_id).glob('*.joblib')}
+        if not sources:
+            return
+        try:
+            self.model_dir.mkdir(parents=True, exist_ok=True)
+            for name, path in sources.items():
+                # Copied under a name the loader ignores, then swapped in atomically
+                part = self.model_dir / f'.{name}.part'
+                shutil.copyfile(path, part)
+                os.replace(part, self.model_dir / name)
+            # Models the job did not train came from an older window
+            for path in self.model_dir.glob('*.joblib'):
+                if path.name not in sources:
+                    path.unlink()
+        except OSError as e:
+            logger.warning(f"Could not promote fire-window job {job.job_id} models: {e}")
+            return
+        logger.info(f"Serving fire-window models of job {job.job_id} from {self.model_dir}")
+        if self.model_registry is not None:
+            self.model_registry.reload('fire_window_models')
+
+    def _stored(self, job_id: str) -> Optional[FireWindowJob]:
+        """Completed job from the result store, if a previous run saved one."""
+        path = self.artifact_dir / job_id / RESULT_FILE
+        if not path.exists():
+            return None
+        result = json.loads(path.read_text())
+        job = FireWindowJob(job_id, result['start_date'], result['end_date'],
+                            result['label_window'], status='completed',
+                            finished_at=result['finished_at'], reports=result['reports'])
+        self._jobs[job_id] = job
+        return job
+
+
+job_manager = FireWindowJobManager()
@@ -7,11 +7,15 @@ and firefighting tactics specific to this unique environment.
 """
 
 from dataclasses import dataclass
-from typing import List, Dict, Optional
+from pathlib import Path
+from typing import ClassVar, List, Dict, Optional, Mapping, Sequence, Tuple
 from enum import Enum
 import datetime
+import json
 import math
 
+import numpy as np
+
 class FuelModelType(Enum):
     """Standard and custom fuel models for the Pine Barrens."""
     # Standard fuel models
@@ -165,10 +169,165 @@ class FireBehaviorPrediction:
     spotting_distance: float  # miles
     containment_challenges: List[str]
 
+@dataclass
+class FireBehaviorBatchPrediction:
+    """Columnar fire behavior predictions, one entry per input row."""
+    spread_rate: np.ndarray        # feet per minute
+    flame_length: np.ndarray       # feet
+    intensity: np.ndarray          # BTU/ft/sec
+    spotting_distance: np.ndarray  # miles
+
+# Column order of fuel-composition matrices used by the batch API
+VEGETATION_INDEX: Dict[VegetationType, int] = {veg: i for i, veg in enumerate(VegetationType)}
+
+def build_fuel_composition(fuel_type_rows: Sequence[Sequence[VegetationType]]) -> np.ndarray:
+    """Convert per-row fuel type lists into a (n_rows, n_vegetation_types) count matrix."""
+    composition = np.zeros((len(fuel_type_rows), len(VEGETATION_INDEX)), dtype=np.float64)
+    for row, fuel_types in enumerate(fuel_type_rows):
+        for fuel_type in fuel_types:
+            composition[row, VEGETATION_INDEX[fuel_type]] += 1
+    return composition
+
+# Row order of per-fuel-model coefficient arrays; the extra trailing slot holds the
+# fallback used when no fuel model is specified (index -1 in the batch API)
+FUEL_MODEL_INDEX: Dict[FuelModelType, int] = {model: i for i, model in enumerate(FuelModelType)}
+
+@dataclass
+class FuelCoefficientTable:
+    """Dense per-fuel coefficients shared by the scalar, batch and grid fire behavior paths.
+
+    Vegetation arrays are indexed by ``VEGETATION_INDEX`` and fuel model arrays by
+    ``FUEL_MODEL_INDEX`` (plus a trailing unspecified-model slot), so every per-fuel
+    adjustment is a single array gather.
+    """
+    spread_adjustment: np.ndarray     # multiplicative spread-rate factor per vegetation type
+    fuel_load_adjustment: np.ndarray  # additive fuel load (lb/ft²) per vegetation type
+    heat_content: np.ndarray          # BTU/lb per vegetation type
+    base_fuel_load: np.ndarray        # lb/ft² per fuel model
+    max_fuel_load: np.ndarray         # lb/ft² per fuel model
+
+    _VEGETATION_FIELDS: ClassVar[Tuple[str, ...]] = ('spread_adjustment', 'fuel_load_adjustment',
+                                                     'heat_content')
+    _FUEL_MODEL_FIELDS: ClassVar[Tuple[str, ...]] = ('base_fuel_load', 'max_fuel_load')
+
+    @classmethod
+    def default(cls) -> 'FuelCoefficientTable':
+        """Build the table from the built-in Pine Barrens calibration."""
+        n_veg = len(VEGETATION_INDEX)
+        n_models = len(FUEL_MODEL_INDEX) + 1
+        table = cls(
+            spread_adjustment=np.ones(n_veg),
+            fuel_load_adjustment=np.zeros(n_veg),
+            heat_content=np.full(n_veg, 8000.0),  # Default for other vegetation
+            base_fuel_load=np.full(n_models, 1.0),
+            max_fuel_load=np.full(n_models, 3.0)
+        )
+        vegetation = {
+            # type: (spread adjustment, fuel load adjustment)
+            VegetationType.PITCH_PINE: (1.8, 2.5),            # High resin content, dense crown
+            VegetationType.VIRGINIA_PINE: (1.5, 2.2),         # Similar to Pitch Pine
+            VegetationType.POND_PINE: (1.3, 2.3),             # Intermediate pine loading
+            VegetationType.SHORTLEAF_PINE: (1.2, 2.0),        # Moderately high fuel load
+            VegetationType.ATLANTIC_WHITE_CEDAR: (1.5, 3.0),  # Very high fuel load when dry
+            # Oak species
+            VegetationType.SCRUB_OAK: (1.1, 1.2),             # Moderate fuel load
+            VegetationType.BLACKJACK_OAK: (1.2, 1.3),         # Similar to Scrub Oak
+            VegetationType.POST_OAK: (1.0, 1.1),              # Moderate fuel load
+            VegetationType.CHESTNUT_OAK: (1.3, 1.4),          # Higher fuel load
+            # Shrub species
+            VegetationType.BLUEBERRY_LOWBUSH: (0.8, 0.3),     # Low fuel load
+            VegetationType.BLUEBERRY_HIGHBUSH: (0.8, 0.3),
+            VegetationType.HUCKLEBERRY_BLACK: (0.9, 0.4),     # Low fuel load
+            VegetationType.HUCKLEBERRY_DANGLEBERRY: (0.9, 0.4),
+            VegetationType.MOUNTAIN_LAUREL: (1.2, 0.8),       # Higher shrub fuel load
+            VegetationType.SHEEP_LAUREL: (1.1, 0.6),          # Moderate shrub fuel load
+        }
+        for veg, (spread, load) in vegetation.items():
+            table.spread_adjustment[VEGETATION_INDEX[veg]] = spread
+            table.fuel_load_adjustment[VEGETATION_INDEX[veg]] = load
+        # High and moderate resin content
+        table.heat_content[VEGETATION_INDEX[VegetationType.PITCH_PINE]] = 9500
+        table.heat_content[VEGETATION_INDEX[VegetationType.SHORTLEAF_PINE]] = 9000
+
+        fuel_models = {
+            # model: (base load, max load)
+            FuelModelType.GR1: (0.4, 1.0),              # Short grass
+            FuelModelType.GR3: (0.7, 2.0),              # Tall grass
+            FuelModelType.SH2: (1.4, 3.0),              # Moderate shrub
+            FuelModelType.SH7: (2.8, 4.5),              # High load shrub
+            FuelModelType.TL2: (1.6, 3.5),              # Low load broadleaf litter
+            FuelModelType.TU5: (3.2, 5.0),              # Very high load timber-shrub
+            FuelModelType.PB_PINE_SCRUB: (2.2, 4.0),    # Pine-Scrub Oak mix
+            FuelModelType.PB_DENSE_PINE: (3.0, 5.0),    # Dense Pine stand
+            FuelModelType.PB_SPARSE_PINE: (1.8, 3.5),   # Sparse Pine-Oak
+            FuelModelType.PB_WETLAND_EDGE: (1.2, 2.5),  # Wetland edge
+            FuelModelType.PB_CEDAR_SWAMP: (3.5, 6.0),   # Cedar swamp
+        }
+        for model, (base, maximum) in fuel_models.items():
+            table.base_fuel_load[FUEL_MODEL_INDEX[model]] = base
+            table.max_fuel_load[FUEL_MODEL_INDEX[model]] = maximum
+        return table
+
+    @classmethod
+    def from_json(cls, path: Path) -> 'FuelCoefficientTable':
+        """Load a calibration file, overriding the defaults for the entries it lists.
+
+        The file maps ``vegetation`` and ``fuel_models`` to objects keyed by enum name,
+        e.g. ``{"vegetation": {"PITCH_PINE": {"spread_adjustment": 1.9}}}``.
+        """
+        with open(path) as f:
+            calibration = json.load(f)
+        table = cls.default()
+        for name, values in calibration.get('vegetation', {}).items():
+            idx = VEGETATION_INDEX[VegetationType[name]]
+            for field, value in values.items():
+                if field not in cls._VEGETATION_FIELDS:
+                    raise ValueError(f"Unknown vegetation coefficient '{field}'")
+                getattr(table, field)[idx] = value
+        for name, values in calibration.get('fuel_models', {}).items():
+            idx = FUEL_MODEL_INDEX[FuelModelType[name]]
+            for field, value in values.items():
+                if field not in cls._FUEL_MODEL_FIELDS:
+                    raise ValueError(f"Unknown fuel model coefficient '{field}'")
+                getattr(table, field)[idx] = value
+        return table
+
+    def to_json(self, path: Path) -> None:
+        """Write the full table as a calibration file readable by ``from_json``."""
+        calibration = {
+            'vegetation': {
+                veg.name: {field: float(getattr(self, field)[i])
+                           for field in self._VEGETATION_FIELDS}
+                for veg, i in VEGETATION_INDEX.items()
+            },
+            'fuel_models': {
+                model.name: {field: float(getattr(self, field)[i])
+                             for field in self._FUEL_MODEL_FIELDS}
+                for model, i in FUEL_MODEL_INDEX.items()
+            }
+        }
+        with open(path, 'w') as f:
+            json.dump(calibration, f, indent=2)
+
+    @staticmethod
+    def vegetation_indices(fuel_types: Sequence[VegetationType]) -> List[int]:
+        """Map a fuel type list to row indices of the vegetation arrays."""
+        return [VEGETATION_INDEX[fuel_type] for fuel_type in fuel_types]
+
+    @staticmethod
+    def fuel_model_index(fuel_model: Optional[FuelModelType]) -> int:
+        """Map a fuel model to its row, falling back to the unspecified-model slot."""
+        return FUEL_MODEL_INDEX.get(fuel_model, -1)
+
 class FirefighterBill:
     """Expert AI system for Pine Barrens ecology and fire management."""
+
+    # Built once at class load; replace (e.g. with FuelCoefficientTable.from_json) to recalibrate
+    fuel_coefficients: FuelCoefficientTable = FuelCoefficientTable.default()
     
-    def __init__(self):
+    def __init__(self, fuel_coefficients: Optional[FuelCoefficientTable] = None):
+        if fuel_coefficients is not None:
+            self.fuel_coefficients = fuel_coefficients
         self.vegetation_database = self._initialize_vegetation_data()
         self.wildlife_database = self._initialize_wildlife_data()
         self.historical_fires = self._initialize_fire_history()
@@ -310,6 +469,79 @@ class FirefighterBill:
             containment_challenges=challenges
         )
 
+    def predict_fire_behavior_batch(self,
+                                    weather: Mapping[str, Sequence],
+                                    fuel_composition: np.ndarray,
+                                    fuel_models: Optional[np.ndarray] = None
+                                    ) -> FireBehaviorBatchPrediction:
+        """Predict fire behavior for many (cell, hour) rows in one vectorized pass.
+
+        Args:
+            weather: Columnar weather keyed by ``WeatherConditions`` field name. Requires
+                ``temperature``, ``humidity``, ``wind_speed``, ``wind_direction`` and
+                ``drought_index``; a pandas DataFrame works as well as a dict of arrays.
+            fuel_composition: (n_rows, n_vegetation_types) matrix counting each
+                ``VegetationType`` in the row's fuel list, ordered as ``VEGETATION_INDEX``
+                (see ``build_fuel_composition``). A single row broadcasts to all weather rows.
+            fuel_models: Optional per-row ``FUEL_MODEL_INDEX`` values for the base fuel load.
+                Defaults to -1, the unspecified-model slot used by ``predict_fire_behavior``.
+
+        Returns:
+            FireBehaviorBatchPrediction matching ``predict_fire_behavior`` row by row.
+        """
+        temperature = np.asarray(weather['temperature'], dtype=np.float64)
+        humidity = np.asarray(weather['humidity'], dtype=np.float64)
+        wind_speed = np.asarray(weather['wind_speed'], dtype=np.float64)
+        drought_index = np.asarray(weather['drought_index'], dtype=np.float64)
+        wind_direction = np.asarray(weather['wind_direction'])
+        composition = np.atleast_2d(np.asarray(fuel_composition, dtype=np.float64))
+        if composition.shape[1] != len(VEGETATION_INDEX):
+            raise ValueError(
+                f"fuel_composition must have {len(VEGETATION_INDEX)} columns, "
+                f"got {composition.shape[1]}"
+            )
+
+        # Spread rate: base rate from wind and drought, scaled by the product of fuel adjustments
+        base_rate = (wind_speed * 0.43) * (1 + (drought_index / 1000))
+        table = self.fuel_coefficients
+        fuel_adjustment = np.prod(np.power(table.spread_adjustment, composition), axis=1)
+        spread_rate = base_rate * fuel_adjustment
+
+        # Flame length via Byram's equations (same rounding as the scalar path)
+        model_rows = -1 if fuel_models is None else np.asarray(fuel_models, dtype=np.intp)
+        fuel_load = table.base_fuel_load[model_rows] + composition @ table.fuel_load_adjustment
+        fuel_count = composition.sum(axis=1)
+        heat_content = np.divide(
+            composition @ table.heat_content, fuel_count,
+            out=np.full(fuel_count.shape, 8000.0), where=fuel_count > 0
+        )
+        byram_intensity = heat_content * fuel_load * (spread_rate / 60)
+        flame_length = np.round(0.45 * (byram_intensity / 100) ** 0.46, 1)
+        intensity = 100 * (flame_length / 0.45) ** (1 / 0.46)
+
+        # Spotting distance
+        convection_power = flame_length ** 1.5
+        wind_factor = (wind_speed ** 1.7) / 25
+        stability_factor = np.select(
+            [(temperature > 85) & (humidity < 40), (temperature < 60) | (humidity > 70)],
+            [1.3, 0.8],
+            default=1.0
+        )
+        drought_factor = 1.0 + (drought_index / 800)
+        directions, inverse = np.unique(wind_direction.astype(str), return_inverse=True)
+        terrain_factor = np.array(
+            [self._calculate_terrain_influence(d) for d in directions]
+        )[inverse.reshape(wind_direction.shape)]
+        spotting = (convection_power * wind_factor * stability_factor * drought_factor) / 50
+        spotting_distance = np.minimum(spotting * terrain_factor, 3.0)
+
+        return FireBehaviorBatchPrediction(
+            spread_rate=spread_rate,
+            flame_length=flame_length,
+            intensity=intensity,
+            spotting_distance=spotting_distance
+        )
+
     def _calculate_risk_level(self, weather: WeatherConditions) -> FireRiskLevel:
         """Calculate fire risk level based on weather conditions."""
         risk_score = 0
@@ -407,45 +639,11 @@ class FirefighterBill:
         base_rate = (weather.wind_speed * 0.43) * (1 + (weather.drought_index / 1000))
         
         # Fuel type adjustments
-        fuel_adjustment = 1.0
-        for fuel_type in fuel_types:
-            if fuel_type == VegetationType.PITCH_PINE:
-                fuel_adjustment *= 1.8  # High resin content, dense crown
-            elif fuel_type == VegetationType.VIRGINIA_PINE:
-                fuel_adjustment *= 1.5  # Similar to Pitch Pine
-            elif fuel_type == VegetationType.POND_PINE:
-                fuel_adjustment *= 1.3  # Intermediate pine loading
-            elif fuel_type == VegetationType.SHORTLEAF_PINE:
-                fuel_adjustment *= 1.2  # Moderately high fuel load
-            elif fuel_type == VegetationType.ATLANTIC_WHITE_CEDAR:
-                fuel_adjustment *= 1.5  # Very high fuel load when dry
-            
-            # Oak species
-            elif fuel_type == VegetationType.SCRUB_OAK:
-                fuel_adjustment *= 1.1  # Moderate fuel load
-            elif fuel_type == VegetationType.BLACKJACK_OAK:
-                fuel_adjustment *= 1.2  # Similar to Scrub Oak
-            elif fuel_type == VegetationType.POST_OAK:
-                fuel_adjustment *= 1.0  # Moderate fuel load
-            elif fuel_type == VegetationType.CHESTNUT_OAK:
-                fuel_adjustment *= 1.3  # Higher fuel load
-            
-            # Shrub species
-            elif fuel_type in [VegetationType.BLUEBERRY_LOWBUSH, 
-                             VegetationType.BLUEBERRY_HIGHBUSH]:
-                fuel_adjustment *= 0.8  # Low fuel load
-            elif fuel_type in [VegetationType.HUCKLEBERRY_BLACK, 
-                             VegetationType.HUCKLEBERRY_DANGLEBERRY]:
-                fuel_adjustment *= 0.9  # Low fuel load
-            elif fuel_type == VegetationType.MOUNTAIN_LAUREL:
-                fuel_adjustment *= 1.2  # Higher shrub fuel load
-            elif fuel_type == VegetationType.SHEEP_LAUREL:
-                fuel_adjustment *= 1.1  # Moderate shrub fuel load
-        
-        # Combine base load with vegetation adjustments
-        total_load = base_rate * fuel_adjustment
-        
-        return total_load
+        table = self.fuel_coefficients
+        indices = table.vegetation_indices(fuel_types)
+        fuel_adjustment = float(np.prod(table.spread_adjustment[indices]))
+        
+        return base_rate * fuel_adjustment
 
     def _calculate_flame_length(self, spread_rate: float, fuel_types: List[VegetationType]) -> float:
         """Calculate flame length in feet using Byram's flame length equation with Pine Barrens adjustments."""
@@ -477,7 +675,8 @@ class FirefighterBill:
         intensity = 100 * (flame_length/0.45) ** (1/0.46)
         return intensity
         
-    def _calculate_fuel_load(self, fuel_types: List[VegetationType], fuel_model: FuelModelType) -> float:
+    def _calculate_fuel_load(self, fuel_types: List[VegetationType],
+                             fuel_model: Optional[FuelModelType] = None) -> float:
         """Calculate total fuel load in lb/ft² based on vegetation types and fuel model.
         
         Uses both standard and custom Pine Barrens fuel models, combined with specific
@@ -487,102 +686,28 @@ class FirefighterBill:
         base_load = self._get_fuel_model_load(fuel_model)
         
         # Vegetation type adjustments
-        veg_adjustment = 0.0
-        for fuel_type in fuel_types:
-            if fuel_type == VegetationType.PITCH_PINE:
-                veg_adjustment += 2.5  # High fuel load, resinous
-            elif fuel_type == VegetationType.VIRGINIA_PINE:
-                veg_adjustment += 2.2  # Similar to Pitch Pine
-            elif fuel_type == VegetationType.POND_PINE:
-                veg_adjustment += 2.3  # Intermediate pine loading
-            elif fuel_type == VegetationType.SHORTLEAF_PINE:
-                veg_adjustment += 2.0  # Moderately high fuel load
-            elif fuel_type == VegetationType.ATLANTIC_WHITE_CEDAR:
-                veg_adjustment += 3.0  # Very high fuel load when dry
-            
-            # Oak species
-            elif fuel_type == VegetationType.SCRUB_OAK:
-                veg_adjustment += 1.2  # Moderate fuel load
-            elif fuel_type == VegetationType.BLACKJACK_OAK:
-                veg_adjustment += 1.3  # Similar to Scrub Oak
-            elif fuel_type == VegetationType.POST_OAK:
-                veg_adjustment += 1.1  # Moderate fuel load
-            elif fuel_type == VegetationType.CHESTNUT_OAK:
-                veg_adjustment += 1.4  # Higher fuel load
-            
-            # Shrub species
-            elif fuel_type in [VegetationType.BLUEBERRY_LOWBUSH, 
-                             VegetationType.BLUEBERRY_HIGHBUSH]:
-                veg_adjustment += 0.3  # Low fuel load
-            elif fuel_type in [VegetationType.HUCKLEBERRY_BLACK, 
-                             VegetationType.HUCKLEBERRY_DANGLEBERRY]:
-                veg_adjustment += 0.4  # Low fuel load
-            elif fuel_type == VegetationType.MOUNTAIN_LAUREL:
-                veg_adjustment += 0.8  # Higher shrub fuel load
-            elif fuel_type == VegetationType.SHEEP_LAUREL:
-                veg_adjustment += 0.6  # Moderate shrub fuel load
-        
-        # Combine base load with vegetation adjustments
-        total_load = base_load + veg_adjustment
-        
-        return total_load
-
-    def _get_fuel_model_load(self, fuel_model: FuelModelType) -> float:
+        table = self.fuel_coefficients
+        indices = table.vegetation_indices(fuel_types)
+        veg_adjustment = float(np.sum(table.fuel_load_adjustment[indices]))
+        
+        return base_load + veg_adjustment
+
+    def _get_fuel_model_load(self, fuel_model: Optional[FuelModelType]) -> float:
         """Get base fuel load for standard and custom fuel models."""
-        fuel_loads = {
-            # Standard fuel models
-            FuelModelType.GR1: 0.4,   # Short grass
-            FuelModelType.GR3: 0.7,   # Tall grass
-            FuelModelType.SH2: 1.4,   # Moderate shrub
-            FuelModelType.SH7: 2.8,   # High load shrub
-            FuelModelType.TL2: 1.6,   # Low load broadleaf litter
-            FuelModelType.TU5: 3.2,   # Very high load timber-shrub
-            
-            # Custom Pine Barrens fuel models
-            FuelModelType.PB_PINE_SCRUB: 2.2,    # Pine-Scrub Oak mix
-            FuelModelType.PB_DENSE_PINE: 3.0,    # Dense Pine stand
-            FuelModelType.PB_SPARSE_PINE: 1.8,   # Sparse Pine-Oak
-            FuelModelType.PB_WETLAND_EDGE: 1.2,  # Wetland edge
-            FuelModelType.PB_CEDAR_SWAMP: 3.5,   # Cedar swamp
-        }
-        return fuel_loads.get(fuel_model, 1.0)
+        table = self.fuel_coefficients
+        return float(table.base_fuel_load[table.fuel_model_index(fuel_model)])
 
-    def _get_max_fuel_load(self, fuel_model: FuelModelType) -> float:
+    def _get_max_fuel_load(self, fuel_model: Optional[FuelModelType]) -> float:
         """Get maximum reasonable fuel load for each fuel model type."""
-        max_loads = {
-            # Standard fuel models
-            FuelModelType.GR1: 1.0,
-            FuelModelType.GR3: 2.0,
-            FuelModelType.SH2: 3.0,
-            FuelModelType.SH7: 4.5,
-            FuelModelType.TL2: 3.5,
-            FuelModelType.TU5: 5.0,
-            
-            # Custom Pine Barrens fuel models
-            FuelModelType.PB_PINE_SCRUB: 4.0,
-            FuelModelType.PB_DENSE_PINE: 5.0,
-            FuelModelType.PB_SPARSE_PINE: 3.5,
-            FuelModelType.PB_WETLAND_EDGE: 2.5,
-            FuelModelType.PB_CEDAR_SWAMP: 6.0,
-        }
-        return max_loads.get(fuel_model, 3.0)
+        table = self.fuel_coefficients
+        return float(table.max_fuel_load[table.fuel_model_index(fuel_model)])
 
     def _calculate_heat_content(self, fuel_types: List[VegetationType]) -> float:
         """Calculate average heat content in BTU/lb based on vegetation types."""
-        total_heat = 0.0
-        count = 0
-        for fuel_type in fuel_types:
-            if fuel_type == VegetationType.PITCH_PINE:
-                total_heat += 9500  # High resin content
-            elif fuel_type == VegetationType.SCRUB_OAK:
-                total_heat += 8000  # Typical hardwood
-            elif fuel_type == VegetationType.SHORTLEAF_PINE:
-                total_heat += 9000  # Moderate resin content
-            else:
-                total_heat += 8000  # Default for other vegetation
-            count += 1
-        
-        return total_heat / count if count > 0 else 8000
+        if not fuel_types:
+            return 8000
+        table = self.fuel_coefficients
+        return float(np.mean(table.heat_content[table.vegetation_indices(fuel_types)]))
 
     def _calculate_spotting_distance(self, weather: WeatherConditions, flame_length: float) -> float:
         """Calculate potential spotting distance in miles using advanced spotting models.
@@ -1,7 +1,11 @@
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
+import geopandas as gpd
+import numpy as np
+import pandas as pd
 from fastapi import FastAPI, HTTPException, Request, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -10,11 +14,15 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from pydantic import BaseModel
+from shapely.geometry import box
 
 from app.api import fire_risk, map_data  # Import the fire risk and map data modules
 from app.api.fire_prediction import router as fire_prediction_router  # Fire prediction endpoint
+from app.api.risk_tiles import router as risk_tiles_router  # Risk map tiles
 
 from app.logger import logger, log_action, log_api_request, log_error
+from app.model_registry import lifespan, registry
+from app.risk_grid import build_cell_features, get_risk_grid, model_available
 
 import os
 import sys
@@ -28,7 +36,8 @@ limiter = Limiter(key_func=get_remote_address)
 app = FastAPI(
     title="PineGuard API",
     description="Wildfire risk prediction and management system for the New Jersey Pinelands",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add rate limiter to app
@@ -42,6 +51,7 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 app.include_router(fire_risk.router)
 app.include_router(map_data.router)
 app.include_router(fire_prediction_router)
+app.include_router(risk_tiles_router)
 
 @app.get("/")
 async def read_root():
@@ -73,11 +83,53 @@ async def health_check(request: Request):
     log_action("Health check request")
     return {"status": "healthy"}
 
+
+@app.get("/api/v1/models/status")
+async def models_status(request: Request = None):
+    """Loaded models and their warm-up times"""
+    log_api_request(method="GET", endpoint="/api/v1/models/status")
+    return registry.status()
+
 class DetailedRiskPrediction(RiskPrediction):
     environmental_factors: Dict[str, float]
     historical_data: Dict[str, Any]
     infrastructure_risk: Dict[str, float]
     mitigation_recommendations: List[Dict[str, Any]]
+    report: Optional[Dict[str, Any]] = None
+
+
+def _flatten_coordinates(coordinates) -> List[List[float]]:
+    """Flatten nested GeoJSON coordinates into a list of [lng, lat] points."""
+    if len(coordinates) and isinstance(coordinates[0], (int, float)):
+        return [list(coordinates[:2])]
+    return [point for part in coordinates for point in _flatten_coordinates(part)]
+
+
+def _area_cell_scores(area_geometry: Dict[str, Any]) -> np.ndarray:
+    """Model risk scores of the grid cells inside the area's bounding box."""
+    predictor = registry.get_predictor()
+    if not model_available(predictor):
+        return np.empty(0, dtype=np.float32)
+    points = np.array(_flatten_coordinates(area_geometry["coordinates"]), dtype=float)
+    (west, south), (east, north) = points.min(axis=0), points.max(axis=0)
+    return get_risk_grid(predictor).window(south, west, north, east).ravel()
+
+
+async def _area_analysis(area: Area, analysis_mode: str) -> Optional[Dict[str, Any]]:
+    """The predictor's analysis of the area's bounding box, or None without a trained model.
+
+    The box is scored on its own weather and land cover (see ``area_layers``).
+    """
+    predictor = await run_in_threadpool(registry.get_predictor)
+    if not model_available(predictor):
+        return None
+    points = np.array(_flatten_coordinates(area.area_geometry["coordinates"]), dtype=float)
+    (west, south), (east, north) = points.min(axis=0), points.max(axis=0)
+    geometry = gpd.GeoSeries([box(west, south, east, north)], crs="EPSG:4326")
+    date = pd.Timestamp(area.date) if area.date else pd.Timestamp.now()
+    layers = await predictor.area_layers(gpd.GeoDataFrame(geometry=geometry), date)
+    area_data = gpd.GeoDataFrame(build_cell_features((1, 1), layers), geometry=geometry)
+    return await predictor.analyze_area_async(area_data, date=date, analysis_mode=analysis_mode)
 
 @app.post("/api/v1/predict", response_model=DetailedRiskPrediction)
 async def predict_risk(area: Area, analysis_mode: str = "basic", request: Request = None):
@@ -92,7 +144,8 @@ async def predict_risk(area: Area, analysis_mode: str = "basic", request: Reques
     # Validate analysis mode
     if analysis_mode not in ["basic", "professional"]:
         log_error(ValueError("Invalid analysis mode"), {"analysis_mode": analysis_mode})
-        raise HTTPException(status_code=400, detail="Invalid analysis mode. Must be 'basic' or 'professional'")
+        raise HTTPException(status_code=400,
+                            detail="Invalid analysis mode. Must be 'basic' or 'professional'")
     try:
         # Basic environmental factors (always included)
         environmental_factors = {
@@ -194,6 +247,12 @@ async def predict_risk(area: Area, analysis_mode: str = "basic", request: Reques
         
         risk_score = sum(risk_factors.values()) / len(risk_factors)
         confidence = 0.85
+
+        # Prefer the model's grid scores for the area when a trained model is loaded
+        cell_scores = await run_in_threadpool(_area_cell_scores, area.area_geometry)
+        if cell_scores.size:
+            risk_factors["model"] = float(cell_scores.mean())
+            risk_score = risk_factors["model"]
         
         # Generate mode-specific recommendations
         if analysis_mode == "professional":
@@ -205,6 +264,16 @@ async def predict_risk(area: Area, analysis_mode: str = "basic", request: Reques
             recommendations = [
                 {"priority": "high", "action": "Clear firebreaks", "time_frame": "1 month"},
             ]
+
+        # The predictor's own report and recommendations, when a trained model is loaded
+        analysis = await _area_analysis(area, analysis_mode)
+        report = None
+        if analysis is not None:
+            report = analysis["report"]
+            recommendations.extend(
+                {"priority": "medium", "action": action, "time_frame": "ongoing"}
+                for action in analysis["recommendations"]
+            )
         
         return {
             "risk_score": risk_score,
@@ -214,6 +283,7 @@ async def predict_risk(area: Area, analysis_mode: str = "basic", request: Reques
             "historical_data": historical_data,
             "infrastructure_risk": infrastructure_risk,
             "mitigation_recommendations": recommendations,
+            "report": report,
             "timestamp": datetime.now().isoformat()
         }
     except Exception as e:
@@ -14,6 +14,11 @@ class BaseModel(ABC):
         self.model_path = model_path
         if model_path and model_path.exists():
             self.load_model(model_path)
+
+    @property
+    def is_fitted(self) -> bool:
+        """Whether a trained model is loaded and ready to predict"""
+        return self.model is not None
     
     @abstractmethod
     def preprocess(self, data: Union[pd.DataFrame, np.ndarray]) -> Union[pd.DataFrame, np.ndarray]:
@@ -0,0 +1,108 @@
+"""Versioned on-disk bundle of a fitted EnsembleWildfireModel.
+
+A bundle is a directory with ``manifest.json`` (format version, feature order,
+library versions, soft-voting weights) and ``model.joblib`` holding the fitted feature
+encoder (scaling statistics and categorical vocabulary), the member models and their
+weights. The joblib file is written uncompressed so it can be loaded with
+``mmap_mode='r'``: numpy arrays inside it are memory-mapped from
+the page cache instead of read into each process, so worker processes loading the
+same bundle share one copy of them. (scikit-learn copies tree nodes into its own
+buffers when unpickling, so for the forest the gain is a load without a second,
+transient heap copy of every tree.)
+"""
+import json
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+
+from ..logger import logger
+from .encoding import TabularEncoder
+
+BUNDLE_FORMAT = 2  # 2: TabularEncoder with a reserved slot for unseen categories
+MANIFEST = 'manifest.json'
+PAYLOAD = 'model.joblib'
+
+
+def library_versions() -> Dict[str, str]:
+    """Versions of the libraries whose pickles the bundle contains."""
+    versions = {}
+    for name in ('sklearn', 'lightgbm', 'catboost', 'numpy'):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            continue
+    return versions
+
+
+def _remove(path: Path) -> None:
+    # The previous model at a path may be a bundle directory or a single-file model
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def is_bundle(path: Path) -> bool:
+    return Path(path).is_dir() and (Path(path) / MANIFEST).exists()
+
+
+@dataclass
+class ModelBundle:
+    """Everything ``preprocess`` and the members need to score new rows."""
+    encoder: TabularEncoder
+    members: Dict[str, Any]
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    # Soft-voting weight of each member; None for equal weights
+    weights: Optional[Dict[str, float]] = None
+
+    def save(self, path: Path) -> Path:
+        """Write the bundle to the directory ``path``, replacing any bundle there."""
+        path = Path(path)
+        staging = path.with_name(path.name + '.tmp')
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        manifest = {
+            'format': BUNDLE_FORMAT,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'numerical_columns': self.encoder.numerical_columns,
+            'categorical_columns': list(self.encoder.vocabulary),
+            'categorical_encoding': self.encoder.encoding,
+            'feature_columns': self.encoder.feature_names,
+            'members': list(self.members),
+            'weights': self.weights,
+            'versions': library_versions(),
+            'metadata': self.metadata,
+        }
+        (staging / MANIFEST).write_text(json.dumps(manifest, indent=2, default=str))
+        # Uncompressed, so the arrays can be memory-mapped on load
+        payload = {'encoder': self.encoder, 'members': self.members, 'weights': self.weights}
+        joblib.dump(payload, staging / PAYLOAD)
+        # Swap directories so readers never see a half-written bundle
+        previous = path.with_name(path.name + '.old')
+        _remove(previous)
+        if path.exists():
+            os.replace(path, previous)
+        os.replace(staging, path)
+        _remove(previous)
+        return path
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: Optional[str] = 'r') -> 'ModelBundle':
+        """Read a bundle; with ``mmap_mode`` its numpy arrays stay on disk, shared by processes."""
+        path = Path(path)
+        manifest = json.loads((path / MANIFEST).read_text())
+        if manifest.get('format') != BUNDLE_FORMAT:
+            raise ValueError(f"Unsupported model bundle format {manifest.get('format')} in {path}")
+        saved, current = manifest.get('versions', {}), library_versions()
+        for name, version in saved.items():
+            if current.get(name) not in (None, version):
+                logger.warning(f"Model bundle {path} was saved with {name} {version}, "
+                               f"running {current[name]}")
+        payload = joblib.load(path / PAYLOAD, mmap_mode=mmap_mode)
+        return cls(encoder=payload['encoder'], members=payload['members'],
+                   metadata=manifest.get('metadata', {}), weights=payload.get('weights'))
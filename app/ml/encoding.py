@@ -0,0 +1,95 @@
+"""Fixed-vocabulary feature encoding into a preallocated float32 matrix.
+
+The encoder learns, at train time, which columns are numerical (and their mean and
+scale) and the categories of each categorical column. Encoding a batch fills one
+``(n_rows, n_features)`` float32 array column by column: numerical values are cast
+into their column and standardised in place, and categories are turned into integer
+codes against the fixed vocabulary (a hash lookup, no object-dtype copies) that are
+written either as one-hot flags or as ordinal codes. Categories not seen in
+training, and missing values, go to a reserved slot after the known ones, so the
+output columns never depend on the batch.
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+UNSEEN = '<unseen>'
+ENCODINGS = ('onehot', 'ordinal')
+
+
+@dataclass
+class TabularEncoder:
+    numerical_columns: List[str]
+    vocabulary: Dict[str, List[Any]]
+    mean: np.ndarray
+    scale: np.ndarray
+    encoding: str = 'onehot'
+
+    @classmethod
+    def fit(cls, X: pd.DataFrame, encoding: str = 'onehot') -> 'TabularEncoder':
+        if encoding not in ENCODINGS:
+            raise ValueError(f"encoding must be one of {ENCODINGS}, not {encoding!r}")
+        numerical = list(X.select_dtypes(include=['int64', 'float64']).columns)
+        vocabulary = {
+            col: sorted(X[col].dropna().unique().tolist(), key=str)
+            for col in X.select_dtypes(include=['object', 'category']).columns
+        }
+        values = X[numerical].to_numpy(dtype=np.float64)
+        mean = values.mean(axis=0) if len(values) else np.zeros(len(numerical))
+        scale = values.std(axis=0) if len(values) else np.ones(len(numerical))
+        # Constant columns are left unscaled, as StandardScaler does
+        scale[scale == 0] = 1.0
+        return cls(numerical, vocabulary, mean.astype(np.float32), scale.astype(np.float32),
+                   encoding)
+
+    @property
+    def feature_names(self) -> List[str]:
+        names = list(self.numerical_columns)
+        for col, categories in self.vocabulary.items():
+            if self.encoding == 'onehot':
+                names += [f'{col}_{value}' for value in categories] + [f'{col}_{UNSEEN}']
+            else:
+                names.append(col)
+        return names
+
+    @property
+    def n_features(self) -> int:
+        return len(self.feature_names)
+
+    def transform(self, X: pd.DataFrame, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Encode ``X`` into ``out`` (allocated when not given) and return it."""
+        n = len(X)
+        if out is None:
+            out = np.empty((n, self.n_features), dtype=np.float32)
+        elif out.shape != (n, self.n_features) or out.dtype != np.float32:
+            raise ValueError(f"out must be a float32 array of shape {(n, self.n_features)}")
+
+        k = len(self.numerical_columns)
+        for j, col in enumerate(self.numerical_columns):
+            out[:, j] = X[col].to_numpy()
+        numeric = out[:, :k]
+        np.subtract(numeric, self.mean, out=numeric)
+        np.divide(numeric, self.scale, out=numeric)
+
+        offset = k
+        rows = np.arange(n)
+        for col, categories in self.vocabulary.items():
+            codes = pd.Categorical(X[col], categories=categories).codes.astype(np.intp)
+            # -1 (unseen or missing) goes to the reserved slot after the known categories
+            codes[codes < 0] = len(categories)
+            if self.encoding == 'onehot':
+                width = len(categories) + 1
+                out[:, offset:offset + width] = 0.0
+                out[rows, offset + codes] = 1.0
+                offset += width
+            else:
+                out[:, offset] = codes
+                offset += 1
+        return out
+
+    def transform_frame(self, X: pd.DataFrame, out: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """``transform`` wrapped, without copying, in a DataFrame with the feature names."""
+        return pd.DataFrame(self.transform(X, out), columns=self.feature_names, index=X.index,
+                            copy=False)
@@ -6,28 +6,124 @@ import optuna
 import pandas as pd
 import shap
 from catboost import CatBoostClassifier
+from joblib import parallel_backend
 from lightgbm import LGBMClassifier
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import cross_val_score
+from sklearn.base import clone
+from sklearn.model_selection import check_cv, cross_val_predict, cross_val_score
 from sklearn.preprocessing import StandardScaler
 
+from ..config import ML_EXECUTION, ML_N_JOBS, OPTUNA_PRUNER, OPTUNA_STORAGE
+from ..logger import logger
 from .base_model import BaseModel
+from .bundle import ModelBundle, is_bundle
+from .encoding import TabularEncoder
+from .parallel import (
+    CoreBudget,
+    available_cores,
+    map_members,
+    member_executor,
+    predict_threads,
+    set_threads,
+)
+from .tuning import data_fingerprint, enqueue_best, finished_trials, make_pruner, study_storage
+from .voting import combine, fit_weights, positive_column
+
+
+# Member tasks live at module level so that process pools can pickle them
+
+def _cross_validate(model: Any, X: pd.DataFrame, y: np.ndarray, cv: int,
+                    budget: CoreBudget) -> float:
+    """Mean cross-validation score of one member within its share of the cores"""
+    set_threads(model, budget.threads)
+    # With n_jobs unset, cross_val_score runs as many folds at once as this backend allows
+    with parallel_backend('threading', n_jobs=budget.folds):
+        return cross_val_score(model, X, y, cv=cv).mean()
+
+
+def _fold_score(model: Any, X: pd.DataFrame, y: np.ndarray, train: np.ndarray, test: np.ndarray,
+                threads: int) -> float:
+    """Accuracy on one CV fold of a fresh copy of ``model``"""
+    member = set_threads(clone(model), threads)
+    member.fit(X.iloc[train], y[train])
+    return member.score(X.iloc[test], y[test])
+
+
+def _fit(model: Any, X: pd.DataFrame, y: np.ndarray, threads: int) -> Any:
+    set_threads(model, threads)
+    model.fit(X, y)
+    return model
+
+
+def _out_of_fold_proba(model: Any, X: pd.DataFrame, y: np.ndarray, cv: int,
+                       budget: CoreBudget) -> np.ndarray:
+    """Positive-class probability of every row from the fold that held it out"""
+    set_threads(model, budget.threads)
+    with parallel_backend('threading', n_jobs=budget.folds):
+        # Columns follow the sorted labels, so class 1 is the last one
+        return cross_val_predict(model, X, y, cv=cv, method='predict_proba')[:, -1]
+
+
+def _score_into(model: Any, X: pd.DataFrame, threads: int, out: np.ndarray, column: int,
+                rows: Optional[np.ndarray] = None) -> None:
+    """Write the member's positive-class probabilities for ``rows`` into ``out[:, column]``"""
+    set_threads(model, threads)
+    proba = model.predict_proba(X, **predict_threads(model, threads))
+    out[slice(None) if rows is None else rows, column] = proba[:, positive_column(model)]
+
 
 class EnsembleWildfireModel(BaseModel):
     """Ensemble model combining multiple algorithms for wildfire prediction"""
+
+    # 'onehot' or 'ordinal' codes for categorical features
+    categorical_encoding = 'onehot'
+    # How members (and their CV folds) run side by side: 'serial', 'thread' or 'process'
+    execution = ML_EXECUTION
+    # SQLite file of the Optuna studies ('' for in-memory) and the trial pruner
+    study_storage = OPTUNA_STORAGE
+    pruner = OPTUNA_PRUNER
     
-    def __init__(self, model_path: Optional[Path] = None):
-        super().__init__(model_path)
+    def __init__(self, model_path: Optional[Path] = None, n_jobs: Optional[int] = None):
+        # Set up before BaseModel.__init__, which may load a saved bundle over them
         self.models = {
             'rf': RandomForestClassifier(random_state=42),
             'lgbm': LGBMClassifier(random_state=42),
-            'catboost': CatBoostClassifier(random_state=42, verbose=False)
+            'catboost': CatBoostClassifier(random_state=42, verbose=False,
+                                           allow_writing_files=False)
         }
         self.scaler = StandardScaler()
         self.feature_importance = None
+        # Learned by fit_preprocessing; None until the model is trained or loaded
+        self.encoder: Optional[TabularEncoder] = None
+        # Soft-voting weight of each member, learned in train; None weighs them equally
+        self.member_weights: Optional[Dict[str, float]] = None
+        # Cores shared by all members, their CV folds and their threads
+        self.n_jobs = available_cores(ML_N_JOBS if n_jobs is None else n_jobs)
+        super().__init__(model_path)
+
+    @property
+    def is_fitted(self) -> bool:
+        # A bundle sets the encoder and members; a single-file model sets self.model
+        return self.encoder is not None or self.model is not None
+
+    @property
+    def feature_columns(self) -> Optional[List[str]]:
+        return self.encoder.feature_names if self.encoder is not None else None
+
+    def fit_preprocessing(self, X: pd.DataFrame) -> None:
+        """Learn the numerical scaling, the categorical vocabulary and the feature order"""
+        self.encoder = TabularEncoder.fit(X, encoding=self.categorical_encoding)
     
-    def preprocess(self, data: pd.DataFrame) -> pd.DataFrame:
-        """Preprocess the input data"""
+    def preprocess(self, data: pd.DataFrame, out: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Preprocess the input data
+
+        Once fitted, rows are encoded straight into one float32 matrix (``out`` when
+        given) with a fixed set of columns; unseen categories use a reserved column.
+        """
+        if self.encoder is not None:
+            return self.encoder.transform_frame(data, out)
+
+        # Not trained yet: scale and one-hot encode with what this batch holds
         numerical_cols = data.select_dtypes(include=['int64', 'float64']).columns
         categorical_cols = data.select_dtypes(include=['object', 'category']).columns
         
@@ -40,73 +136,218 @@ class EnsembleWildfireModel(BaseModel):
             data = pd.get_dummies(data, columns=categorical_cols)
         
         return data
+
+    def predict(self, data: pd.DataFrame, agreement: Optional[float] = None) -> pd.DataFrame:
+        """Soft-voted risk scores and categories for ``data`` (see ``predict_proba``)"""
+        if self.encoder is None:
+            return super().predict(data)
+        return self.postprocess(self.predict_proba(data, agreement))
+
+    def predict_proba(self, data: pd.DataFrame, agreement: Optional[float] = None) -> np.ndarray:
+        """Weighted mean of the members' fire probabilities for each row (see ``app.ml.voting``)
+
+        By default every member scores every row, all at once, each on its share of
+        the cores. With ``agreement``, members score one after another, and a row is
+        only passed on to the next member while the probabilities it has so far
+        differ by more than ``agreement``.
+        """
+        if self.encoder is None:
+            raise ValueError("Model not loaded or trained")
+        X = self.preprocess(data)
+        names = list(self.models)
+        probabilities = np.full((len(X), len(names)), np.nan, dtype=np.float32)
+        if agreement is None:
+            budget = CoreBudget.split(self.n_jobs, len(names))
+            jobs = {name: (self.models[name], X, budget.threads, probabilities, column)
+                    for column, name in enumerate(names)}
+            # Threads even in 'process' mode: shipping the fitted members to workers
+            # costs more than scoring
+            mode = 'serial' if self.execution == 'serial' else 'thread'
+            with member_executor(mode, budget.members) as executor:
+                map_members(_score_into, jobs, executor)
+        else:
+            pending = np.arange(len(X))
+            for column, name in enumerate(names):
+                if not len(pending):
+                    break
+                _score_into(self.models[name], X.iloc[pending], self.n_jobs, probabilities, column,
+                            pending)
+                if column:
+                    scored = probabilities[pending, :column + 1]
+                    pending = pending[scored.max(axis=1) - scored.min(axis=1) > agreement]
+        weights = None
+        if self.member_weights is not None:
+            weights = np.array([self.member_weights.get(name, 0.0) for name in names])
+        return combine(probabilities, weights)
     
     def postprocess(self, predictions: np.ndarray) -> pd.DataFrame:
-        """Convert predictions to risk scores and categories"""
-        risk_scores = predictions.mean(axis=1)  # Average predictions from all models
+        """Convert predictions to risk scores and categories
+
+        ``predictions`` is either the combined probability of each row or one column
+        per member, which are averaged.
+        """
+        risk_scores = predictions if predictions.ndim == 1 else predictions.mean(axis=1)
         
         return pd.DataFrame({
             'risk_score': risk_scores,
             'risk_category': pd.cut(
                 risk_scores,
                 bins=[0, 0.2, 0.4, 0.6, 0.8, 1.0],
-                labels=['Very Low', 'Low', 'Moderate', 'High', 'Very High']
+                labels=['Very Low', 'Low', 'Moderate', 'High', 'Very High'],
+                include_lowest=True
             )
         })
     
-    def train(self, X: pd.DataFrame, y: np.ndarray, **kwargs) -> Dict[str, float]:
-        """Train all models in the ensemble"""
+    def train(self,
+              X: pd.DataFrame,
+              y: np.ndarray,
+              n_trials: Optional[int] = 50,
+              timeout: Optional[float] = None,
+              study_name: Optional[str] = None,
+              warm_start: Optional[str] = None,
+              storage: Optional[str] = None,
+              learn_weights: bool = False,
+              **kwargs) -> Dict[str, float]:
+        """Train all models in the ensemble
+
+        Each member is tuned in its own Optuna study (see ``app.ml.tuning``) until it
+        has ``n_trials`` finished trials, counting those of earlier runs, or until
+        ``timeout`` seconds have passed. ``study_name`` defaults to a fingerprint of
+        the training data; ``warm_start`` names an earlier study whose best trial is
+        tried first, and ``storage`` overrides ``study_storage``. Members, and the CV
+        folds of each, run concurrently as ``execution`` allows, sharing ``n_jobs`` cores.
+        With ``learn_weights``, soft-voting weights are fitted to the members'
+        out-of-fold probabilities.
+        """
+        if n_trials is None and timeout is None:
+            raise ValueError("Tuning needs n_trials, timeout or both")
+        self.fit_preprocessing(X)
         X_processed = self.preprocess(X)
-        
-        # Optimize hyperparameters using Optuna
-        study = optuna.create_study(direction='maximize')
-        study.optimize(lambda trial: self._objective(trial, X_processed, y), n_trials=50)
-        
-        # Train models with best parameters
-        metrics = {}
+        y = np.asarray(y)
         # prevent cv splits > samples
         n_samples = len(X_processed)
         cv_folds = min(5, n_samples)
-        for name, model in self.models.items():
-            model.set_params(**study.best_params[name])
-            score = cross_val_score(model, X_processed, y, cv=cv_folds).mean()
-            metrics[f'{name}_cv_score'] = score
+        budget = CoreBudget.split(self.n_jobs, len(self.models), cv_folds)
+        # Without folds running side by side, each fit gets the cores its folds shared
+        member_threads = budget.folds * budget.threads
+
+        # Optimize hyperparameters using Optuna, one study per member
+        storage = study_storage(self.study_storage if storage is None else storage)
+        study_name = study_name or f'ensemble-{data_fingerprint(X, y)}'
+        # Studies run in threads even in 'process' mode: a study and its objective stay
+        # in this process
+        tuning = 'serial' if self.execution == 'serial' else 'thread'
+        if timeout is not None and (tuning == 'serial' or budget.members < len(self.models)):
+            timeout /= len(self.models)
+        jobs = {name: (name, X_processed, y, cv_folds, member_threads, study_name, storage,
+                       n_trials, timeout, warm_start)
+                for name in self.models}
+        with member_executor(tuning, budget.members) as executor:
+            best_params = map_members(self._tune_member, jobs, executor)
+
+        with member_executor(self.execution, budget.members) as executor:
+            # Train models with best parameters
+            for name, model in self.models.items():
+                model.set_params(**best_params[name])
+            cv_jobs = {name: (model, X_processed, y, cv_folds, budget)
+                       for name, model in self.models.items()}
+            scores = map_members(_cross_validate, cv_jobs, executor)
+            metrics = {f'{name}_cv_score': score for name, score in scores.items()}
+
+            self.member_weights = None
+            if learn_weights:
+                out_of_fold = map_members(_out_of_fold_proba, cv_jobs, executor)
+                weights = fit_weights(
+                    np.column_stack([out_of_fold[name] for name in self.models]), y)
+                self.member_weights = {name: float(w) for name, w in zip(self.models, weights)}
+                metrics.update({f'{name}_weight': w for name, w in self.member_weights.items()})
+
+            # Final members fitted on all rows, as saved in the model bundle
+            self.models = map_members(
+                _fit,
+                {name: (model, X_processed, y, member_threads)
+                 for name, model in self.models.items()},
+                executor)
         
         # Calculate feature importance using SHAP
         self.feature_importance = self._calculate_shap_values(X_processed)
         
         return metrics
+
+    def _tune_member(self,
+                     name: str,
+                     X: pd.DataFrame,
+                     y: np.ndarray,
+                     cv_folds: int,
+                     threads: int,
+                     study_name: str,
+                     storage: Optional[optuna.storages.BaseStorage],
+                     n_trials: Optional[int],
+                     timeout: Optional[float],
+                     warm_start: Optional[str]) -> Dict[str, Any]:
+        """Run (or resume) the study of one member and return its best parameters"""
+        study = optuna.create_study(study_name=f'{study_name}-{name}', storage=storage,
+                                    direction='maximize',
+                                    pruner=make_pruner(self.pruner, cv_folds),
+                                    load_if_exists=True)
+        if warm_start:
+            enqueue_best(study, f'{warm_start}-{name}', storage)
+        remaining = None if n_trials is None else n_trials - finished_trials(study)
+        if remaining is None or remaining > 0:
+            study.optimize(lambda trial: self._objective(trial, name, X, y, cv_folds, threads),
+                           n_trials=remaining, timeout=timeout)
+        try:
+            return study.best_params
+        except ValueError:
+            logger.warning(f"No finished trials in study {study.study_name}; "
+                           f"keeping the {name} parameters")
+            return {}
     
-    def _objective(self, trial: optuna.Trial, X: pd.DataFrame, y: np.ndarray) -> float:
-        """Optimization objective for Optuna"""
-        params = {
-            'rf': {
-                'n_estimators': trial.suggest_int('rf_n_estimators', 100, 500),
-                'max_depth': trial.suggest_int('rf_max_depth', 5, 30),
-                'min_samples_split': trial.suggest_int('rf_min_samples_split', 2, 10)
-            },
-            'lgbm': {
-                'n_estimators': trial.suggest_int('lgbm_n_estimators', 100, 500),
-                'max_depth': trial.suggest_int('lgbm_max_depth', 5, 30),
-                'learning_rate': trial.suggest_float('lgbm_learning_rate', 0.01, 0.1)
-            },
-            'catboost': {
-                'iterations': trial.suggest_int('catboost_iterations', 100, 500),
-                'depth': trial.suggest_int('catboost_depth', 5, 30),
-                'learning_rate': trial.suggest_float('catboost_learning_rate', 0.01, 0.1)
+    def _search_space(self, trial: optuna.Trial, name: str) -> Dict[str, Any]:
+        """Hyperparameters of member ``name`` suggested by ``trial``"""
+        if name == 'rf':
+            return {
+                'n_estimators': trial.suggest_int('n_estimators', 100, 500),
+                'max_depth': trial.suggest_int('max_depth', 5, 30),
+                'min_samples_split': trial.suggest_int('min_samples_split', 2, 10)
             }
-        }
-        
-        scores = []
+        if name == 'lgbm':
+            return {
+                'n_estimators': trial.suggest_int('n_estimators', 100, 500),
+                'max_depth': trial.suggest_int('max_depth', 5, 30),
+                'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.1)
+            }
+        if name == 'catboost':
+            return {
+                'iterations': trial.suggest_int('iterations', 100, 500),
+                # CatBoost trees can be at most 16 deep
+                'depth': trial.suggest_int('depth', 4, 10),
+                'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.1)
+            }
+        return {}
+
+    def _objective(self,
+                   trial: optuna.Trial,
+                   name: str,
+                   X: pd.DataFrame,
+                   y: np.ndarray,
+                   cv_folds: Optional[int] = None,
+                   threads: int = 1) -> float:
+        """Optimization objective for Optuna: mean CV accuracy of one member
+
+        The running mean is reported after every fold so that the pruner can stop
+        the trial early.
+        """
+        model = clone(self.models[name]).set_params(**self._search_space(trial, name))
         # prevent cv splits > samples
-        n_samples = len(X)
-        cv_folds = min(5, n_samples)
-        for name, model in self.models.items():
-            model.set_params(**params[name])
-            score = cross_val_score(model, X, y, cv=cv_folds).mean()
-            scores.append(score)
-        
-        return np.mean(scores)
+        splitter = check_cv(cv_folds or min(5, len(X)), y, classifier=True)
+        scores = []
+        for step, (train, test) in enumerate(splitter.split(X, y)):
+            scores.append(_fold_score(model, X, y, train, test, threads))
+            trial.report(float(np.mean(scores)), step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return float(np.mean(scores))
     
     def _calculate_shap_values(self, X: pd.DataFrame) -> Dict[str, np.ndarray]:
         """Calculate SHAP values for feature importance"""
@@ -130,6 +371,28 @@ class EnsembleWildfireModel(BaseModel):
         importance_df['mean_importance'] = importance_df.mean(axis=1)
         return importance_df.sort_values('mean_importance', ascending=False)
 
+    def save_model(self, path: Path) -> None:
+        """Save a trained ensemble as a model bundle directory (see ``app.ml.bundle``)"""
+        if self.encoder is None:
+            # Nothing trained here; keep the single-file format for a plain model
+            super().save_model(path)
+            return
+        bundle = ModelBundle(encoder=self.encoder, members=self.models,
+                             weights=self.member_weights)
+        bundle.save(path)
+        self.model_path = path
+
+    def load_model(self, path: Path, mmap_mode: Optional[str] = 'r') -> None:
+        """Load a model bundle (memory-mapped by default) or a single-file model"""
+        if not is_bundle(path):
+            super().load_model(path)
+            return
+        bundle = ModelBundle.load(path, mmap_mode=mmap_mode)
+        self.encoder = bundle.encoder
+        self.models = bundle.members
+        self.member_weights = bundle.weights
+        self.model_path = path
+
     def generate_alerts(self, prediction: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Generate alerts based on risk predictions."""
         # Default stub for alert generation
@@ -0,0 +1,91 @@
+"""Running ensemble members side by side within one core budget.
+
+RandomForest, LightGBM and CatBoost each default to every core, so fitting the three
+members at once, each cross-validating several folds, would start members x folds x
+cores threads. ``CoreBudget.split`` divides a fixed number of cores between the
+members running at once, the folds each of them runs at once and the threads of
+each fit, and ``set_threads`` passes a member its share through ``n_jobs`` or
+``thread_count``. Members run in a thread pool (the libraries release the GIL while
+fitting and predicting), a process pool, or one after another.
+"""
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+EXECUTION_MODES = ('serial', 'thread', 'process')
+
+
+def available_cores(n_jobs: Optional[int] = None) -> int:
+    """``n_jobs`` if positive, otherwise the cores this process may run on."""
+    if n_jobs and n_jobs > 0:
+        return n_jobs
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class CoreBudget:
+    """How ``cores`` are shared out; members x folds x threads never exceeds them."""
+    members: int  # members running at once
+    folds: int    # CV folds each member runs at once
+    threads: int  # threads of each fit or predict call
+
+    @classmethod
+    def split(cls, cores: int, n_members: int, n_folds: int = 1) -> 'CoreBudget':
+        cores = max(1, cores)
+        members = max(1, min(n_members, cores))
+        per_member = max(1, cores // members)
+        folds = max(1, min(n_folds, per_member))
+        return cls(members, folds, max(1, per_member // folds))
+
+
+def set_threads(model: Any, threads: int) -> Any:
+    """Limit ``model`` to ``threads`` threads; models without such a setting are left alone."""
+    if not hasattr(model, 'set_params'):
+        return model
+    # CatBoost only reports parameters that were set explicitly, so match it by module;
+    # it refuses parameter changes once fitted, so fitted models keep their setting
+    if type(model).__module__.startswith('catboost'):
+        if not model.is_fitted():
+            model.set_params(thread_count=threads)
+    elif 'n_jobs' in model.get_params():
+        model.set_params(n_jobs=threads)
+    return model
+
+
+def predict_threads(model: Any, threads: int) -> Dict[str, int]:
+    """Keyword arguments limiting one predict call of ``model`` to ``threads`` threads.
+
+    Only CatBoost needs them: a fitted CatBoost model keeps its ``thread_count``
+    (see ``set_threads``) but takes a per-call one at predict time.
+    """
+    if type(model).__module__.startswith('catboost'):
+        return {'thread_count': threads}
+    return {}
+
+
+@contextmanager
+def member_executor(mode: str, workers: int) -> Iterator[Optional[Executor]]:
+    """Pool for ``mode`` with ``workers`` workers, or None when members run one at a time."""
+    if mode not in EXECUTION_MODES:
+        raise ValueError(f"execution must be one of {EXECUTION_MODES}, not {mode!r}")
+    if mode == 'serial' or workers <= 1:
+        yield None
+        return
+    pool_class = ThreadPoolExecutor if mode == 'thread' else ProcessPoolExecutor
+    with pool_class(max_workers=workers) as pool:
+        yield pool
+
+
+def map_members(fn: Callable[..., Any],
+                jobs: Dict[str, Tuple],
+                executor: Optional[Executor] = None) -> Dict[str, Any]:
+    """``{name: fn(*args)}`` for every job, run on ``executor`` when given."""
+    if executor is None:
+        return {name: fn(*args) for name, args in jobs.items()}
+    futures = {name: executor.submit(fn, *args) for name, args in jobs.items()}
+    return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,73 @@
+"""Persistent, prunable Optuna studies for tuning ensemble members.
+
+Each member is tuned in its own study, so a trial only fits one model and its
+search space is not tied to the other members'. Studies live in a SQLite file and
+are named after the training data by default: when ``train`` runs again on the same
+data, it resumes the studies and adds only the trials still missing. A study can
+also be seeded with the best parameters of an earlier study, for example one tuned
+on last season's data. Trials report their running CV score after every fold, so the
+pruner can stop a poor configuration after the first few folds.
+"""
+import hashlib
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import optuna
+import pandas as pd
+from optuna.trial import TrialState
+
+from ..logger import logger
+
+PRUNERS = ('median', 'hyperband', 'none')
+
+
+def study_storage(path: Union[str, Path, None]) -> Optional[optuna.storages.BaseStorage]:
+    """SQLite storage at ``path``, or None (in memory) when no path is given."""
+    if not path:
+        return None
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Member studies are tuned from several threads; wait for the write lock instead of failing
+    return optuna.storages.RDBStorage(f'sqlite:///{path}',
+                                      engine_kwargs={'connect_args': {'timeout': 60}})
+
+
+def make_pruner(kind: str, n_folds: int) -> optuna.pruners.BasePruner:
+    """Pruner for trials that report once per CV fold."""
+    if kind == 'median':
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=1)
+    if kind == 'hyperband':
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=n_folds)
+    if kind == 'none':
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"pruner must be one of {PRUNERS}, not {kind!r}")
+
+
+def data_fingerprint(X: pd.DataFrame, y: np.ndarray) -> str:
+    """Short hash of the training rows and labels, used to name their studies."""
+    digest = hashlib.sha1()
+    digest.update(','.join(map(str, X.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def finished_trials(study: optuna.Study) -> int:
+    """Trials that ran to the end or were pruned; failed ones are retried."""
+    return len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)))
+
+
+def enqueue_best(study: optuna.Study,
+                 source: str,
+                 storage: Optional[optuna.storages.BaseStorage]) -> None:
+    """Make the best parameters of study ``source`` the first trial of a new ``study``."""
+    if finished_trials(study):
+        return
+    try:
+        params = optuna.load_study(study_name=source, storage=storage).best_params
+    except (KeyError, ValueError):
+        logger.warning(f"No finished trials in study {source} "
+                       f"to warm-start {study.study_name} from")
+        return
+    study.enqueue_trial(params)
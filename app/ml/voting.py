@@ -0,0 +1,45 @@
+"""Soft voting over the members' positive-class probabilities.
+
+The members' probabilities are stacked into one ``(n_rows, n_members)`` float32
+matrix. A row's risk score is the weighted mean of its row in that matrix. Weights
+are uniform unless learned from out-of-fold probabilities with non-negative least
+squares. Cells left NaN belong to members that were skipped for that row, because
+the members already scored agreed closely enough, and they are left out of that
+row's mean.
+"""
+from typing import Any, Optional
+
+import numpy as np
+from scipy.optimize import nnls
+
+
+def positive_column(model: Any) -> int:
+    """Column of ``model.predict_proba`` holding the probability of class 1."""
+    classes = list(getattr(model, 'classes_', [0, 1]))
+    return classes.index(1) if 1 in classes else len(classes) - 1
+
+
+def combine(probabilities: np.ndarray, weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """Weighted mean of each row, ignoring NaN (skipped) cells."""
+    n_members = probabilities.shape[1]
+    if weights is None:
+        weights = np.ones(n_members, dtype=np.float32)
+    else:
+        weights = np.asarray(weights, dtype=np.float32)
+    scored = ~np.isnan(probabilities)
+    total = np.where(scored, probabilities, 0) @ weights
+    weight = scored @ weights
+    result = np.divide(total, weight, out=np.zeros(len(total), dtype=np.float32), where=weight > 0)
+    # Rows scored only by members weighted zero fall back to their plain mean
+    unweighted = weight <= 0
+    if unweighted.any():
+        result[unweighted] = np.nanmean(probabilities[unweighted], axis=1)
+    return result
+
+
+def fit_weights(probabilities: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Non-negative weights, summing to one, that best fit ``y`` from out-of-fold probabilities."""
+    weights, _ = nnls(np.asarray(probabilities, dtype=np.float64), np.asarray(y, dtype=np.float64))
+    if weights.sum() <= 0:
+        return np.full(probabilities.shape[1], 1 / probabilities.shape[1])
+    return weights / weights.sum()
@@ -0,0 +1,166 @@
+"""Process-wide registry of trained models and reference data.
+
+Components are loaded once, at application startup through ``lifespan`` (or lazily
+on first use), and shared across requests so that handlers only run inference.
+The time each component took to warm up is recorded and exposed for monitoring.
+"""
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, ClassVar, Dict, Optional, Tuple
+
+import geopandas as gpd
+import joblib
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+
+from .config import BOUNDARY_PATH, DATA_DIR, FIRE_WINDOW_MODEL_DIR, RISK_MODEL_PATH
+from .data_processing.data_loader import DataLoader
+from .logger import logger
+from .risk_grid import clear_risk_grid_cache, model_available
+
+# Daily weather features the fire-window classifiers are trained on
+FIRE_WINDOW_FEATURES = ['TAVG', 'RHAV', 'AWND']
+
+
+def load_boundary(path: Path = BOUNDARY_PATH) -> gpd.GeoDataFrame:
+    """Pinelands boundary in EPSG:4326."""
+    if not path.exists():
+        raise FileNotFoundError(f"Boundary shapefile not found at {path}")
+    return gpd.read_file(path).to_crs("EPSG:4326")
+
+
+def load_predictor(model_path: Path = RISK_MODEL_PATH, data_dir: Path = DATA_DIR):
+    """WildfirePredictor with its ensemble, analyzers and data loader."""
+    # Imported lazily: the predictor pulls in the CV and NLP stacks
+    from .prediction import WildfirePredictor
+    return WildfirePredictor(model_path, data_dir)
+
+
+def load_fire_window_models(directory: Path = FIRE_WINDOW_MODEL_DIR) -> Dict[str, Any]:
+    """Trained fire-window classifiers saved as ``<name>.joblib``."""
+    if not directory.exists():
+        return {}
+    return {path.stem: joblib.load(path) for path in sorted(directory.glob('*.joblib'))}
+
+
+def save_fire_window_models(models: Dict[str, Any],
+                            directory: Path = FIRE_WINDOW_MODEL_DIR) -> None:
+    """Persist fire-window classifiers for ``load_fire_window_models``."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, model in models.items():
+        joblib.dump(model, directory / f'{name}.joblib')
+
+
+@dataclass
+class ModelRegistry:
+    """Shared models and reference data with per-component warm-up timings."""
+    boundary_path: Path = BOUNDARY_PATH
+    data_dir: Path = DATA_DIR
+    risk_model_path: Path = RISK_MODEL_PATH
+    fire_window_model_dir: Path = FIRE_WINDOW_MODEL_DIR
+
+    boundary: Optional[gpd.GeoDataFrame] = None
+    data_loader: Optional[DataLoader] = None
+    predictor: Optional[Any] = None
+    fire_window_models: Dict[str, Any] = field(default_factory=dict)
+    warmup_seconds: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    # Loaded at startup; the data loader is cheap and created on first use instead,
+    # since it creates the data directories
+    warm_components: ClassVar[Tuple[str, ...]] = ('boundary', 'predictor', 'fire_window_models')
+
+    def loaders(self) -> Dict[str, Callable[[], Any]]:
+        return {
+            'boundary': lambda: load_boundary(self.boundary_path),
+            'data_loader': lambda: DataLoader(self.data_dir),
+            'predictor': lambda: load_predictor(self.risk_model_path, self.data_dir),
+            'fire_window_models': lambda: load_fire_window_models(self.fire_window_model_dir)
+        }
+
+    def warm_up(self, force: bool = False) -> 'ModelRegistry':
+        """Load the startup components not loaded yet (all of them when ``force``)."""
+        for name in self.warm_components:
+            if force or name not in self.warmup_seconds:
+                self._load(name)
+        logger.info("Model registry warm-up: " + ", ".join(
+            f"{name}={seconds:.2f}s" for name, seconds in self.warmup_seconds.items()
+        ))
+        return self
+
+    def reload(self, name: str) -> Any:
+        """Load component ``name`` again, e.g. after new models were saved for it."""
+        self._load(name)
+        # Cached risk grids were scored with the components loaded before
+        clear_risk_grid_cache()
+        return getattr(self, name)
+
+    def get_boundary(self) -> Optional[gpd.GeoDataFrame]:
+        return self._get('boundary')
+
+    def get_data_loader(self) -> DataLoader:
+        return self._get('data_loader')
+
+    def get_predictor(self):
+        return self._get('predictor')
+
+    def get_fire_window_models(self) -> Dict[str, Any]:
+        return self._get('fire_window_models')
+
+    def status(self) -> Dict[str, Any]:
+        """Which components are loaded, their warm-up times and any load errors."""
+        predictor_parts = getattr(self.predictor, 'component_load_seconds', {})
+        return {
+            'loaded': {
+                'boundary': self.boundary is not None,
+                'data_loader': self.data_loader is not None,
+                'predictor': self.predictor is not None,
+                'risk_model': model_available(self.predictor),
+                'fire_window_models': sorted(self.fire_window_models)
+            },
+            'warmup_seconds': dict(self.warmup_seconds,
+                                   **{f'predictor.{k}': v for k, v in predictor_parts.items()}),
+            'errors': dict(self.errors)
+        }
+
+    def _get(self, name: str) -> Any:
+        if name not in self.warmup_seconds:
+            self._load(name)
+        return getattr(self, name)
+
+    def _load(self, name: str) -> None:
+        # Only successful loads count as warmed, so a failed component is retried later
+        start = time.perf_counter()
+        try:
+            setattr(self, name, self.loaders()[name]())
+        except Exception as e:
+            self.errors[name] = str(e)
+            logger.warning(f"Could not load {name}: {e}")
+            return
+        self.errors.pop(name, None)
+        self.warmup_seconds[name] = time.perf_counter() - start
+
+
+registry = ModelRegistry()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the shared registry before the app starts serving requests.
+
+    Also starts the shared fire-spread ensemble pool, and on shutdown stops it and
+    the fire-window training pool.
+    """
+    from .fire_ensemble import ensemble_pool
+    from .fire_window import job_manager
+
+    await run_in_threadpool(registry.warm_up)
+    app.state.registry = registry
+    ensemble_pool.start()
+    try:
+        yield
+    finally:
+        job_manager.shutdown()
+        ensemble_pool.shutdown()
@@ -1,40 +1,58 @@
+import asyncio
+import time
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import geopandas as gpd
 
 from .cv.satellite_analyzer import SatelliteAnalyzer
-from .data_processing.data_loader import DataLoader
+from .data_processing.data_loader import DataLoader, load_sources
 from .ml.ensemble_wildfire_model import EnsembleWildfireModel
 from .nlp.report_generator import ReportGenerator
 from .risk_category import RiskCategory
 from .risk_analysis.fuel_analyzer import FuelAnalyzer
 from .risk_analysis.structure_analyzer import StructureAnalyzer
+from .utils import run_sync
+
+# NOAA daily datatypes behind the model's weather features
+AREA_WEATHER_LAYERS = {'TAVG': 'temperature', 'RHAV': 'humidity', 'AWND': 'wind_speed'}
+
 
 class WildfirePredictor:
     def __init__(self, model_path: Optional[Path] = None, data_dir: Optional[Path] = None):
         """Initialize wildfire prediction system with ML, CV, NLP components"""
+        # Seconds spent constructing each component
+        self.component_load_seconds: Dict[str, float] = {}
+
         # Initialize ML model
-        self.ml_model = EnsembleWildfireModel(model_path)
+        self.ml_model = self._timed('ml_model', lambda: EnsembleWildfireModel(model_path))
         self.n_features = 10  # Number of input features
 
         # Initialize CV analyzer
-        self.cv_analyzer = SatelliteAnalyzer()
+        self.cv_analyzer = self._timed('cv_analyzer', SatelliteAnalyzer)
 
         # Initialize NLP report generator
-        self.report_generator = ReportGenerator()
+        self.report_generator = self._timed('report_generator', ReportGenerator)
 
         # Initialize risk analyzers
         if data_dir:
-            self.structure_analyzer = StructureAnalyzer(data_dir)
+            self.structure_analyzer = self._timed('structure_analyzer',
+                                                  lambda: StructureAnalyzer(data_dir))
         else:
             self.structure_analyzer = None
         # Fuel analyzer always available for integration and testing
-        self.fuel_analyzer = FuelAnalyzer(data_dir)
+        self.fuel_analyzer = self._timed('fuel_analyzer', lambda: FuelAnalyzer(data_dir))
         self.data_loader = DataLoader(data_dir) if data_dir else None
 
+    def _timed(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Build a component, recording how long it took"""
+        start = time.perf_counter()
+        component = factory()
+        self.component_load_seconds[name] = time.perf_counter() - start
+        return component
+
     def analyze_area(
             self,
             area_data: gpd.GeoDataFrame,
@@ -43,11 +61,78 @@ class WildfirePredictor:
             date: Optional[pd.Timestamp] = None,
             analysis_mode: str = "basic"
     ) -> Dict[str, Any]:
-        """Comprehensive area analysis using ML, CV, NLP, and risk analysis components"""
+        """Comprehensive area analysis using ML, CV, NLP, and risk analysis components
+
+        Blocking; inside an event loop, await ``analyze_area_async`` instead.
+        """
+        return run_sync(self.analyze_area_async(area_data, satellite_image, location_name,
+                                                date, analysis_mode))
+
+    async def load_area_sources(
+            self,
+            area_data: gpd.GeoDataFrame,
+            date: pd.Timestamp,
+            timeouts: Optional[Dict[str, float]] = None
+    ) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """Weather, traffic, buildings and camping sites for the area, loaded concurrently"""
+        date = pd.Timestamp(date)
+        return await load_sources(self.data_loader, {
+            # Past week of observations up to the analysis date
+            'weather_data': ('load_weather_data',
+                             (tuple(area_data.total_bounds), date - pd.Timedelta(days=7), date)),
+            'traffic_data': ('load_traffic_data', (area_data, date)),
+            'buildings': ('load_buildings', (area_data,)),
+            'camping_sites': ('load_camping_sites', (area_data,)),
+        }, timeouts)
+
+    async def area_layers(
+            self,
+            area_data: gpd.GeoDataFrame,
+            date: pd.Timestamp,
+            timeouts: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """Feature layers for the area (see ``build_cell_features``) from the data loader
+
+        Temperature, humidity and wind speed are the past week's means and the
+        vegetation type is the most common land cover; anything that did not load is
+        left out, so it falls back to the default conditions.
+        """
+        if self.data_loader is None:
+            return {}
+        date = pd.Timestamp(date)
+        sources, _ = await load_sources(self.data_loader, {
+            'weather_data': ('load_weather_data',
+                             (tuple(area_data.total_bounds), date - pd.Timedelta(days=7), date)),
+            'land_use': ('load_land_use_data', (area_data,)),
+        }, timeouts)
+        layers: Dict[str, Any] = {}
+        weather = sources['weather_data']
+        if weather is not None:
+            for column, name in AREA_WEATHER_LAYERS.items():
+                value = weather[column].mean() if column in weather.columns else np.nan
+                if pd.notna(value):
+                    layers[name] = float(value)
+        land_use = sources['land_use']
+        landcover = None if land_use is None else land_use.get('landcover')
+        if landcover is not None and landcover.notna().any():
+            layers['vegetation_type'] = landcover.mode()[0]
+        return layers
+
+    async def analyze_area_async(
+            self,
+            area_data: gpd.GeoDataFrame,
+            satellite_image: Optional[np.ndarray] = None,
+            location_name: str = "selected area",
+            date: Optional[pd.Timestamp] = None,
+            analysis_mode: str = "basic",
+            source_timeouts: Optional[Dict[str, float]] = None
+    ) -> Dict[str, Any]:
+        """analyze_area for async callers; professional data sources load concurrently"""
         date = date or pd.Timestamp.now()
 
-        # Get ML predictions with mode-specific features
-        ml_predictions = self.ml_model.predict(area_data)
+        # Get ML predictions with mode-specific features; scoring and report generation
+        # run in threads so that async callers keep serving other requests meanwhile
+        ml_predictions = await asyncio.to_thread(self.ml_model.predict, area_data)
 
         # Calculate risk score and category
         risk_score = float(ml_predictions['risk_score'].mean())
@@ -95,17 +180,23 @@ class WildfirePredictor:
 
         # Add structure and infrastructure analysis based on mode
         if self.structure_analyzer and self.data_loader and analysis_mode == 'professional':
-            # Load additional data
-            weather_data = self.data_loader.load_weather_data(area_data, date)
-            traffic_data = self.data_loader.load_traffic_data(area_data, date)
-            buildings = self.data_loader.load_buildings(area_data)
-            camping_sites = self.data_loader.load_camping_sites(area_data)
-
-            # Analyze structures and infrastructure
-            structure_risks = self.structure_analyzer.analyze_building_vulnerability(buildings)
-            camping_risks = self.structure_analyzer.analyze_camping_areas(camping_sites, {'date': date})
+            # Load additional data; the sources are fetched at the same time, each with its
+            # own timeout
+            sources, source_errors = await self.load_area_sources(area_data, date, source_timeouts)
+            weather_data = sources['weather_data']
+            traffic_data = sources['traffic_data']
+            buildings = sources['buildings']
+            camping_sites = sources['camping_sites']
+
+            # Analyze structures and infrastructure; a source that did not load contributes nothing
+            structure_risks = (self.structure_analyzer.analyze_building_vulnerability(buildings)
+                               if buildings is not None else [])
+            camping_risks = (self.structure_analyzer.analyze_camping_areas(camping_sites,
+                                                                           {'date': date})
+                             if camping_sites is not None else [])
             fuel_hazards = self.fuel_analyzer.analyze_fuel_hazards(area_data)
 
+            # traffic_analysis stays in the results as None when traffic did not load
             results.update({
                 'structure_risks': structure_risks,
                 'camping_risks': camping_risks,
@@ -113,6 +204,8 @@ class WildfirePredictor:
                 'fuel_hazards': fuel_hazards,
                 'weather_data': weather_data
             })
+            if source_errors:
+                results['source_errors'] = source_errors
 
             # Add fuel hazard analysis
             if self.fuel_analyzer:
@@ -162,7 +255,8 @@ class WildfirePredictor:
             if isinstance(fh, dict) and 'hazard_score' in fh:
                 report_data['fuel_hazard_score'] = fh['hazard_score']
 
-        report = self.report_generator.generate_risk_report(
+        report = await asyncio.to_thread(
+            self.report_generator.generate_risk_report,
             risk_data=report_data,
             location=location_name
         )
@@ -203,7 +297,8 @@ class WildfirePredictor:
             X['slope'] = X['slope'] / 90  # Scale to [0,1] range
             X['aspect'] = X['aspect'] / 360  # Scale to [0,1] range
             X['distance_to_roads'] = X['distance_to_roads'] / 1000  # Scale to kilometers
-            X['distance_to_power_lines'] = X['distance_to_power_lines'] / 1000  # Scale to kilometers
+            # Scale to kilometers
+            X['distance_to_power_lines'] = X['distance_to_power_lines'] / 1000
             X['temperature'] = (X['temperature'] - 20) / 20  # Center around 20°C and scale
             X['humidity'] = X['humidity'] / 100  # Scale to [0,1]
             X['wind_speed'] = X['wind_speed'] / 20  # Scale by typical max wind speed
@@ -251,8 +346,8 @@ class WildfirePredictor:
                 )
 
         # Traffic and evacuation recommendations
-        if 'traffic_analysis' in analysis_results:
-            traffic = analysis_results['traffic_analysis']
+        traffic = analysis_results.get('traffic_analysis')
+        if traffic is not None:
             if traffic['congestion_risk'].mean() > 0.7:
                 recommendations.append(
                     "High traffic congestion risk. Review evacuation routes."
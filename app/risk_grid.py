@@ -0,0 +1,229 @@
+"""Whole-region wildfire risk scoring on a regular lat/lng grid.
+
+The Pine Barrens bounds are tiled into square cells at a configurable resolution
+(degrees). Features for every cell are built in one vectorized pass through
+``WildfirePredictor.prepare_features`` and scored with a single batched model call.
+Scores are kept as compact float32 arrays cached per (resolution, valid hour,
+feature layers). Each grid carries a run id derived from the model version, the
+resolution, the layers and the valid hour, so every process scoring the same
+inputs agrees on it.
+"""
+import hashlib
+import math
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import PINE_BARRENS
+
+DEFAULT_RESOLUTION = 0.01  # degrees, about 1.1 km north-south
+MAX_GRID_CELLS = 1_000_000
+MAX_CACHED_GRIDS = 8
+
+# Typical Pinelands conditions used for any feature layer not supplied
+DEFAULT_CELL_CONDITIONS: Dict[str, Any] = {
+    'elevation': 30.0,                 # meters
+    'slope': 1.0,                      # degrees
+    'aspect': 180.0,                   # degrees
+    'vegetation_type': 'pine_scrub_oak',
+    'soil_moisture': 0.2,
+    'distance_to_roads': 1000.0,       # meters
+    'distance_to_power_lines': 2000.0,  # meters
+    'temperature': 20.0,               # Celsius
+    'humidity': 50.0,                  # percentage
+    'wind_speed': 5.0                  # m/s
+}
+
+# Valid-hour prefix of run ids; sorts chronologically
+RUN_HOUR_FORMAT = '%Y%m%d%H'
+
+# Cache of scored grids keyed by (resolution, valid hour, layers fingerprint)
+_grid_cache: Dict[Tuple[float, pd.Timestamp, Optional[str]], 'RiskGrid'] = {}
+
+
+@dataclass
+class RiskGrid:
+    """Risk scores for a regular grid; row 0 is the northern edge."""
+    scores: np.ndarray  # float32, shape (n_rows, n_cols)
+    bounds: Dict[str, float]
+    resolution: float
+    valid_time: pd.Timestamp
+    # Identifies one scoring run; derived products such as map tiles are keyed on it
+    run_id: str = ''
+
+    def __post_init__(self):
+        if not self.run_id:
+            self.run_id = risk_run_id(None, self.resolution, self.valid_time)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.scores.shape
+
+    def cell_centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Latitudes of the rows and longitudes of the columns."""
+        n_rows, n_cols = self.shape
+        lat = self.bounds['north'] - (np.arange(n_rows) + 0.5) * self.resolution
+        lng = self.bounds['west'] + (np.arange(n_cols) + 0.5) * self.resolution
+        return lat, lng
+
+    def window(self, south: float, west: float, north: float, east: float) -> np.ndarray:
+        """Scores of the cells whose centres fall inside a lat/lng box."""
+        lat, lng = self.cell_centers()
+        rows = np.flatnonzero((lat >= south) & (lat <= north))
+        cols = np.flatnonzero((lng >= west) & (lng <= east))
+        if len(rows) == 0 or len(cols) == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        return self.scores[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+    def top_cells(self, limit: int) -> pd.DataFrame:
+        """The ``limit`` highest-risk cells with their centre coordinates."""
+        flat = self.scores.ravel()
+        limit = min(limit, flat.size)
+        if limit <= 0:
+            return pd.DataFrame({'lat': [], 'lng': [], 'riskScore': []})
+        idx = np.argpartition(flat, flat.size - limit)[flat.size - limit:]
+        idx = idx[np.argsort(flat[idx])[::-1]]
+        rows, cols = np.unravel_index(idx, self.shape)
+        lat, lng = self.cell_centers()
+        return pd.DataFrame({'lat': lat[rows], 'lng': lng[cols], 'riskScore': flat[idx]})
+
+    def to_dict(self, decimals: int = 3) -> Dict[str, Any]:
+        """Compact JSON-ready grid with row-major scores."""
+        return {
+            'runId': self.run_id,
+            'validTime': self.valid_time.isoformat(),
+            'resolution': self.resolution,
+            'bounds': self.bounds,
+            'shape': list(self.shape),
+            'riskScores': self.scores.round(decimals).tolist()
+        }
+
+
+def grid_shape(resolution: float, bounds: Optional[Mapping[str, float]] = None) -> Tuple[int, int]:
+    """Rows and columns needed to cover ``bounds`` at ``resolution`` degrees."""
+    if resolution <= 0:
+        raise ValueError("resolution must be positive")
+    bounds = bounds or PINE_BARRENS['bounds']
+    n_rows = math.ceil(round((bounds['north'] - bounds['south']) / resolution, 9))
+    n_cols = math.ceil(round((bounds['east'] - bounds['west']) / resolution, 9))
+    if n_rows * n_cols > MAX_GRID_CELLS:
+        raise ValueError(f"resolution {resolution} gives more than {MAX_GRID_CELLS} cells")
+    return n_rows, n_cols
+
+
+def build_cell_features(shape: Tuple[int, int],
+                        layers: Optional[Mapping[str, Any]] = None) -> pd.DataFrame:
+    """Raw feature table with one row per cell (row-major).
+
+    Each layer is a scalar, a (n_rows, n_cols) raster or a flat per-cell array;
+    missing layers fall back to DEFAULT_CELL_CONDITIONS.
+    """
+    n_cells = shape[0] * shape[1]
+    values = dict(DEFAULT_CELL_CONDITIONS, **(layers or {}))
+    return pd.DataFrame({
+        name: np.broadcast_to(np.asarray(value).reshape(-1) if np.ndim(value) > 1 else value,
+                              n_cells)
+        for name, value in values.items()
+    })
+
+
+def layers_fingerprint(layers: Optional[Mapping[str, Any]]) -> Optional[str]:
+    """Digest of the layers' names, shapes and values; None when there are none."""
+    if not layers:
+        return None
+    digest = hashlib.sha1()
+    for name in sorted(layers):
+        value = np.asarray(layers[name])
+        digest.update(f'{name}|{value.dtype}|{value.shape}|'.encode())
+        digest.update(value.tobytes() if value.dtype != object else repr(value.tolist()).encode())
+    return digest.hexdigest()[:16]
+
+
+def score_risk_grid(predictor,
+                    resolution: float = DEFAULT_RESOLUTION,
+                    valid_time: Optional[datetime] = None,
+                    layers: Optional[Mapping[str, Any]] = None) -> RiskGrid:
+    """Score every cell of the Pine Barrens grid with one batched model call.
+
+    Args:
+        predictor: WildfirePredictor whose model scores the cells.
+        resolution: Cell size in degrees.
+        valid_time: Time the conditions in ``layers`` are valid for.
+        layers: Per-cell feature layers, see ``build_cell_features``.
+    """
+    shape = grid_shape(resolution)
+    bounds = PINE_BARRENS['bounds']
+    features = predictor.prepare_features(build_cell_features(shape, layers))
+    predictions = predictor.ml_model.predict(features)
+    scores = np.asarray(predictions['risk_score'], dtype=np.float32).reshape(shape)
+    return RiskGrid(
+        scores=scores,
+        bounds={
+            'north': bounds['north'],
+            'south': bounds['north'] - shape[0] * resolution,
+            'east': bounds['west'] + shape[1] * resolution,
+            'west': bounds['west']
+        },
+        resolution=resolution,
+        valid_time=_valid_hour(valid_time),
+        run_id=risk_run_id(model_version(predictor), resolution, valid_time,
+                           layers_fingerprint(layers))
+    )
+
+
+def get_risk_grid(predictor,
+                  resolution: float = DEFAULT_RESOLUTION,
+                  valid_time: Optional[datetime] = None,
+                  layers: Optional[Mapping[str, Any]] = None) -> RiskGrid:
+    """Cached ``score_risk_grid`` keyed by (resolution, valid hour, layers)."""
+    key = (float(resolution), _valid_hour(valid_time), layers_fingerprint(layers))
+    grid = _grid_cache.get(key)
+    if grid is None:
+        grid = score_risk_grid(predictor, resolution, key[1], layers)
+        if len(_grid_cache) >= MAX_CACHED_GRIDS:
+            _grid_cache.pop(next(iter(_grid_cache)))
+        _grid_cache[key] = grid
+    return grid
+
+
+def clear_risk_grid_cache() -> None:
+    """Drop all cached grids, e.g. after a new model has been loaded."""
+    _grid_cache.clear()
+
+
+def model_available(predictor) -> bool:
+    """Whether the predictor (None if it failed to load) has a trained model to score with."""
+    return getattr(getattr(predictor, 'ml_model', None), 'is_fitted', False)
+
+
+def model_version(predictor) -> Optional[str]:
+    """The predictor's model file (or bundle directory) and its modification time."""
+    path = getattr(getattr(predictor, 'ml_model', None), 'model_path', None)
+    if path is None or not Path(path).exists():
+        return None
+    return f'{Path(path).resolve()}@{Path(path).stat().st_mtime_ns}'
+
+
+def risk_run_id(version: Optional[str],
+                resolution: float,
+                valid_time: Optional[datetime],
+                layers: Optional[str] = None) -> str:
+    """Run id of a grid: its valid hour, then a digest of the model, resolution and layers."""
+    digest = hashlib.sha1(f'{version}|{float(resolution)!r}|{layers}'.encode()).hexdigest()[:10]
+    return f'{_valid_hour(valid_time).strftime(RUN_HOUR_FORMAT)}-{digest}'
+
+
+def run_valid_hour(run_id: str) -> Optional[pd.Timestamp]:
+    """Valid hour encoded in a run id from ``risk_run_id``, None for any other name."""
+    try:
+        return pd.Timestamp(datetime.strptime(run_id.split('-', 1)[0], RUN_HOUR_FORMAT))
+    except ValueError:
+        return None
+
+
+def _valid_hour(valid_time: Optional[datetime]) -> pd.Timestamp:
+    return pd.Timestamp(valid_time or datetime.now()).floor('h')
@@ -0,0 +1,190 @@
+"""Web-mercator (XYZ) PNG tiles of the risk grid and their two-level cache.
+
+Tiles are rendered straight from a RiskGrid's float32 scores by nearest-cell
+lookup. TileCache keeps recent tiles in an in-memory LRU backed by a size-bounded
+directory on disk; both are keyed on the grid's run id, so tiles from an older
+prediction run are dropped as soon as a new run is served. Several processes may
+share the directory: run ids are deterministic, so they share a run's tiles, and
+only directories of runs for an earlier valid hour are deleted.
+"""
+import shutil
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from .risk_grid import RiskGrid, run_valid_hour
+
+TILE_SIZE = 256
+MAX_ZOOM = 18
+
+# Risk colour ramp; stops follow the RiskCategory thresholds (0.3 and 0.7)
+COLOR_STOPS = np.array([0.0, 0.3, 0.7, 1.0])
+COLOR_RAMP = np.array([
+    [34, 139, 34],   # low: forest green
+    [255, 215, 0],   # moderate: gold
+    [255, 140, 0],   # high: dark orange
+    [178, 34, 34]    # extreme: firebrick
+], dtype=np.float64)
+TILE_ALPHA = 170
+
+
+def tile_pixel_centers(z: int, x: int, y: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Latitudes of the pixel rows and longitudes of the pixel columns of a tile."""
+    n = 2 ** z
+    offsets = (np.arange(TILE_SIZE) + 0.5) / TILE_SIZE
+    lng = (x + offsets) / n * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return lat, lng
+
+
+def colorize(scores: np.ndarray) -> np.ndarray:
+    """RGBA uint8 image for a score array; NaN scores are transparent."""
+    valid = np.isfinite(scores)
+    clipped = np.clip(np.where(valid, scores, 0.0), 0.0, 1.0)
+    rgba = np.zeros(scores.shape + (4,), dtype=np.uint8)
+    for channel in range(3):
+        rgba[..., channel] = np.interp(clipped, COLOR_STOPS, COLOR_RAMP[:, channel]).round()
+    rgba[..., 3] = np.where(valid, TILE_ALPHA, 0)
+    return rgba
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (height, width, 4) uint8 array as an RGBA PNG."""
+    height, width, _ = rgba.shape
+    # Each scanline is prefixed with filter type 0 (None)
+    raw = np.zeros((height, width * 4 + 1), dtype=np.uint8)
+    raw[:, 1:] = rgba.reshape(height, width * 4)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + tag + data
+                + struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6))
+            + chunk(b'IEND', b''))
+
+
+def render_tile(grid: RiskGrid, z: int, x: int, y: int) -> bytes:
+    """Render one XYZ tile of the risk grid as PNG bytes."""
+    lat, lng = tile_pixel_centers(z, x, y)
+    n_rows, n_cols = grid.shape
+    rows = np.floor((grid.bounds['north'] - lat) / grid.resolution).astype(np.int64)
+    cols = np.floor((lng - grid.bounds['west']) / grid.resolution).astype(np.int64)
+    row_ok = (rows >= 0) & (rows < n_rows)
+    col_ok = (cols >= 0) & (cols < n_cols)
+    scores = np.full((TILE_SIZE, TILE_SIZE), np.nan, dtype=np.float32)
+    if row_ok.any() and col_ok.any():
+        scores[np.ix_(row_ok, col_ok)] = grid.scores[np.ix_(rows[row_ok], cols[col_ok])]
+    return encode_png(colorize(scores))
+
+
+class TileCache:
+    """In-memory LRU of tile bytes in front of a size-bounded on-disk cache."""
+
+    def __init__(self,
+                 directory: Optional[Path] = None,
+                 max_memory_tiles: int = 2048,
+                 max_disk_bytes: int = 256 * 1024 * 1024):
+        self.directory = Path(directory) if directory else None
+        self.max_memory_tiles = max_memory_tiles
+        self.max_disk_bytes = max_disk_bytes
+        self.run_id: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._memory: 'OrderedDict[Tuple[int, int, int], bytes]' = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+
+    def ensure_run(self, run_id: str) -> None:
+        """Switch to ``run_id``, dropping the tiles of older runs.
+
+        Memory only holds the current run. On disk, a directory is deleted only when
+        its run is for an earlier valid hour than ``run_id``; runs for the same or a
+        later hour may still be served by another process.
+        """
+        with self._lock:
+            if run_id == self.run_id:
+                return
+            self.run_id = run_id
+            self._memory.clear()
+            self._disk_bytes = 0
+            if self.directory and self.directory.exists():
+                current = run_valid_hour(run_id)
+                for path in self.directory.iterdir():
+                    if path.name == run_id:
+                        self._disk_bytes = sum(f.stat().st_size for f in path.rglob('*.png'))
+                    elif path.is_dir() and current is not None:
+                        hour = run_valid_hour(path.name)
+                        if hour is not None and hour < current:
+                            shutil.rmtree(path, ignore_errors=True)
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        key = (z, x, y)
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+            path = self._tile_path(key)
+            if path is not None and path.exists():
+                data = path.read_bytes()
+                path.touch()  # mtime doubles as the disk cache's recency
+                self._remember(key, data)
+                self.hits += 1
+                return data
+            self.misses += 1
+            return None
+
+    def put(self, z: int, x: int, y: int, data: bytes) -> None:
+        key = (z, x, y)
+        with self._lock:
+            self._remember(key, data)
+            path = self._tile_path(key)
+            if path is None:
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                self._disk_bytes -= path.stat().st_size
+            path.write_bytes(data)
+            self._disk_bytes += len(data)
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def clear(self) -> None:
+        """Forget the current run entirely."""
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = 0
+            if self.directory and self.directory.exists():
+                shutil.rmtree(self.directory, ignore_errors=True)
+            self.run_id = None
+
+    def _remember(self, key: Tuple[int, int, int], data: bytes) -> None:
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_tiles:
+            self._memory.popitem(last=False)
+
+    def _tile_path(self, key: Tuple[int, int, int]) -> Optional[Path]:
+        if self.directory is None or self.run_id is None:
+            return None
+        z, x, y = key
+        return self.directory / self.run_id / str(z) / str(x) / f'{y}.png'
+
+    def _evict_disk(self) -> None:
+        """Delete least recently used tiles until the disk cache is back to 90% of its limit."""
+        files = sorted((self.directory / self.run_id).rglob('*.png'),
+                       key=lambda p: p.stat().st_mtime)
+        target = self.max_disk_bytes * 0.9
+        for path in files:
+            if self._disk_bytes <= target:
+                break
+            self._disk_bytes -= path.stat().st_size
+            path.unlink()
@@ -1,4 +1,5 @@
 """Utility functions for the application."""
+import asyncio
 from pathlib import Path
 
 import numpy as np
@@ -9,6 +10,20 @@ from rasterio.warp import calculate_default_transform, reproject, Resampling
 from shapely.geometry import mapping
 
 
+def run_sync(coro):
+    """Run ``coro`` to completion from synchronous code.
+
+    Only for callers without a running event loop (scripts, worker threads and
+    processes); coroutines must await the async API instead of blocking the loop.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    coro.close()
+    raise RuntimeError("run_sync() called from a running event loop; await the coroutine instead")
+
+
 def reproject_raster(src_path: Path, dst_path: Path, dst_crs: str) -> None:
     """Reproject a raster to a new coordinate system"""
     with rasterio.open(src_path) as src:
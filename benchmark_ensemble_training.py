@@ -0,0 +1,57 @@
+"""Benchmark ensemble model training and prediction time against the core budget.
+
+Usage: python benchmark_ensemble_training.py --rows 20000 --trials 3 --cores 1 2 4 8
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
+from app.ml.parallel import EXECUTION_MODES, available_cores
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--execution", choices=EXECUTION_MODES, default="thread")
+    parser.add_argument("--cores", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, available_cores()}))
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({
+        "temperature": rng.uniform(10, 40, args.rows),
+        "humidity": rng.uniform(10, 90, args.rows),
+        "wind_speed": rng.uniform(0, 30, args.rows),
+        "slope": rng.uniform(0, 45, args.rows),
+        "vegetation_type": rng.choice(["forest", "grass", "shrub", "wetland"], args.rows),
+    })
+    signal = X["temperature"] - X["humidity"] / 3 + X["wind_speed"] / 2
+    y = ((signal + rng.normal(0, 5, args.rows)) > 15).astype(int).values
+
+    print(f"{args.rows} rows, {args.trials} Optuna trials, {args.execution} execution, "
+          f"{os.cpu_count()} CPUs available")
+    print(f"{'cores':>5} {'train s':>8} {'speedup':>8} {'predict s':>10} {'speedup':>8}")
+
+    baseline = None
+    for cores in args.cores:
+        model = EnsembleWildfireModel(n_jobs=cores)
+        model.execution = args.execution
+        model._calculate_shap_values = lambda X: {}  # SHAP is not what is being measured
+        start = time.perf_counter()
+        model.train(X, y, n_trials=args.trials, storage="")  # fresh in-memory studies each run
+        train_time = time.perf_counter() - start
+        start = time.perf_counter()
+        model.predict(X)
+        predict_time = time.perf_counter() - start
+        baseline = baseline or (train_time, predict_time)
+        print(f"{cores:>5} {train_time:>8.2f} {baseline[0] / train_time:>8.2f} "
+              f"{predict_time:>10.2f} {baseline[1] / predict_time:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
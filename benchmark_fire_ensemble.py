@@ -0,0 +1,57 @@
+"""Benchmark Monte Carlo fire spread ensemble scaling with worker count.
+
+Usage: python benchmark_fire_ensemble.py --members 32 --grid 1000 --hours 24
+"""
+import argparse
+import os
+import time
+
+from app.fire_ensemble import EnsemblePool, simulate_ensemble
+from app.fire_spread import FuelGrid
+
+WEATHER = {
+    "temperature": 88.0,
+    "humidity": 25.0,
+    "wind_speed": 12.0,
+    "wind_direction": 270.0,
+    "drought_index": 400.0,
+    "fuel_moisture": 6.0,
+}
+IGNITION = (39.8283, -74.5411)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=32)
+    parser.add_argument("--grid", type=int, default=1000)
+    parser.add_argument("--hours", type=int, default=24)
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, os.cpu_count() or 1}))
+    args = parser.parse_args()
+
+    grid = FuelGrid.pinelands((args.grid, args.grid))
+    print(f"{args.members} members, {args.grid}x{args.grid} grid, {args.hours} h, "
+          f"{os.cpu_count()} CPUs available")
+    print(f"{'workers':>7} {'seconds':>9} {'speedup':>8} {'efficiency':>10}")
+
+    baseline = None
+    for workers in args.workers:
+        # Start the workers before timing, as the server does in its lifespan
+        pool = EnsemblePool(workers) if workers > 1 else None
+        if pool is not None:
+            simulate_ensemble(grid, IGNITION, WEATHER, 1, n_members=workers, pool=pool)
+        try:
+            start = time.perf_counter()
+            simulate_ensemble(grid, IGNITION, WEATHER, args.hours, n_members=args.members,
+                              seed=0, max_workers=1, pool=pool)
+            elapsed = time.perf_counter() - start
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(f"{workers:>7} {elapsed:>9.2f} {speedup:>8.2f} {speedup / workers:>10.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Benchmark peak memory of loading fire history: whole-file CSV read vs chunked streaming.
+
+Usage: python benchmark_fire_history_memory.py --rows 2000000 --chunk-rows 250000
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.data_processing.fire_store import clean_fire_records, read_fire_records
+
+PINELANDS_BOUNDS = (-74.8, 39.4, -74.2, 40.2)
+
+parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+parser.add_argument("--rows", type=int, default=2_000_000)
+parser.add_argument("--chunk-rows", type=int, default=250_000)
+parser.add_argument("--start-year", type=int, default=2010)
+parser.add_argument("--end-year", type=int, default=2015)
+args = parser.parse_args()
+
+
+def write_national_csv(path: Path, rows: int) -> None:
+    """Synthetic FPA-FOD extract covering the lower 48 with the usual extra columns."""
+    rng = np.random.default_rng(0)
+    dates = pd.Timestamp("1992-01-01") + pd.to_timedelta(rng.integers(0, 26 * 365, rows), unit="D")
+    pd.DataFrame({
+        "FOD_ID": np.arange(rows),
+        "FIRE_NAME": rng.choice(["BRUSH", "GRASS", "PINE", "UNNAMED"], rows),
+        "STATE": rng.choice(["NJ", "CA", "TX", "FL", "OR"], rows),
+        "FIRE_SIZE": rng.exponential(10.0, rows).round(2),
+        "NWCG_REPORTING_UNIT_NAME": rng.choice(["Pinelands Fire District",
+                                                "Angeles National Forest"], rows),
+        "LATITUDE": rng.uniform(25.0, 49.0, rows),
+        "LONGITUDE": rng.uniform(-124.0, -67.0, rows),
+        "DISCOVERY_DATE": dates.strftime("%Y-%m-%d"),
+        "CONTAINMENT_DATE": (dates + pd.Timedelta(days=1)).strftime("%Y-%m-%d"),
+    }).to_csv(path, index=False)
+
+
+def whole_file(path: Path) -> pd.DataFrame:
+    """The previous path: read every column of every row, then filter."""
+    df = pd.read_csv(path).rename(columns={"DISCOVERY_DATE": "discovery_date",
+                                           "CONTAINMENT_DATE": "containment_date"})
+    df = clean_fire_records(df)
+    years = df["discovery_date"].dt.year
+    minx, miny, maxx, maxy = PINELANDS_BOUNDS
+    return df[(years >= args.start_year) & (years <= args.end_year)
+              & df["LONGITUDE"].between(minx, maxx) & df["LATITUDE"].between(miny, maxy)]
+
+
+def streamed(path: Path) -> pd.DataFrame:
+    return read_fire_records(path, args.start_year, args.end_year, PINELANDS_BOUNDS,
+                             chunksize=args.chunk_rows)
+
+
+with tempfile.TemporaryDirectory() as tmp:
+    source = Path(tmp) / "fire_occurrence.csv"
+    write_national_csv(source, args.rows)
+    print(f"{args.rows:,} rows, {source.stat().st_size / 2 ** 20:.0f} MiB CSV, "
+          f"years {args.start_year}-{args.end_year}, chunks of {args.chunk_rows:,} rows")
+    print(f"{'path':>10} {'seconds':>9} {'peak MiB':>9} {'matches':>8}")
+    for name, load in (("whole", whole_file), ("streamed", streamed)):
+        tracemalloc.start()
+        start = time.perf_counter()
+        matches = len(load(source))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>10} {elapsed:>9.2f} {peak / 2 ** 20:>9.1f} {matches:>8,}")
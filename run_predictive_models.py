@@ -4,12 +4,11 @@ import geopandas as gpd
 import pandas as pd
 from datetime import datetime
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from lightgbm import LGBMClassifier
-from catboost import CatBoostClassifier
 from sklearn.metrics import classification_report
 
 from app.data_processing.data_loader import DataLoader
+from app.fire_window import fire_window_classifiers
+from app.model_registry import FIRE_WINDOW_FEATURES, save_fire_window_models
 
 # Load Pinelands boundary
 boundary_path = Path("pinelands/pinelands.shp")
@@ -40,20 +39,17 @@ fires_dates = fires_gdf['discovery_date'].dt.date
 daily['label'] = daily['date'].isin(fires_dates).astype(int)
 
 # Features and target
-X = daily[['TAVG', 'RHAV', 'AWND']]
+X = daily[FIRE_WINDOW_FEATURES]
 y = daily['label']
 
 # Train/test split
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
 
 # Models
-target_models = {
-    'RandomForest': RandomForestClassifier(n_estimators=100, random_state=42),
-    'LightGBM': LGBMClassifier(random_state=42),
-    'CatBoost': CatBoostClassifier(verbose=0, random_state=42)
-}
+target_models = fire_window_classifiers()
 
 # Train and evaluate
+trained = {}
 for name, model in target_models.items():
     print(f"--- {name} ---")
     # Skip if only one class present in training data
@@ -64,5 +60,10 @@ for name, model in target_models.items():
         model.fit(X_train, y_train)
         preds = model.predict(X_test)
         print(classification_report(y_test, preds))
+        trained[name] = model
     except Exception as e:
         print(f"Error training {name}: {e}")
+
+# Save for the API's model registry (served by /api/v1/predict_fire_window)
+save_fire_window_models(trained)
+print(f"Saved models: {', '.join(trained) or 'none'}")
@@ -9,6 +9,7 @@ setup(
         'uvicorn>=0.15.0',
         'numpy>=1.21.0',
         'pandas>=1.3.0',
+        'pyarrow>=8.0.0',
         'geopandas>=0.9.0',
         'shapely>=1.7.0',
         'rasterio>=1.2.0',
@@ -22,3 +22,13 @@ def app_fixture():
 def test_client_fixture(app_fixture):
     """Alias for TestClient fixture used in tests."""
     return TestClient(app_fixture)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def registry_data_dir(tmp_path_factory):
+    """Keep the data directories the shared registry creates out of the working tree."""
+    from app.model_registry import registry
+    default = registry.data_dir
+    registry.data_dir = tmp_path_factory.mktemp("data")
+    yield registry.data_dir
+    registry.data_dir = default
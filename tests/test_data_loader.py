@@ -1,35 +1,30 @@
+import asyncio
 import os
+import time
 import pytest
 import pandas as pd
 import geopandas as gpd
 import numpy as np
-import requests
+import httpx
 from pathlib import Path
 from datetime import datetime
 from shapely.geometry import box
 
-from app.data_processing.data_loader import DataLoader
-
-
-class DummyResponse:
-    def __init__(self, data):
-        self._data = data
-
-    def json(self):
-        return self._data
+from app.data_processing.data_loader import DataLoader, load_sources
+from app.data_processing.noaa import NoaaWeatherStore
 
 
 @pytest.fixture(autouse=True)
 def noaa_api(monkeypatch):
-    # Stub NOAA API key and requests.get
+    # Stub NOAA API key and the CDO endpoint
     monkeypatch.setenv("NOAA_API_KEY", "dummy")
-    def fake_get(url, params=None, headers=None):
-        return DummyResponse({
+    def handler(request):
+        return httpx.Response(200, json={
             "results": [
                 {"date": "2025-05-01T00:00:00", "TAVG": 10.0, "RHAV": 50.0, "AWND": 5.0}
             ]
         })
-    monkeypatch.setattr(requests, "get", fake_get)
+    monkeypatch.setattr(NoaaWeatherStore, "transport", httpx.MockTransport(handler))
 
 
 def test_load_environmental_data_and_alias(tmp_path):
@@ -79,3 +74,100 @@ def test_prepare_model_features_with_stubs(tmp_path, monkeypatch):
     assert features.loc[0, "historical_fire_count"] == 2
     # days since last fire: max date 2025-04-01 -> 32 days before 2025-05-03
     assert features.loc[0, "days_since_last_fire"] == (datetime(2025, 5, 3) - datetime(2025, 4, 1)).days
+
+
+class SlowSources:
+    """Two blocking sources and one native async source, each taking ``delay`` seconds."""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def load_buildings(self, region):
+        time.sleep(self.delay)
+        return "buildings"
+
+    def load_traffic_data(self, region, date):
+        time.sleep(self.delay)
+        return "traffic"
+
+    def load_weather_data(self, *args):
+        raise AssertionError("the async counterpart should be used")
+
+    async def load_weather_data_async(self, *args):
+        await asyncio.sleep(self.delay)
+        return "weather"
+
+    def load_camping_sites(self, region):
+        raise ValueError("feed offline")
+
+
+def test_load_sources_runs_concurrently_with_per_source_timeouts():
+    calls = {
+        "buildings": ("load_buildings", (None,)),
+        "traffic_data": ("load_traffic_data", (None, None)),
+        "weather_data": ("load_weather_data", ()),
+        "camping_sites": ("load_camping_sites", (None,)),
+    }
+    start = time.perf_counter()
+    results, errors = asyncio.run(load_sources(SlowSources(0.3), calls))
+    # Latency is the slowest source, not the sum of all three
+    assert time.perf_counter() - start < 0.6
+    assert results == {"buildings": "buildings", "traffic_data": "traffic",
+                       "weather_data": "weather", "camping_sites": None}
+    assert errors == {"camping_sites": "ValueError: feed offline"}
+
+    results, errors = asyncio.run(load_sources(SlowSources(0.3), calls,
+                                               timeouts={"weather_data": 0.05}))
+    assert results["weather_data"] is None and results["buildings"] == "buildings"
+    assert errors["weather_data"] == "timed out after 0.05s"
+
+
+def test_local_layers_are_clipped_and_empty_when_absent(tmp_path):
+    dl = DataLoader(tmp_path)
+    region = gpd.GeoDataFrame(geometry=[box(0, 0, 1, 1)], crs="EPSG:4326")
+    assert dl.load_buildings(region).empty
+    assert "congestion_risk" in dl.load_traffic_data(region, datetime(2025, 5, 1)).columns
+
+    sites = gpd.GeoDataFrame({"name": ["in", "out"]},
+                             geometry=[box(0.2, 0.2, 0.3, 0.3), box(5, 5, 6, 6)], crs="EPSG:4326")
+    sites.to_file(dl.geo_dir / "camping_sites.geojson", driver="GeoJSON")
+    camping = asyncio.run(dl.load_camping_sites_async(region))
+    assert list(camping["name"]) == ["in"]
+
+
+def test_prepare_model_features_batch_matches_per_region(tmp_path, monkeypatch):
+    dl = DataLoader(tmp_path)
+    regions = gpd.GeoDataFrame({"name": ["a", "b", "c"]},
+                               geometry=[box(0, 0, 1, 1), box(1, 0, 2, 1), box(5, 5, 6, 6)],
+                               crs="EPSG:4326", index=[10, 20, 30])
+    env_df = pd.DataFrame({"TAVG": [15.0, 25.0], "RHAV": [60.0, 40.0], "AWND": [3.0, 7.0]})
+    land_df = gpd.GeoDataFrame({"landcover": [2, 3, 3, 5]},
+                               geometry=[box(0, 0, 0.5, 0.5), box(0.5, 0.5, 1.5, 0.9),
+                                         box(1.2, 0, 1.4, 0.2), box(5, 5, 6, 6)],
+                               crs="EPSG:4326")
+    fire_df = gpd.GeoDataFrame({"date": [datetime(2025, 1, 1), datetime(2025, 4, 1),
+                                         datetime(2024, 7, 1)]},
+                               geometry=[box(0.1, 0.1, 0.2, 0.2), box(0.3, 0.3, 0.4, 0.4),
+                                         box(1.5, 0.5, 1.6, 0.6)],
+                               crs="EPSG:4326")
+    calls = []
+
+    def clip(layer, region):
+        calls.append(len(region))
+        return gpd.sjoin(layer, region, how="inner", predicate="intersects")
+
+    monkeypatch.setattr(DataLoader, "load_environmental_data",
+                        lambda self, bbox, start, end: env_df)
+    monkeypatch.setattr(DataLoader, "load_land_use_data",
+                        lambda self, region: clip(land_df, region))
+    monkeypatch.setattr(DataLoader, "load_historical_fires",
+                        lambda self, region, sy, ey: clip(fire_df, region))
+
+    date = datetime(2025, 5, 3)
+    batch = dl.prepare_model_features_batch(regions, date)
+    assert calls == [1, 1]  # each layer loaded once, for the union of the regions
+    assert list(batch.index) == [10, 20, 30]
+    for idx in (10, 20, 30):
+        single = dl.prepare_model_features(regions.loc[[idx]], date).iloc[0]
+        assert batch.loc[idx].to_dict() == pytest.approx(single.to_dict())
+    assert batch.loc[30, "days_since_last_fire"] == 9999
@@ -0,0 +1,188 @@
+import hashlib
+import io
+import json
+import re
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.data_processing.downloader import (
+    DownloadError,
+    SegmentedDownload,
+    download_file,
+    extract_member,
+)
+
+PAYLOAD = bytes(range(256)) * 400  # 102,400 bytes
+
+
+class FileServer(ThreadingHTTPServer):
+    """Serves PAYLOAD at /archive.zip, optionally with Range support and failures."""
+
+    def __init__(self, payload=PAYLOAD, ranges=True):
+        super().__init__(("127.0.0.1", 0), RangeHandler)
+        self.payload = payload
+        self.ranges = ranges
+        self.requested_ranges = []
+        self.fail_offsets = set()
+        self.etag = '"v1"'
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/archive.zip"
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        payload = self.server.payload
+        match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if_range = self.headers.get("If-Range")
+        if not (self.server.ranges and match) or if_range not in (None, self.server.etag):
+            self.send_response(200)
+            self.send_header("ETag", self.server.etag)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        first, last = int(match.group(1)), min(int(match.group(2)), len(payload) - 1)
+        self.server.requested_ranges.append((first, last))
+        if first in self.server.fail_offsets:
+            self.server.fail_offsets.discard(first)
+            self.send_error(503)
+            return
+        self.send_response(206)
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Range", f"bytes {first}-{last}/{len(payload)}")
+        self.send_header("Content-Length", str(last - first + 1))
+        self.end_headers()
+        self.wfile.write(payload[first:last + 1])
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(**kwargs):
+        srv = FileServer(**kwargs)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servers.append(srv)
+        return srv
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+def test_segments_are_fetched_and_verified(server, tmp_path):
+    srv = server()
+    sha = hashlib.sha256(PAYLOAD).hexdigest()
+    dest = download_file(srv.url, tmp_path / "archive.zip", sha256=sha, segment_bytes=10_000,
+                         max_workers=4)
+    assert dest.read_bytes() == PAYLOAD
+    assert len([r for r in srv.requested_ranges if r != (0, 0)]) == 11
+    assert not (tmp_path / "archive.zip.part").exists()
+    assert not (tmp_path / "archive.zip.part.json").exists()
+
+
+def test_interrupted_download_resumes_missing_segments(server, tmp_path):
+    srv = server()
+    srv.fail_offsets = {30_000}
+    download = SegmentedDownload(srv.url, tmp_path / "archive.zip", segment_bytes=10_000,
+                                 max_workers=1)
+    with pytest.raises(Exception):
+        download.run()
+    done = json.loads(download.state_path.read_text())["done"]
+    assert 3 not in done and len(done) >= 3
+
+    srv.requested_ranges.clear()
+    download.run()
+    assert (tmp_path / "archive.zip").read_bytes() == PAYLOAD
+    refetched = {first for first, _ in srv.requested_ranges if first}
+    assert 30_000 in refetched
+    assert not refetched & {i * 10_000 for i in done}
+
+
+def test_resume_restarts_when_the_file_changed(server, tmp_path):
+    srv = server()
+    srv.fail_offsets = {30_000}
+    download = SegmentedDownload(srv.url, tmp_path / "archive.zip", segment_bytes=10_000,
+                                 max_workers=1)
+    with pytest.raises(Exception):
+        download.run()
+    assert json.loads(download.state_path.read_text())["etag"] == '"v1"'
+
+    # A new version with the same size: nothing from the old one may be reused
+    srv.payload, srv.etag = PAYLOAD[::-1], '"v2"'
+    srv.requested_ranges.clear()
+    download.run()
+    assert (tmp_path / "archive.zip").read_bytes() == PAYLOAD[::-1]
+    refetched = {first for first, _ in srv.requested_ranges if first}
+    assert refetched == set(range(10_000, 102_400, 10_000))
+
+
+def test_segments_are_tied_to_the_probed_version(server, tmp_path, monkeypatch):
+    srv = server()
+    download = SegmentedDownload(srv.url, tmp_path / "archive.zip", segment_bytes=10_000,
+                                 max_workers=1)
+    probe = download._probe
+
+    def probe_then_change():
+        result = probe()
+        srv.etag = '"v2"'
+        return result
+
+    monkeypatch.setattr(download, "_probe", probe_then_change)
+    with pytest.raises(DownloadError, match="changed on the server"):
+        download.run()
+    assert not (tmp_path / "archive.zip").exists()
+
+
+def test_corrupt_zip_is_rejected(server, tmp_path):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("Data/FPA_FOD.csv", "FOD_ID,LATITUDE\n1,39.8\n" * 1000)
+    archive = bytearray(buffer.getvalue())
+    srv = server(payload=bytes(archive))
+    dest = download_file(srv.url, tmp_path / "good.zip", check_zip=True)
+    assert zipfile.ZipFile(dest).testzip() is None
+
+    archive[60] ^= 0xFF  # inside the compressed member data
+    srv.payload = bytes(archive)
+    with pytest.raises(DownloadError, match="corrupt zip"):
+        download_file(srv.url, tmp_path / "bad.zip", check_zip=True)
+    assert not (tmp_path / "bad.zip").exists()
+    assert not (tmp_path / "bad.zip.part").exists()
+
+
+def test_checksum_mismatch_discards_the_partial_file(server, tmp_path):
+    srv = server()
+    with pytest.raises(DownloadError):
+        download_file(srv.url, tmp_path / "archive.zip", sha256="0" * 64, segment_bytes=50_000)
+    assert not (tmp_path / "archive.zip").exists()
+    assert not (tmp_path / "archive.zip.part").exists()
+
+
+def test_falls_back_to_a_single_stream_without_range_support(server, tmp_path):
+    srv = server(ranges=False)
+    dest = download_file(srv.url, tmp_path / "archive.zip", segment_bytes=10_000)
+    assert dest.read_bytes() == PAYLOAD
+
+
+def test_extract_member_streams_the_csv(tmp_path):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("Data/FPA_FOD.csv", "FOD_ID,LATITUDE\n1,39.8\n")
+        zf.writestr("README.txt", "notes")
+    archive = tmp_path / "archive.zip"
+    archive.write_bytes(buffer.getvalue())
+    dest = extract_member(archive, ".csv", tmp_path / "fire_occurrence.csv")
+    assert dest.read_text() == "FOD_ID,LATITUDE\n1,39.8\n"
+    assert not (tmp_path / "Data").exists()
+    with pytest.raises(DownloadError):
+        extract_member(archive, ".parquet", tmp_path / "x.parquet")
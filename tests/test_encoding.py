@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from app.ml.encoding import UNSEEN, TabularEncoder
+
+TRAIN = pd.DataFrame({
+    "temperature": [20.0, 25.0, 30.0, 35.0],
+    "slope": [1, 5, 5, 9],
+    "vegetation_type": ["forest", "grass", "shrub", "grass"],
+})
+
+
+def test_matches_standard_scaling_and_one_hot():
+    encoder = TabularEncoder.fit(TRAIN)
+    out = encoder.transform(TRAIN)
+    assert out.dtype == np.float32
+    assert encoder.feature_names == ["temperature", "slope", "vegetation_type_forest",
+                                     "vegetation_type_grass", "vegetation_type_shrub",
+                                     f"vegetation_type_{UNSEEN}"]
+    scaled = StandardScaler().fit_transform(TRAIN[["temperature", "slope"]])
+    np.testing.assert_allclose(out[:, :2], scaled, rtol=1e-6)
+    dummies = pd.get_dummies(TRAIN["vegetation_type"]).to_numpy(dtype=np.float32)
+    np.testing.assert_array_equal(out[:, 2:5], dummies)
+    assert not out[:, 5].any()
+
+
+def test_columns_are_fixed_and_unseen_values_use_the_reserved_slot():
+    encoder = TabularEncoder.fit(TRAIN)
+    batch = pd.DataFrame({"temperature": [22.0, 24.0], "slope": [3, 4],
+                          "vegetation_type": ["desert", None]})
+    frame = encoder.transform_frame(batch)
+    assert list(frame.columns) == encoder.feature_names
+    assert frame[f"vegetation_type_{UNSEEN}"].tolist() == [1.0, 1.0]
+    seen = ["vegetation_type_forest", "vegetation_type_grass", "vegetation_type_shrub"]
+    assert frame[seen].to_numpy().sum() == 0
+
+
+def test_ordinal_codes_and_preallocated_output():
+    encoder = TabularEncoder.fit(TRAIN, encoding="ordinal")
+    assert encoder.feature_names == ["temperature", "slope", "vegetation_type"]
+    batch = pd.DataFrame({"temperature": [22.0, 24.0, 26.0], "slope": [3, 4, 5],
+                          "vegetation_type": ["shrub", "forest", "desert"]})
+    out = np.full((3, 3), np.nan, dtype=np.float32)
+    assert encoder.transform(batch, out=out) is out
+    assert out[:, 2].tolist() == [2.0, 0.0, 3.0]
+    with pytest.raises(ValueError):
+        encoder.transform(batch, out=np.empty((3, 3), dtype=np.float64))
@@ -7,21 +7,27 @@ import joblib
 
 from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
 
-# Dummy study to bypass Optuna optimization
+# Dummy per-member study to bypass Optuna optimization
 class DummyStudy:
-    best_params = {
+    params = {
         'rf': {'n_estimators': 10, 'max_depth': 5, 'min_samples_split': 2},
         'lgbm': {'n_estimators': 10, 'max_depth': 5, 'learning_rate': 0.1},
         'catboost': {'iterations': 10, 'depth': 5, 'learning_rate': 0.1}
     }
-    def __init__(self, **kwargs):
-        pass
-    def optimize(self, func, n_trials):
+
+    def __init__(self, study_name, **kwargs):
+        self.study_name = study_name
+        self.best_params = self.params[study_name.rsplit('-', 1)[1]]
+
+    def get_trials(self, **kwargs):
+        return []
+
+    def optimize(self, func, n_trials=None, timeout=None):
         return None
 
 @pytest.fixture(autouse=True)
 def patch_optuna(monkeypatch):
-    monkeypatch.setattr(optuna, 'create_study', lambda **kwargs: DummyStudy())
+    monkeypatch.setattr(optuna, 'create_study', lambda **kwargs: DummyStudy(**kwargs))
     return None
 
 def test_preprocess_scaling_and_encoding():
@@ -91,7 +97,7 @@ def test_train_and_feature_importance(monkeypatch):
     model = EnsembleWildfireModel()
     # Stub scaler to bypass fit requirement
     model.scaler = type('S', (), {'transform': lambda self, arr: arr})()
-    metrics = model.train(X, y)
+    metrics = model.train(X, y, storage='')
     # Check metrics keys and values
     for key in ['rf_cv_score', 'lgbm_cv_score', 'catboost_cv_score']:
         assert key in metrics
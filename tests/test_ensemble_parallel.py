@@ -0,0 +1,103 @@
+import threading
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from catboost import CatBoostClassifier
+from lightgbm import LGBMClassifier
+from sklearn.ensemble import RandomForestClassifier
+
+import app.ml.ensemble_wildfire_model as ewm
+from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
+from app.ml.parallel import CoreBudget, member_executor, predict_threads, set_threads
+
+
+class FixedStudy:
+    params = {
+        'rf': {'n_estimators': 5, 'max_depth': 3, 'min_samples_split': 2},
+        'lgbm': {'n_estimators': 5, 'max_depth': 3, 'learning_rate': 0.1},
+        'catboost': {'iterations': 5, 'depth': 3, 'learning_rate': 0.1}
+    }
+
+    def __init__(self, study_name, **kwargs):
+        self.best_params = self.params[study_name.rsplit('-', 1)[1]]
+
+    def get_trials(self, **kwargs):
+        return []
+
+    def optimize(self, func, n_trials=None, timeout=None):
+        return None
+
+
+class ConstantMember:
+    def __init__(self, value, barrier):
+        self.value = value
+        self.barrier = barrier
+
+    def predict_proba(self, X):
+        self.barrier.wait()
+        return np.column_stack([np.full(len(X), 1 - self.value), np.full(len(X), self.value)])
+
+
+def test_core_budget_never_exceeds_the_cores():
+    assert CoreBudget.split(1, 3, 5) == CoreBudget(members=1, folds=1, threads=1)
+    assert CoreBudget.split(8, 3, 5) == CoreBudget(members=3, folds=2, threads=1)
+    assert CoreBudget.split(32, 3, 5) == CoreBudget(members=3, folds=5, threads=2)
+    for cores in range(1, 40):
+        budget = CoreBudget.split(cores, 3, 5)
+        assert budget.members * budget.folds * budget.threads <= max(cores, 1)
+
+
+def test_set_threads_uses_each_library_parameter():
+    assert set_threads(RandomForestClassifier(), 2).get_params()['n_jobs'] == 2
+    assert set_threads(LGBMClassifier(), 3).get_params()['n_jobs'] == 3
+    assert set_threads(CatBoostClassifier(verbose=False), 4).get_params()['thread_count'] == 4
+    fitted = CatBoostClassifier(iterations=2, thread_count=1, verbose=False,
+                                allow_writing_files=False)
+    fitted.fit([[0], [1], [0], [1]], [0, 1, 0, 1])
+    assert set_threads(fitted, 4).get_params()['thread_count'] == 1
+    # ... so its threads are limited per predict call instead
+    assert predict_threads(fitted, 4) == {'thread_count': 4}
+    assert fitted.predict_proba([[0], [1]], **predict_threads(fitted, 4)).shape == (2, 2)
+    assert predict_threads(RandomForestClassifier(), 4) == {}
+    plain = object()
+    assert set_threads(plain, 2) is plain
+
+
+def test_train_runs_member_cross_validation_concurrently(monkeypatch):
+    # Each member waits for the other two: this only completes if all three run at once
+    barrier = threading.Barrier(3, timeout=10)
+
+    def cross_val_score(model, X, y, cv):
+        barrier.wait()
+        return np.ones(cv)
+
+    monkeypatch.setattr(ewm, 'cross_val_score', cross_val_score)
+    monkeypatch.setattr(optuna, 'create_study', lambda **kwargs: FixedStudy(**kwargs))
+    monkeypatch.setattr(EnsembleWildfireModel, '_calculate_shap_values', lambda self, X: {})
+    X = pd.DataFrame({'f1': np.arange(20.0), 'f2': np.arange(20.0) % 3})
+    y = (X['f1'] > 9).astype(int).values
+    model = EnsembleWildfireModel(n_jobs=6)
+    model.execution = 'thread'
+    metrics = model.train(X, y, storage='')
+    assert metrics == {'rf_cv_score': 1.0, 'lgbm_cv_score': 1.0, 'catboost_cv_score': 1.0}
+    assert model.models['rf'].get_params()['n_jobs'] == 2
+    assert model.predict(X)['risk_score'].between(0, 1).all()
+
+
+def test_predict_scores_members_concurrently():
+    barrier = threading.Barrier(3, timeout=10)
+    model = EnsembleWildfireModel(n_jobs=3)
+    X = pd.DataFrame({'temperature': [20.0, 30.0], 'vegetation_type': ['grass', 'forest']})
+    model.fit_preprocessing(X)
+    model.models = {name: ConstantMember(value, barrier)
+                    for name, value in (('rf', 0.0), ('lgbm', 1.0), ('catboost', 1.0))}
+    result = model.predict(X)
+    np.testing.assert_allclose(result['risk_score'], [2 / 3, 2 / 3])
+
+
+def test_unknown_execution_mode_is_rejected():
+    with pytest.raises(ValueError):
+        with member_executor('gpu', 2):
+            pass
@@ -0,0 +1,74 @@
+import time
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+
+import app.ml.ensemble_wildfire_model as ewm
+from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
+from app.ml.tuning import data_fingerprint, make_pruner, study_storage
+
+X = pd.DataFrame({'a': np.arange(12.0), 'b': np.arange(12.0) % 4})
+y = np.array([0, 1] * 6)
+
+
+@pytest.fixture(autouse=True)
+def fast_folds(monkeypatch):
+    # Deeper forests score better, so the study has a clear best trial
+    monkeypatch.setattr(ewm, '_fold_score',
+                        lambda model, X, y, train, test, threads:
+                            model.get_params()['max_depth'] / 30)
+
+
+def test_member_study_resumes_from_storage(tmp_path):
+    storage = study_storage(tmp_path / 'optuna.sqlite')
+    model = EnsembleWildfireModel()
+    best = model._tune_member('rf', X, y, 3, 1, 'fires', storage, 4, None, None)
+    assert set(best) == {'n_estimators', 'max_depth', 'min_samples_split'}
+    assert len(optuna.load_study(study_name='fires-rf', storage=storage).trials) == 4
+
+    # A later run only adds the missing trials
+    model._tune_member('rf', X, y, 3, 1, 'fires', storage, 6, None, None)
+    model._tune_member('rf', X, y, 3, 1, 'fires', storage, 6, None, None)
+    study = optuna.load_study(study_name='fires-rf', storage=storage)
+    assert len(study.trials) == 6
+    complete = [t for t in study.trials if t.state == optuna.trial.TrialState.COMPLETE]
+    assert all(len(t.intermediate_values) == 3 for t in complete)
+
+
+def test_warm_start_tries_the_earlier_best_first(tmp_path):
+    storage = study_storage(tmp_path / 'optuna.sqlite')
+    model = EnsembleWildfireModel()
+    model._tune_member('lgbm', X, y, 3, 1, 'last-season', storage, 5, None, None)
+    model._tune_member('lgbm', X, y, 3, 1, 'this-season', storage, 1, None, 'last-season')
+    earlier = optuna.load_study(study_name='last-season-lgbm', storage=storage)
+    warm = optuna.load_study(study_name='this-season-lgbm', storage=storage)
+    assert warm.trials[0].params == earlier.best_params
+
+
+def test_time_budget_without_trial_count(monkeypatch):
+    def slow_fold(model, X, y, train, test, threads):
+        time.sleep(0.01)
+        return 0.5
+
+    monkeypatch.setattr(ewm, '_fold_score', slow_fold)
+    model = EnsembleWildfireModel()
+    start = time.perf_counter()
+    best = model._tune_member('catboost', X, y, 3, 1, 'budget', None, None, 0.3, None)
+    assert time.perf_counter() - start < 2
+    assert set(best) == {'iterations', 'depth', 'learning_rate'}
+
+
+def test_train_needs_a_trial_count_or_time_budget():
+    with pytest.raises(ValueError):
+        EnsembleWildfireModel().train(X, y, n_trials=None, timeout=None)
+
+
+def test_pruners_and_fingerprint():
+    assert isinstance(make_pruner('median', 5), optuna.pruners.MedianPruner)
+    assert isinstance(make_pruner('hyperband', 5), optuna.pruners.HyperbandPruner)
+    with pytest.raises(ValueError):
+        make_pruner('random', 5)
+    assert data_fingerprint(X, y) == data_fingerprint(X.copy(), y.copy())
+    assert data_fingerprint(X, y) != data_fingerprint(X, 1 - y)
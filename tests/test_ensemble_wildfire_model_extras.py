@@ -6,23 +6,49 @@ from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
 
 
 class DummyTrial:
+    def __init__(self, prune=False):
+        self.prune = prune
+        self.reports = []
+
     def suggest_int(self, name, low, high):
         return low
+
     def suggest_float(self, name, low, high):
         return low
 
+    def report(self, value, step):
+        self.reports.append((step, value))
+
+    def should_prune(self):
+        return self.prune
+
 
 def test_objective_returns_mean_score(monkeypatch):
     import app.ml.ensemble_wildfire_model as ewm
-    # Stub cross_val_score to return array of 1s
-    monkeypatch.setattr(ewm, 'cross_val_score', lambda model, X, y, cv: np.ones(cv))
+    # Stub the per-fold fit to score 1
+    monkeypatch.setattr(ewm, '_fold_score', lambda model, X, y, train, test, threads: 1.0)
     model = EnsembleWildfireModel()
-    X = pd.DataFrame({'a': [1, 2, 3], 'b': [4, 5, 6]})
-    y = np.array([0, 1, 0])
+    X = pd.DataFrame({'a': [1, 2, 3, 4, 5, 6], 'b': [4, 5, 6, 7, 8, 9]})
+    y = np.array([0, 1, 0, 1, 0, 1])
     trial = DummyTrial()
-    result = model._objective(trial, X, y)
+    result = model._objective(trial, 'rf', X, y, cv_folds=3)
     assert isinstance(result, float)
     assert np.isclose(result, 1.0)
+    # The running score is reported after every fold
+    assert trial.reports == [(0, 1.0), (1, 1.0), (2, 1.0)]
+
+
+def test_objective_stops_when_pruned(monkeypatch):
+    import optuna
+    import app.ml.ensemble_wildfire_model as ewm
+    monkeypatch.setattr(ewm, '_fold_score', lambda model, X, y, train, test, threads: 0.5)
+    model = EnsembleWildfireModel()
+    X = pd.DataFrame({'a': [1, 2, 3, 4, 5, 6]})
+    y = np.array([0, 1, 0, 1, 0, 1])
+    trial = DummyTrial(prune=True)
+    with pytest.raises(optuna.TrialPruned):
+        model._objective(trial, 'lgbm', X, y, cv_folds=3)
+    assert trial.reports == [(0, 0.5)]
 
 
 def test_calculate_shap_values(monkeypatch):
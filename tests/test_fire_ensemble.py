@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.fire_ensemble import (
+    EnsemblePool,
+    WeatherPerturbation,
+    perturb_weather,
+    simulate_ensemble,
+)
+from app.fire_spread import FireSpreadSimulator, FuelGrid, moisture_damping
+
+WEATHER = {
+    "temperature": 85.0,
+    "humidity": 25.0,
+    "wind_speed": 10.0,
+    "wind_direction": 270.0,
+    "drought_index": 400.0,
+}
+IGNITION = (39.80, -74.50)
+
+
+@pytest.fixture
+def small_grid():
+    grid = FuelGrid.pinelands((80, 80))
+    grid.bounds = {"north": 39.82, "south": 39.78, "east": -74.47, "west": -74.53}
+    return grid
+
+
+def test_moisture_damping_slows_spread(small_grid):
+    assert moisture_damping(0) == pytest.approx(1.0)
+    assert moisture_damping(25) == pytest.approx(0.0)
+    sim = FireSpreadSimulator(small_grid)
+    base = sim.head_fire_rates(WEATHER, 1)
+    assert sim.head_fire_rates(dict(WEATHER, fuel_moisture=6.0), 1) == pytest.approx(base)
+    assert (sim.head_fire_rates(dict(WEATHER, fuel_moisture=12.0), 1) < base).all()
+
+
+def test_perturb_weather_is_seeded_and_bounded():
+    members = perturb_weather(WEATHER, 200, seed=7)
+    assert len(members) == 200
+    again = perturb_weather(WEATHER, 200, seed=7)
+    assert [m["wind_direction"] for m in members] == [m["wind_direction"] for m in again]
+    speeds = np.array([m["wind_speed"] for m in members])
+    assert (speeds > 0).all() and abs(speeds.mean() - 10.0) < 0.5
+    assert all(1.0 <= m["humidity"] <= 100.0 for m in members)
+    assert all(m["temperature"] == 85.0 for m in members)
+
+    fixed = perturb_weather(WEATHER, 3, WeatherPerturbation(0, 0, 0, 0), seed=1)
+    assert fixed[0]["wind_speed"] == pytest.approx(10.0)
+    assert fixed[0]["fuel_moisture"] == pytest.approx(6.0)
+
+
+def test_ensemble_probabilities(small_grid):
+    result = simulate_ensemble(small_grid, IGNITION, WEATHER, 3, n_members=6, seed=3, max_workers=1)
+    row, col = small_grid.cell_index(*IGNITION)
+    assert result.n_members == 6
+    assert result.probability[row, col] == 1.0
+    assert result.probability.max() <= 1.0
+    assert ((result.probability * 6) % 1 == 0).all()
+    # the downwind side burns more often than the upwind side
+    assert result.probability[:, col + 5].sum() > result.probability[:, col - 5].sum()
+
+    contours = result.probability_contours()
+    areas = [f["properties"]["areaAcres"] for f in contours["features"]]
+    assert areas == sorted(areas, reverse=True)
+    percentiles = result.area_percentiles()
+    assert percentiles["p10"] <= percentiles["p50"] <= percentiles["p90"]
+
+
+def test_ensemble_process_pool_matches_serial(small_grid):
+    serial = simulate_ensemble(small_grid, IGNITION, WEATHER, 2, n_members=4, seed=11,
+                               max_workers=1)
+    pooled = simulate_ensemble(small_grid, IGNITION, WEATHER, 2, n_members=4, seed=11,
+                               max_workers=2)
+    np.testing.assert_array_equal(serial.probability, pooled.probability)
+    np.testing.assert_allclose(serial.member_areas_acres, pooled.member_areas_acres)
+
+
+def test_shared_pool_serves_several_grids(small_grid):
+    other = FuelGrid.pinelands((60, 60))
+    other.bounds = {"north": 39.815, "south": 39.785, "east": -74.48, "west": -74.52}
+    pool = EnsemblePool(max_workers=2)
+    try:
+        for grid in (small_grid, other, small_grid):
+            serial = simulate_ensemble(grid, IGNITION, WEATHER, 2, n_members=3, seed=5,
+                                       max_workers=1)
+            pooled = simulate_ensemble(grid, IGNITION, WEATHER, 2, n_members=3, seed=5,
+                                       pool=pool)
+            np.testing.assert_array_equal(serial.probability, pooled.probability)
+        assert pool.start() is pool.start()
+    finally:
+        pool.shutdown()
+    pool.shutdown()  # idempotent
+
+
+def test_ensemble_rejects_bad_input(small_grid):
+    with pytest.raises(ValueError):
+        simulate_ensemble(small_grid, IGNITION, WEATHER, 2, n_members=0)
+    with pytest.raises(ValueError):
+        simulate_ensemble(small_grid, (45.0, -70.0), WEATHER, 2, n_members=2)
+
+
+def test_simulate_fire_ensemble_endpoint():
+    from api.main import app
+    client = TestClient(app)
+    params = {
+        "windSpeed": 12, "windDirection": 315, "humidity": 30, "temperature": 88,
+        "duration": 2, "gridSize": 150, "members": 3, "seed": 1, "fuelMoisture": 8,
+    }
+    response = client.post("/api/simulate-fire/ensemble", json=params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["members"] == 3
+    assert data["burnProbability"]["type"] == "FeatureCollection"
+    assert set(data["burnedAreaAcres"]) == {"p10", "p50", "p90"}
+    response = client.post("/api/simulate-fire/ensemble", json=dict(params, members=0))
+    assert response.status_code == 400
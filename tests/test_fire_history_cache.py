@@ -0,0 +1,67 @@
+import os
+from datetime import datetime
+
+import geopandas as gpd
+from shapely.geometry import Point, box
+
+from app.data_processing.data_loader import DataLoader
+from app.data_processing.fire_history_cache import FireHistoryCache, region_key
+
+
+def fires(n=3):
+    return gpd.GeoDataFrame(
+        {"FOD_ID": list(range(n)), "discovery_date": [datetime(2020, 6, i + 1) for i in range(n)]},
+        geometry=[Point(-74.5, 39.8)] * n, crs="EPSG:4326"
+    )
+
+
+def test_region_key_depends_on_geometry_and_years():
+    a = gpd.GeoDataFrame(geometry=[box(0, 0, 1, 1)], crs="EPSG:4326")
+    b = gpd.GeoDataFrame(geometry=[box(0, 0, 1, 2)], crs="EPSG:4326")
+    assert region_key(a, 2000, 2020) == region_key(a.copy(), 2000, 2020)
+    assert region_key(a, 2000, 2020) != region_key(b, 2000, 2020)
+    assert region_key(a, 2000, 2020) != region_key(a, 2001, 2020)
+
+
+def test_round_trip_and_source_invalidation(tmp_path):
+    source = tmp_path / "fire_occurrence.csv"
+    source.write_text("FOD_ID\n1\n")
+    cache = FireHistoryCache(tmp_path / "cache")
+    cache.ensure_source(source)
+    assert cache.get("k") is None
+    cache.put("k", fires())
+    cached = cache.get("k")
+    assert list(cached["FOD_ID"]) == [0, 1, 2] and cached.crs == "EPSG:4326"
+
+    # A second process sees the same entries while the source is unchanged
+    other = FireHistoryCache(tmp_path / "cache")
+    other.ensure_source(source)
+    assert other.get("k") is not None
+
+    source.write_text("FOD_ID\n1\n2\n")
+    cache.ensure_source(source)
+    assert cache.get("k") is None
+
+
+def test_evicts_least_recently_used_by_size(tmp_path):
+    cache = FireHistoryCache(tmp_path / "cache")
+    cache.put("old", fires())
+    size = (tmp_path / "cache" / "old.parquet").stat().st_size
+    os.utime(tmp_path / "cache" / "old.parquet", (0, 0))
+    cache.max_disk_bytes = int(size * 1.5)
+    cache.put("new", fires())
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_download_fire_history_is_cached(tmp_path, monkeypatch):
+    dl = DataLoader(tmp_path)
+    (dl.raw_dir / "fire_occurrence.csv").write_text(
+        "FOD_ID,LATITUDE,LONGITUDE,DISCOVERY_DATE\n1,39.8,-74.5,2020-06-01\n")
+    region = gpd.GeoDataFrame(geometry=[box(-74.8, 39.4, -74.2, 40.2)], crs="EPSG:4326")
+    first = dl._download_fire_history(region, 2020, 2020)
+    monkeypatch.setattr(DataLoader, "fire_store",
+                        lambda self: (_ for _ in ()).throw(AssertionError("not cached")))
+    second = dl._download_fire_history(region, 2020, 2020)
+    assert list(second["FOD_ID"]) == list(first["FOD_ID"]) == [1]
+    assert dl.fire_cache.hits == 1
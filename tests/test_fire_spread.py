@@ -0,0 +1,213 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.fire_spread import (
+    FireSpreadSimulator,
+    FuelGrid,
+    degrees_to_compass,
+    length_to_breadth_ratio,
+)
+from app.firefighter_bill import VegetationType, build_fuel_composition
+
+WEATHER = {
+    "temperature": 85.0,
+    "humidity": 25.0,
+    "wind_speed": 10.0,
+    "wind_direction": 270.0,  # wind from the west pushes the fire east
+    "drought_index": 400.0,
+}
+
+
+@pytest.fixture
+def small_grid():
+    grid = FuelGrid.pinelands((120, 120))
+    grid.bounds = {"north": 39.82, "south": 39.78, "east": -74.47, "west": -74.53}
+    return grid
+
+
+def test_degrees_to_compass():
+    assert degrees_to_compass(0) == "N"
+    assert degrees_to_compass(44) == "NE"
+    assert degrees_to_compass(270) == "W"
+    assert degrees_to_compass(350) == "N"
+    assert degrees_to_compass(-45) == "NW"
+
+
+def test_length_to_breadth_ratio_bounds():
+    ratios = length_to_breadth_ratio(np.array([0.0, 10.0, 80.0]))
+    assert ratios[0] == pytest.approx(1.0)
+    assert 1.0 < ratios[1] < 8.0
+    assert ratios[2] == 8.0
+
+
+def test_cell_index_and_outside_point(small_grid):
+    assert small_grid.cell_index(39.82, -74.53) == (0, 0)
+    assert small_grid.cell_index(39.78, -74.47) == (119, 119)
+    with pytest.raises(ValueError):
+        small_grid.cell_index(41.0, -74.5)
+
+
+def test_head_fire_rates_match_firefighter_bill(small_grid):
+    sim = FireSpreadSimulator(small_grid)
+    rates = sim.head_fire_rates(WEATHER, 3)
+    assert rates.shape == (3, 1)
+    # 10 mph * 0.43 * 1.4 drought * 1.8 pitch pine * 1.1 scrub oak * 1.2 west-wind terrain
+    assert rates[0, 0] == pytest.approx(10 * 0.43 * 1.4 * 1.8 * 1.1 * 1.2)
+
+
+def test_simulation_spreads_downwind(small_grid):
+    sim = FireSpreadSimulator(small_grid)
+    result = sim.simulate((39.80, -74.50), WEATHER, 6)
+    arrival = result.arrival_minutes
+    row, col = small_grid.cell_index(39.80, -74.50)
+    assert arrival[row, col] == 0
+    burned = np.argwhere(np.isfinite(arrival))
+    assert (burned[:, 1].max() - col) > 2 * (col - burned[:, 1].min())
+    assert np.nanmax(arrival[np.isfinite(arrival)]) <= 6 * 60
+    # arrival times grow away from the ignition along the head-fire axis
+    head = arrival[row, col:]
+    head = head[np.isfinite(head)]
+    assert np.all(np.diff(head) > 0)
+
+
+def test_simulation_matches_travel_time_on_axis(small_grid):
+    sim = FireSpreadSimulator(small_grid)
+    result = sim.simulate((39.80, -74.50), WEATHER, 6)
+    row, col = small_grid.cell_index(39.80, -74.50)
+    rate = sim.head_fire_rates(WEATHER, 1)[0, 0]
+    cell_width = small_grid.cell_size_ft[1]
+    assert result.arrival_minutes[row, col + 10] == pytest.approx(10 * cell_width / rate, rel=1e-5)
+
+
+@pytest.fixture
+def tall_cell_grid():
+    # Cells about 1.7 times as tall as they are wide, like the default Pinelands grid
+    grid = FuelGrid.pinelands((200, 200))
+    grid.bounds = {"north": 39.86, "south": 39.74, "east": -74.455, "west": -74.545}
+    return grid
+
+
+def test_off_axis_wind_spreads_like_on_axis(tall_cell_grid):
+    sim = FireSpreadSimulator(tall_cell_grid)
+    # Same head-fire rate for every direction, so only the stencil geometry differs
+    sim.head_fire_rates = lambda weather, n_steps: np.full((n_steps, 1), 20.0)
+    areas = {}
+    for direction in np.arange(180.0, 360.0, 11.25):
+        weather = dict(WEATHER, wind_speed=20.0, wind_direction=direction)
+        areas[direction] = sim.simulate((39.80, -74.50), weather, 6).burned_area_acres()
+    # 247.5 and 258.75 lie between stencil bearings; 270 is on one
+    assert max(areas.values()) / min(areas.values()) < 1.5
+    assert areas[247.5] > 0.8 * areas[270.0]
+
+
+def test_burned_area_grows_with_wind_speed(tall_cell_grid):
+    sim = FireSpreadSimulator(tall_cell_grid)
+    for direction in (270.0, 247.5):
+        areas = []
+        for speed in (5.0, 10.0, 20.0, 30.0):
+            weather = dict(WEATHER, wind_speed=speed, wind_direction=direction)
+            areas.append(sim.simulate((39.80, -74.50), weather, 6).burned_area_acres())
+        assert np.all(np.diff(areas) > 0), (direction, areas)
+
+
+def test_non_burnable_cells_block_spread(small_grid):
+    row, col = small_grid.cell_index(39.80, -74.50)
+    small_grid.classes[:, col + 3] = -1
+    sim = FireSpreadSimulator(small_grid)
+    result = sim.simulate((39.80, -74.50), WEATHER, 6)
+    assert not np.isfinite(result.arrival_minutes[:, col + 3:]).any()
+
+
+def test_hourly_weather_changes_direction(small_grid):
+    sim = FireSpreadSimulator(small_grid)
+    weather = dict(WEATHER, wind_direction=[270.0, 270.0, 90.0, 90.0])
+    result = sim.simulate((39.80, -74.50), weather, 4)
+    row, col = small_grid.cell_index(39.80, -74.50)
+    burned = np.argwhere(np.isfinite(result.arrival_minutes))
+    assert burned[:, 1].min() < col - 5
+
+
+def test_isochrones_feature_collection(small_grid):
+    sim = FireSpreadSimulator(small_grid)
+    result = sim.simulate((39.80, -74.50), WEATHER, 3)
+    iso = result.isochrones()
+    assert iso["type"] == "FeatureCollection"
+    assert [f["properties"]["timeStep"] for f in iso["features"]] == [1, 2, 3]
+    areas = [f["properties"]["areaAcres"] for f in iso["features"]]
+    assert areas == sorted(areas)
+    assert areas[-1] == pytest.approx(result.burned_area_acres())
+    assert iso["features"][0]["geometry"]["type"] in ("Polygon", "MultiPolygon")
+
+
+def test_mixed_fuel_classes(small_grid):
+    small_grid.compositions = build_fuel_composition([
+        [VegetationType.PITCH_PINE, VegetationType.SCRUB_OAK],
+        [VegetationType.BLUEBERRY_LOWBUSH],
+    ])
+    small_grid.classes[:60, :] = 1
+    sim = FireSpreadSimulator(small_grid)
+    rates = sim.head_fire_rates(WEATHER, 1)
+    assert rates[0, 0] > rates[0, 1]
+
+
+def test_simulate_fire_endpoint():
+    from api.main import app
+    client = TestClient(app)
+    params = {
+        "windSpeed": 12, "windDirection": 315, "humidity": 30,
+        "temperature": 88, "duration": 3, "gridSize": 200,
+        "ignitionPoint": {"lat": 39.8, "lng": -74.5},
+    }
+    response = client.post("/api/simulate-fire", json=params)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["success"] is True
+    assert data["timeSteps"] == 3
+    assert len(data["isochrones"]["features"]) == 3
+
+    outside = dict(params, ignitionPoint={"lat": 45.0, "lng": -70.0})
+    assert client.post("/api/simulate-fire", json=outside).status_code == 400
+    too_big = dict(params, gridSize=50000)
+    assert client.post("/api/simulate-fire", json=too_big).status_code == 400
+    for duration in (0, -1, 10_000):
+        assert client.post("/api/simulate-fire",
+                           json=dict(params, duration=duration)).status_code == 422
+
+
+def test_iter_steps_matches_simulate(small_grid):
+    sim = FireSpreadSimulator(small_grid)
+    result = sim.simulate((39.80, -74.50), WEATHER, 3)
+    steps = list(sim.iter_steps((39.80, -74.50), WEATHER, 3))
+    assert [s.time_step for s in steps] == [1, 2, 3]
+    rebuilt = np.full(small_grid.shape, np.inf, dtype=np.float32)
+    for s in steps:
+        assert np.isinf(rebuilt[s.rows, s.cols]).all()  # each cell is reported once
+        assert (s.arrival_minutes <= s.end_minutes).all()
+        rebuilt[s.rows, s.cols] = s.arrival_minutes
+    np.testing.assert_array_equal(rebuilt, result.arrival_minutes)
+
+    cell = steps[0].to_dict(small_grid)["cells"][0]
+    row, col = small_grid.cell_index(cell[0], cell[1])
+    assert result.arrival_minutes[row, col] == pytest.approx(cell[2], abs=0.05)
+
+
+def test_simulate_fire_endpoint_streams_ndjson():
+    import json
+    from api.main import app
+    client = TestClient(app)
+    params = {
+        "windSpeed": 12, "windDirection": 315, "humidity": 30,
+        "temperature": 88, "duration": 3, "gridSize": 200,
+        "ignitionPoint": {"lat": 39.8, "lng": -74.5},
+    }
+    response = client.post("/api/simulate-fire?stream=true", json=params)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["type"] for line in lines] == ["start", "step", "step", "step", "complete"]
+    assert sum(line["ignitedCells"] for line in lines[1:-1]) > 0
+    assert lines[-1]["burnedAreaAcres"] == pytest.approx(lines[-2]["burnedAreaAcres"])
+
+    outside = dict(params, ignitionPoint={"lat": 45.0, "lng": -70.0})
+    assert client.post("/api/simulate-fire?stream=true", json=outside).status_code == 400
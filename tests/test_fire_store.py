@@ -0,0 +1,128 @@
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from shapely.geometry import box
+
+import app.data_processing.fire_store as fire_store
+from app.data_processing.data_loader import DataLoader
+from app.data_processing.fire_store import FireOccurrenceStore, zorder_cells
+
+
+def write_fpa_csv(path, n_per_year=50):
+    rng = np.random.default_rng(0)
+    rows = []
+    for year in (2018, 2019, 2020):
+        for i in range(n_per_year):
+            rows.append({
+                "FOD_ID": year * 1000 + i,
+                "FIRE_NAME": f"fire {i}",
+                "LATITUDE": rng.uniform(38.0, 41.0),
+                "LONGITUDE": rng.uniform(-76.0, -73.0),
+                "DISCOVERY_DATE": f"{year}-06-{i % 28 + 1:02d}",
+                "CONTAINMENT_DATE": f"{year}-07-{i % 28 + 1:02d}",
+            })
+    rows.append(dict(rows[0]))  # duplicate record
+    rows.append({"FOD_ID": 1, "LATITUDE": 0.0, "LONGITUDE": 0.0, "DISCOVERY_DATE": "2019-01-01"})
+    rows.append({"FOD_ID": 2, "LATITUDE": None, "LONGITUDE": -74.5, "DISCOVERY_DATE": "2019-01-01"})
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return pd.DataFrame(rows[:3 * n_per_year])
+
+
+def test_zorder_keeps_nearby_points_close():
+    keys = zorder_cells(np.array([39.80, 39.81, 45.0]), np.array([-74.50, -74.51, -74.5]))
+    assert abs(int(keys[0]) - int(keys[1])) < abs(int(keys[0]) - int(keys[2]))
+
+
+def test_build_partitions_by_year_and_keeps_needed_fields(tmp_path):
+    source = tmp_path / "fire_occurrence.csv"
+    write_fpa_csv(source)
+    store = FireOccurrenceStore(source, tmp_path / "store").ensure()
+    years = sorted(p.name for p in store.path.glob("year=*"))
+    assert years == ["year=2018", "year=2019", "year=2020"]
+    schema = pq.read_schema(store.path / "year=2019" / "part-0.parquet")
+    assert "FIRE_NAME" not in schema.names
+    assert str(schema.field("discovery_date").type).startswith("timestamp")
+
+    everything = store.query(None, 2000, 2030)
+    assert len(everything) == 150  # duplicate, (0, 0) and missing coordinates dropped
+    assert list(everything.columns) == fire_store.FIRE_FIELDS
+
+
+def test_chunked_build_matches_single_pass(tmp_path, monkeypatch):
+    source = tmp_path / "fire_occurrence.csv"
+    write_fpa_csv(source)
+    # The duplicate of the first record lands in the last chunk
+    store = FireOccurrenceStore(source, tmp_path / "store")
+    reads = []
+    iter_records = fire_store.iter_fire_records
+    monkeypatch.setattr(fire_store, "iter_fire_records",
+                        lambda *a, **k: (reads.append(len(c)) or c for c in iter_records(*a, **k)))
+    store.build(chunksize=40)
+    assert len(reads) > 3 and max(reads) <= 40
+    assert [p.name for p in store.path.glob("year=*/*")] == ["part-0.parquet"] * 3
+
+    result = store.query(None, 2000, 2030)
+    expected = fire_store.read_fire_records(source)
+    assert sorted(result["FOD_ID"]) == sorted(expected["FOD_ID"])
+    part = pq.read_table(store.path / "year=2019" / "part-0.parquet").to_pandas()
+    keys = zorder_cells(part["LATITUDE"].to_numpy(), part["LONGITUDE"].to_numpy())
+    assert (np.diff(keys.astype(np.int64)) >= 0).all()
+
+
+def test_query_filters_years_and_bounds(tmp_path):
+    source = tmp_path / "fire_occurrence.csv"
+    records = write_fpa_csv(source)
+    store = FireOccurrenceStore(source, tmp_path / "store").ensure()
+    bounds = (-74.8, 39.4, -74.2, 40.2)
+    result = store.query(bounds, 2019, 2020)
+    expected = records[
+        records["LONGITUDE"].between(bounds[0], bounds[2])
+        & records["LATITUDE"].between(bounds[1], bounds[3])
+        & (records["FOD_ID"] >= 2019000)
+    ]
+    assert sorted(result["FOD_ID"]) == sorted(expected["FOD_ID"])
+    assert result["discovery_date"].dt.year.min() >= 2019
+
+
+def test_store_rebuilds_when_source_changes(tmp_path, monkeypatch):
+    source = tmp_path / "fire_occurrence.csv"
+    write_fpa_csv(source)
+    store = FireOccurrenceStore(source, tmp_path / "store").ensure()
+    builds = []
+    monkeypatch.setattr(FireOccurrenceStore, "build", lambda self: builds.append(self))
+    store.ensure()
+    assert builds == []
+    write_fpa_csv(source, n_per_year=10)
+    os.utime(source, ns=(0, 0))
+    assert not store.is_current()
+
+
+def test_download_fire_history_reads_from_store(tmp_path):
+    dl = DataLoader(tmp_path)
+    write_fpa_csv(dl.raw_dir / "fire_occurrence.csv")
+    region = gpd.GeoDataFrame(geometry=[box(-74.8, 39.4, -74.2, 40.2)], crs="EPSG:4326")
+    fires = dl._download_fire_history(region, 2018, 2020)
+    assert (dl.processed_dir / "fire_occurrence" / "_manifest.json").exists()
+    assert len(fires) > 0
+    assert fires.geometry.within(region.geometry.iloc[0]).all()
+    assert pd.api.types.is_datetime64_any_dtype(fires["discovery_date"])
+
+
+def test_streamed_records_are_filtered_per_chunk_with_compact_dtypes(tmp_path):
+    source = tmp_path / "fire_occurrence.csv"
+    records = write_fpa_csv(source)
+    bounds = (-75.0, 39.0, -74.0, 40.0)
+    chunks = list(fire_store.iter_fire_records(source, 2019, 2019, bounds, chunksize=20))
+    assert len(chunks) > 1
+    assert all(chunk["discovery_date"].dt.year.eq(2019).all() for chunk in chunks)
+    streamed = fire_store.read_fire_records(source, 2019, 2019, bounds, chunksize=20)
+    assert streamed["LATITUDE"].dtype == np.float32
+    expected = records[
+        records["LONGITUDE"].between(-75.0, -74.0) & records["LATITUDE"].between(39.0, 40.0)
+        & records["FOD_ID"].between(2019000, 2019999)
+    ]
+    assert sorted(streamed["FOD_ID"]) == sorted(expected["FOD_ID"])
+    assert fire_store.read_fire_records(source, 1990, 1991).empty
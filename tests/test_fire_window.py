@@ -0,0 +1,204 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.linear_model import LogisticRegression
+
+import app.api.fire_prediction as fire_prediction
+from app.fire_window import (
+    RESULT_FILE,
+    FireWindowJobManager,
+    JobQueueFull,
+    daily_weather,
+    fire_window_labels,
+    fit_fire_window_classifiers,
+)
+from app.model_registry import ModelRegistry, save_fire_window_models
+
+
+def test_fire_window_labels_use_half_open_windows():
+    dates = pd.date_range("2020-07-01", "2020-07-06", freq="D")
+    fires = pd.Series(pd.to_datetime(["2020-07-05 14:30", "2020-07-03 00:00", None]))
+    assert fire_window_labels(dates, fires, 1).tolist() == [0, 0, 1, 0, 1, 0]
+    assert fire_window_labels(dates, fires, 2).tolist() == [0, 1, 1, 1, 1, 0]
+    assert fire_window_labels(dates, fires.iloc[:0], 3).tolist() == [0] * 6
+
+
+def test_daily_weather_averages_observations_per_day():
+    env = pd.DataFrame({"date": pd.to_datetime(["2020-07-01", "2020-07-01", "2020-07-03"]),
+                        "TAVG": [10.0, 20.0, 30.0], "RHAV": [50.0, 70.0, 40.0],
+                        "AWND": [1.0, 3.0, 5.0]})
+    daily = daily_weather(env, pd.date_range("2020-07-01", "2020-07-03", freq="D"))
+    assert daily["TAVG"].tolist()[0] == 15.0
+    assert daily.iloc[1].isna().all()
+    assert daily["AWND"].tolist()[2] == 5.0
+
+
+def test_fit_skips_single_class_windows():
+    X = pd.DataFrame({"TAVG": range(10), "RHAV": range(10), "AWND": range(10)})
+    classifiers = {"Logistic": LogisticRegression()}
+    trained, reports = fit_fire_window_classifiers(X, pd.Series([0] * 10), classifiers)
+    assert trained == {} and reports == {}
+    trained, reports = fit_fire_window_classifiers(X, pd.Series([0, 1] * 5), classifiers)
+    assert list(trained) == ["Logistic"] and "accuracy" in reports["Logistic"]
+
+
+class StubTrainer:
+    """Stands in for train_fire_window_job; blocks until released."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self, start_date, end_date, label_window, artifact_dir, data_dir, boundary_path):
+        self.calls += 1
+        self.release.wait(5)
+        if label_window > 5:
+            raise ValueError("window too long")
+        result = {"start_date": start_date, "end_date": end_date, "label_window": label_window,
+                  "reports": {"Stub": {"accuracy": 0.9}}, "finished_at": datetime.now().isoformat()}
+        Path(artifact_dir).mkdir(parents=True, exist_ok=True)
+        (Path(artifact_dir) / RESULT_FILE).write_text(json.dumps(result))
+        return result
+
+
+@pytest.fixture
+def trainer():
+    return StubTrainer()
+
+
+@pytest.fixture
+def serving(tmp_path):
+    return ModelRegistry(fire_window_model_dir=tmp_path / "serving")
+
+
+@pytest.fixture
+def manager(tmp_path, trainer, serving):
+    return FireWindowJobManager(artifact_dir=tmp_path, max_workers=1, max_pending=2,
+                                train_fn=trainer,
+                                executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+                                model_dir=serving.fire_window_model_dir, model_registry=serving)
+
+
+def test_identical_windows_share_one_job(manager, trainer):
+    job = manager.submit(datetime(2020, 7, 1, 9), datetime(2020, 7, 31), 1)
+    assert manager.submit(datetime(2020, 7, 1), datetime(2020, 7, 31, 18), 1) is job
+    assert manager.get(job.job_id).status in ("queued", "running")
+    trainer.release.set()
+    job.future.result()
+    assert manager.get(job.job_id).status == "completed"
+    assert manager.get(job.job_id).reports == {"Stub": {"accuracy": 0.9}}
+    assert trainer.calls == 1
+
+
+def test_completed_results_survive_a_new_manager(manager, trainer, tmp_path):
+    trainer.release.set()
+    job = manager.submit(datetime(2020, 7, 1), datetime(2020, 7, 31), 1)
+    job.future.result()
+    manager.get(job.job_id)  # settles the job even if its done callback has not run yet
+    fresh = FireWindowJobManager(artifact_dir=tmp_path, train_fn=trainer,
+                                 executor_factory=lambda n: ThreadPoolExecutor(max_workers=n),
+                                 model_dir=None)
+    assert fresh.get(job.job_id).status == "completed"
+    assert fresh.submit(datetime(2020, 7, 1), datetime(2020, 7, 31), 1).reports == job.reports
+    assert trainer.calls == 1
+
+
+def test_queue_is_bounded_and_failures_are_reported(manager, trainer):
+    manager.submit(datetime(2020, 7, 1), datetime(2020, 7, 31), 1)
+    failing = manager.submit(datetime(2020, 7, 1), datetime(2020, 7, 31), 9)
+    with pytest.raises(JobQueueFull):
+        manager.submit(datetime(2020, 8, 1), datetime(2020, 8, 31), 1)
+    trainer.release.set()
+    failing.future.exception()
+    assert manager.get(failing.job_id).status == "failed"
+    assert "window too long" in manager.get(failing.job_id).error
+    assert manager.pending_count() == 0
+
+
+def test_finished_job_models_are_served(manager, trainer, serving):
+    stale = serving.fire_window_model_dir
+    save_fire_window_models({"Stale": LogisticRegression()}, stale)
+
+    def train_and_save(start_date, end_date, label_window, artifact_dir, *args):
+        X = pd.DataFrame({"TAVG": [50, 90], "RHAV": [80, 20], "AWND": [2, 12]})
+        save_fire_window_models({"Logistic": LogisticRegression().fit(X, [0, 1])},
+                                Path(artifact_dir))
+        return trainer(start_date, end_date, label_window, artifact_dir, *args)
+
+    manager.train_fn = train_and_save
+    trainer.release.set()
+    job = manager.submit(datetime(2020, 7, 1), datetime(2020, 7, 31), 1)
+    job.future.result()
+    assert manager.get(job.job_id).status == "completed"
+    assert sorted(p.name for p in stale.iterdir()) == ["Logistic.joblib"]
+    assert list(serving.get_fire_window_models()) == ["Logistic"]
+
+
+def test_registry_reloads_outside_the_manager_lock(manager, trainer, serving, monkeypatch):
+    lock_free = []
+
+    def try_lock():
+        if not manager._lock.acquire(timeout=1):
+            return False
+        manager._lock.release()
+        return True
+
+    def reload(name):
+        # Another thread can still query jobs while the registry reloads
+        with ThreadPoolExecutor(max_workers=1) as probe:
+            lock_free.append(probe.submit(try_lock).result())
+
+    def train_and_save(start_date, end_date, label_window, artifact_dir, *args):
+        save_fire_window_models({"Logistic": LogisticRegression()}, Path(artifact_dir))
+        return trainer(start_date, end_date, label_window, artifact_dir, *args)
+
+    monkeypatch.setattr(serving, "reload", reload)
+    manager.train_fn = train_and_save
+    trainer.release.set()
+    job = manager.submit(datetime(2020, 7, 1), datetime(2020, 7, 31), 1)
+    job.future.result()
+    assert manager.get(job.job_id).status == "completed"
+    assert lock_free == [True]
+
+
+def test_default_pool_spawns_workers(tmp_path):
+    manager = FireWindowJobManager(artifact_dir=tmp_path, max_workers=1, model_dir=None)
+    executor = manager._get_executor()
+    try:
+        assert executor._mp_context.get_start_method() == "spawn"
+    finally:
+        manager.shutdown()
+
+
+def test_shutdown_cancels_queued_jobs(manager, trainer):
+    running = manager.submit(datetime(2020, 7, 1), datetime(2020, 7, 31), 1)
+    queued = manager.submit(datetime(2020, 8, 1), datetime(2020, 8, 31), 1)
+    trainer.release.set()
+    manager.shutdown()
+    assert manager.get(running.job_id).status == "completed"
+    assert manager.get(queued.job_id).status in ("completed", "failed")
+    manager.shutdown()  # idempotent
+    assert manager.submit(datetime(2020, 9, 1), datetime(2020, 9, 30), 1).future.result()
+
+
+def test_job_endpoints(manager, trainer, monkeypatch):
+    from app.main import app
+    monkeypatch.setattr(fire_prediction, "job_manager", manager)
+    client = TestClient(app)
+    body = {"start_date": "2020-07-01", "end_date": "2020-07-31"}
+    response = client.post("/api/v1/fire_window_jobs", json=body)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    trainer.release.set()
+    manager.get(job_id).future.result()
+    job = client.get(f"/api/v1/fire_window_jobs/{job_id}").json()
+    assert job["status"] == "completed" and job["reports"]["Stub"]["accuracy"] == 0.9
+    assert client.get("/api/v1/fire_window_jobs/unknown").status_code == 404
+    reversed_window = {"start_date": "2020-07-31", "end_date": "2020-07-01"}
+    assert client.post("/api/v1/fire_window_jobs", json=reversed_window).status_code == 400
@@ -1,5 +1,6 @@
 import datetime
 import pytest
+import numpy as np
 
 from app.firefighter_bill import WeatherConditions, FirefighterBill, VegetationType, FuelModelType
 
@@ -119,3 +120,95 @@ def test_get_species_protection_guidelines():
     # Other season
     guides2 = bill.get_species_protection_guidelines("Any", "Fall")
     assert all("Protect Pine Barrens Treefrog" not in g for g in guides2)
+
+
+def test_predict_fire_behavior_batch_matches_scalar():
+    from app.firefighter_bill import build_fuel_composition
+    bill = FirefighterBill()
+    fuel_rows = [
+        [VegetationType.PITCH_PINE, VegetationType.SCRUB_OAK],
+        [VegetationType.SHORTLEAF_PINE, VegetationType.BLUEBERRY_LOWBUSH,
+         VegetationType.MOUNTAIN_LAUREL],
+        [VegetationType.ATLANTIC_WHITE_CEDAR],
+        [VegetationType.PITCH_PINE, VegetationType.PITCH_PINE, VegetationType.WHITE_OAK],
+        [],
+    ]
+    weathers = []
+    for i, (wind, humidity, direction) in enumerate(
+            [(12, 20, "NW"), (3, 75, "s"), (25, 35, "E"), (8, 50, "SW"), (18, 15, "N")]):
+        w = make_weather(wind_speed=wind, humidity=humidity, wind_direction=direction)
+        w.temperature = 60 + 8 * i
+        w.drought_index = 150 * i
+        weathers.append(w)
+
+    columns = {
+        field: [getattr(w, field) for w in weathers]
+        for field in ["temperature", "humidity", "wind_speed", "wind_direction", "drought_index"]
+    }
+    batch = bill.predict_fire_behavior_batch(columns, build_fuel_composition(fuel_rows))
+
+    for i, (w, fuels) in enumerate(zip(weathers, fuel_rows)):
+        scalar = bill.predict_fire_behavior(w, fuels)
+        assert batch.spread_rate[i] == pytest.approx(scalar.spread_rate)
+        assert batch.flame_length[i] == pytest.approx(scalar.flame_length)
+        assert batch.intensity[i] == pytest.approx(scalar.intensity)
+        assert batch.spotting_distance[i] == pytest.approx(scalar.spotting_distance)
+
+
+def test_predict_fire_behavior_batch_broadcasts_single_composition():
+    from app.firefighter_bill import build_fuel_composition
+    bill = FirefighterBill()
+    composition = build_fuel_composition([[VegetationType.PITCH_PINE]])
+    weather = {
+        "temperature": [70.0, 90.0, 95.0],
+        "humidity": [50.0, 30.0, 20.0],
+        "wind_speed": [5.0, 15.0, 25.0],
+        "wind_direction": ["N", "W", "NW"],
+        "drought_index": [100.0, 300.0, 500.0],
+    }
+    batch = bill.predict_fire_behavior_batch(weather, composition)
+    assert batch.spread_rate.shape == (3,)
+    assert (batch.spotting_distance <= 3.0).all()
+    with pytest.raises(ValueError):
+        bill.predict_fire_behavior_batch(weather, composition[:, :3])
+
+
+def test_fuel_coefficient_table_calibration_roundtrip(tmp_path):
+    import json
+    from app.firefighter_bill import FuelCoefficientTable, VEGETATION_INDEX, FUEL_MODEL_INDEX
+    default = FuelCoefficientTable.default()
+    path = tmp_path / "coefficients.json"
+    default.to_json(path)
+    reloaded = FuelCoefficientTable.from_json(path)
+    assert np.allclose(reloaded.spread_adjustment, default.spread_adjustment)
+    assert np.allclose(reloaded.base_fuel_load, default.base_fuel_load)
+
+    path.write_text(json.dumps({
+        "vegetation": {"PITCH_PINE": {"spread_adjustment": 2.0}},
+        "fuel_models": {"GR1": {"base_fuel_load": 0.5}},
+    }))
+    calibrated = FuelCoefficientTable.from_json(path)
+    assert calibrated.spread_adjustment[VEGETATION_INDEX[VegetationType.PITCH_PINE]] == 2.0
+    assert calibrated.base_fuel_load[FUEL_MODEL_INDEX[FuelModelType.GR1]] == 0.5
+    # untouched entries keep their defaults
+    assert calibrated.heat_content[VEGETATION_INDEX[VegetationType.PITCH_PINE]] == 9500
+
+    path.write_text(json.dumps({"vegetation": {"PITCH_PINE": {"bogus": 1.0}}}))
+    with pytest.raises(ValueError):
+        FuelCoefficientTable.from_json(path)
+
+
+def test_fuel_coefficients_swap_per_instance():
+    from app.firefighter_bill import FuelCoefficientTable, VEGETATION_INDEX
+    table = FuelCoefficientTable.default()
+    table.spread_adjustment[VEGETATION_INDEX[VegetationType.PITCH_PINE]] = 3.6
+    custom = FirefighterBill(fuel_coefficients=table)
+    stock = FirefighterBill()
+    w = make_weather(wind_speed=10)
+    w.drought_index = 0
+    assert stock._calculate_spread_rate(w, [VegetationType.PITCH_PINE]) == pytest.approx(4.3 * 1.8)
+    assert custom._calculate_spread_rate(w, [VegetationType.PITCH_PINE]) == pytest.approx(4.3 * 3.6)
+    assert (stock._calculate_fuel_load([VegetationType.SCRUB_OAK], FuelModelType.SH2)
+            == pytest.approx(2.6))
+    pines = [VegetationType.PITCH_PINE, VegetationType.SHORTLEAF_PINE]
+    assert stock._calculate_heat_content(pines) == 9250
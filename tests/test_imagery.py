@@ -0,0 +1,85 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+import rasterio
+from rasterio.transform import from_origin
+
+from app.data_processing.data_loader import DataLoader
+from app.data_processing.imagery import (
+    is_cog,
+    overview_factors,
+    pyramid_level,
+    read_window,
+    write_cog,
+)
+
+# 2048 x 2048 pixels of 0.001 degrees over (-75, 39) .. (-72.952, 41.048)
+PROFILE = {"crs": "EPSG:4326", "transform": from_origin(-75.0, 41.048, 0.001, 0.001),
+           "nodata": None}
+
+
+def scene(size=2048):
+    rows, cols = np.indices((size, size))
+    return np.stack([(rows // 64).astype(np.uint16), (cols // 64).astype(np.uint16)])
+
+
+def test_overview_factors_stop_at_one_tile():
+    assert overview_factors(2048, 2048, 512) == [2, 4]
+    assert overview_factors(4000, 300, 512) == [2, 4, 8]
+    assert overview_factors(512, 512, 512) == []
+
+
+def test_pyramid_level_picks_coarsest_level_still_fine_enough():
+    assert pyramid_level(10.0, [2, 4, 8], None) == 1
+    assert pyramid_level(10.0, [2, 4, 8], 35.0) == 2
+    assert pyramid_level(10.0, [2, 4, 8], 40.0) == 4
+    assert pyramid_level(10.0, [2, 4, 8], 1000.0) == 8
+    assert pyramid_level(10.0, [2, 4, 8], 5.0) == 1
+
+
+def test_write_cog_is_tiled_with_overviews(tmp_path):
+    path = write_cog(tmp_path / "scene.tif", scene(), PROFILE)
+    with rasterio.open(path) as src:
+        assert src.block_shapes[0] == (512, 512)
+        assert src.overviews(1) == [2, 4]
+        assert src.crs.to_epsg() == 4326
+    assert is_cog(path)
+    assert not (tmp_path / "scene.tif.part").exists()
+
+
+def test_read_window_returns_only_the_bbox(tmp_path):
+    path = write_cog(tmp_path / "scene.tif", scene(), PROFILE)
+    data, transform = read_window(path, (-74.5, 40.0, -74.4, 40.1))
+    assert data.shape == (2, 100, 100)
+    assert transform.c == pytest.approx(-74.5) and transform.f == pytest.approx(40.1)
+    # Rows start 948 pixels below the top edge, columns 500 right of the left edge
+    assert data[0, 0, 0] == 948 // 64 and data[1, 0, 0] == 500 // 64
+
+    coarse, coarse_transform = read_window(path, (-74.5, 40.0, -74.4, 40.1), resolution=0.004)
+    assert coarse.shape == (2, 25, 25)
+    assert coarse_transform.a == pytest.approx(0.004)
+
+    empty, _ = read_window(path, (10.0, 10.0, 11.0, 11.0))
+    assert empty.shape[1:] == (0, 0)
+
+
+def test_catalog_scan_converts_stripped_scenes_to_cog(tmp_path):
+    loader = DataLoader(tmp_path)
+    date = datetime(2025, 5, 23)
+    bbox = (-75.0, 39.0, -72.952, 41.048)
+    path = loader.raw_dir / (f"satellite_{date.strftime('%Y%m%d')}_"
+                             f"{bbox[0]}_{bbox[1]}_{bbox[2]}_{bbox[3]}.tif")
+    data = scene()
+    with rasterio.open(path, "w", driver="GTiff", count=2, height=2048, width=2048,
+                       dtype="uint16", **PROFILE) as dst:
+        dst.write(data)
+    assert not is_cog(path)
+
+    # Converted once, when the scene is catalogued, not when it is read
+    assert loader.scene_catalog.scan(loader.raw_dir) == 1
+    assert is_cog(path)
+    assert loader.scene_catalog.scan(loader.raw_dir) == 0
+    result = loader.load_satellite_imagery(bbox, date, resolution=0.004)
+    assert result.shape == (2, 512, 512)
+    np.testing.assert_array_equal(loader.load_satellite_imagery(bbox, date), data)
@@ -0,0 +1,92 @@
+import os
+
+import geopandas as gpd
+import pytest
+from shapely.geometry import box
+
+import app.data_processing.land_use as land_use
+from app.data_processing.data_loader import DataLoader
+from app.data_processing.land_use import (SOURCE_INDEX, ensure_flatgeobuf, land_use_layer,
+                                          read_land_use)
+
+
+@pytest.fixture
+def layer_file(tmp_path):
+    gdf = gpd.GeoDataFrame(
+        {"landcover": [i % 4 for i in range(400)]},
+        geometry=[box(x * 0.1, y * 0.1, x * 0.1 + 0.1, y * 0.1 + 0.1)
+                  for x in range(20) for y in range(20)],
+        crs="EPSG:4326",
+    )
+    path = tmp_path / "land_use.geojson"
+    gdf.to_file(path, driver="GeoJSON")
+    return path
+
+
+def test_flatgeobuf_copy_supports_bbox_reads(layer_file):
+    fgb = ensure_flatgeobuf(layer_file)
+    assert fgb.suffix == ".fgb"
+    assert len(read_land_use(fgb)) == 400
+    assert len(read_land_use(fgb, bbox=(0.05, 0.05, 0.25, 0.15))) == 6
+    mtime = fgb.stat().st_mtime_ns
+    assert ensure_flatgeobuf(layer_file).stat().st_mtime_ns == mtime
+
+
+def test_flatgeobuf_copy_is_not_reread_on_later_calls(layer_file, monkeypatch):
+    fgb = ensure_flatgeobuf(layer_file)
+    reads = []
+    read_file = gpd.read_file
+    monkeypatch.setattr(land_use.gpd, "read_file",
+                        lambda *a, **k: reads.append(a) or read_file(*a, **k))
+    assert ensure_flatgeobuf(layer_file) == fgb
+    assert ensure_flatgeobuf(layer_file) == fgb
+    assert reads == []
+
+    # A copy replaced behind the cache's back is checked again
+    gpd.read_file(layer_file).to_file(fgb, driver="FlatGeobuf", SPATIAL_INDEX="YES")
+    ensure_flatgeobuf(layer_file)
+    assert SOURCE_INDEX in read_file(fgb, rows=1).columns
+
+
+def test_flatgeobuf_copy_keeps_source_row_numbers(layer_file):
+    source = gpd.read_file(layer_file)
+    # A copy from before the row column existed is rewritten
+    source.to_file(layer_file.with_suffix(".fgb"), driver="FlatGeobuf", SPATIAL_INDEX="YES")
+    fgb = ensure_flatgeobuf(layer_file)
+
+    copy = read_land_use(fgb)
+    assert sorted(copy.index) == list(source.index)
+    assert copy.geometry.geom_equals(source.geometry.loc[copy.index]).all()
+    subset = read_land_use(fgb, bbox=(0.05, 0.05, 0.25, 0.15))
+    assert (subset["landcover"] == source["landcover"].loc[subset.index]).all()
+
+
+def test_layer_clip_matches_sjoin_and_is_loaded_once(layer_file, monkeypatch):
+    fgb = ensure_flatgeobuf(layer_file)
+    region = gpd.GeoDataFrame({"name": ["r"]}, geometry=[box(0.33, 0.33, 0.71, 0.52)],
+                              crs="EPSG:4326")
+    expected = gpd.sjoin(gpd.read_file(layer_file), region, how="inner", predicate="intersects")
+
+    layer = land_use_layer(fgb)
+    result = layer.clip(region)
+    assert sorted(result.index) == sorted(expected.index)
+    assert list(result.columns) == list(expected.columns)
+
+    reads = []
+    monkeypatch.setattr(land_use, "read_land_use", lambda *a, **k: reads.append(a))
+    assert land_use_layer(fgb) is layer
+    assert len(layer.clip(region)) == len(expected)
+    assert reads == []
+
+    os.utime(fgb, ns=(0, 0))
+    monkeypatch.undo()
+    assert land_use_layer(fgb) is not layer
+
+
+def test_loader_queries_the_cached_layer(tmp_path, layer_file):
+    loader = DataLoader(tmp_path)
+    os.replace(layer_file, loader.geo_dir / "land_use.geojson")
+    region = gpd.GeoDataFrame(geometry=[box(0, 0, 0.15, 0.15)], crs="EPSG:4326")
+    result = loader.load_land_use_data(region)
+    assert len(result) == 4
+    assert (loader.geo_dir / "land_use.fgb").exists()
@@ -0,0 +1,90 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.bundle import MANIFEST, ModelBundle, is_bundle
+from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
+
+
+def training_frame(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "temperature": rng.uniform(10, 40, n),
+        "humidity": rng.uniform(10, 90, n),
+        "vegetation_type": rng.choice(["forest", "grass", "shrub"], n),
+    })
+    y = (X["temperature"] > 25).astype(int).values
+    return X, y
+
+
+@pytest.fixture
+def fitted_model():
+    X, y = training_frame()
+    model = EnsembleWildfireModel()
+    model.models["rf"].set_params(n_estimators=5)
+    model.models["lgbm"].set_params(n_estimators=5)
+    model.models["catboost"].set_params(iterations=5)
+    model.fit_preprocessing(X)
+    X_processed = model.preprocess(X)
+    for member in model.models.values():
+        member.fit(X_processed, y)
+    return model
+
+
+def test_preprocess_columns_do_not_depend_on_the_batch(fitted_model):
+    batch = pd.DataFrame({"temperature": [20.0], "humidity": [50.0], "vegetation_type": ["grass"]})
+    processed = fitted_model.preprocess(batch)
+    assert list(processed.columns) == fitted_model.feature_columns
+    assert fitted_model.feature_columns == [
+        "temperature", "humidity", "vegetation_type_forest", "vegetation_type_grass",
+        "vegetation_type_shrub", "vegetation_type_<unseen>"
+    ]
+    assert processed["vegetation_type_grass"].iloc[0] == 1
+
+
+def test_bundle_round_trip_with_memory_mapping(fitted_model, tmp_path):
+    path = tmp_path / "wildfire_predictor"
+    fitted_model.save_model(path)
+    assert is_bundle(path)
+    manifest = json.loads((path / MANIFEST).read_text())
+    assert manifest["members"] == ["rf", "lgbm", "catboost"]
+    assert manifest["feature_columns"] == fitted_model.feature_columns
+
+    loaded = EnsembleWildfireModel(path)
+    assert loaded.feature_columns == fitted_model.feature_columns
+    assert isinstance(loaded.encoder.mean, np.memmap)
+
+    X, _ = training_frame(n=10, seed=1)
+    expected = fitted_model.preprocess(X)
+    actual = loaded.preprocess(X)
+    pd.testing.assert_frame_equal(actual, expected)
+    for name in ("rf", "lgbm", "catboost"):
+        np.testing.assert_allclose(loaded.models[name].predict_proba(actual),
+                                   fitted_model.models[name].predict_proba(expected))
+
+    # Saving again replaces the bundle in place
+    fitted_model.save_model(path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["wildfire_predictor"]
+
+
+def test_unknown_bundle_format_is_rejected(fitted_model, tmp_path):
+    path = tmp_path / "bundle"
+    fitted_model.save_model(path)
+    manifest = json.loads((path / MANIFEST).read_text())
+    (path / MANIFEST).write_text(json.dumps(dict(manifest, format=99)))
+    with pytest.raises(ValueError):
+        ModelBundle.load(path)
+
+
+def test_soft_voting_weights_are_saved(fitted_model, tmp_path):
+    fitted_model.member_weights = {"rf": 0.5, "lgbm": 0.25, "catboost": 0.25}
+    path = tmp_path / "bundle"
+    fitted_model.save_model(path)
+    assert json.loads((path / MANIFEST).read_text())["weights"] == fitted_model.member_weights
+
+    loaded = EnsembleWildfireModel(path)
+    assert loaded.member_weights == fitted_model.member_weights
+    X, _ = training_frame(n=10, seed=2)
+    np.testing.assert_allclose(loaded.predict_proba(X), fitted_model.predict_proba(X), rtol=1e-6)
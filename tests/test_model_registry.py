@@ -0,0 +1,124 @@
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+from shapely.geometry import box
+from sklearn.linear_model import LogisticRegression
+
+import app.api.fire_prediction as fire_prediction
+from app.model_registry import (
+    ModelRegistry,
+    load_fire_window_models,
+    save_fire_window_models,
+)
+
+
+def fitted_model():
+    X = pd.DataFrame({"TAVG": [50, 60, 80, 90], "RHAV": [80, 70, 30, 20], "AWND": [2, 3, 9, 12]})
+    return LogisticRegression().fit(X, [0, 0, 1, 1])
+
+
+@pytest.fixture
+def registry(tmp_path):
+    boundary_path = tmp_path / "boundary.shp"
+    boundary = gpd.GeoDataFrame(geometry=[box(-74.8, 39.4, -74.2, 40.2)], crs="EPSG:4326")
+    boundary.to_file(boundary_path)
+    save_fire_window_models({"Logistic": fitted_model()}, tmp_path / "models")
+    return ModelRegistry(
+        boundary_path=boundary_path,
+        data_dir=tmp_path / "data",
+        risk_model_path=tmp_path / "missing.pkl",
+        fire_window_model_dir=tmp_path / "models",
+    )
+
+
+def test_fire_window_models_round_trip(tmp_path):
+    assert load_fire_window_models(tmp_path / "nothing") == {}
+    save_fire_window_models({"a": fitted_model()}, tmp_path)
+    models = load_fire_window_models(tmp_path)
+    assert list(models) == ["a"]
+    assert models["a"].predict(pd.DataFrame({"TAVG": [95], "RHAV": [10], "AWND": [15]}))[0] == 1
+
+
+def test_warm_up_loads_components_once(registry):
+    registry.warm_up()
+    assert registry.boundary is not None
+    assert registry.predictor is not None
+    # The predictor loads the professional analysis sources from the registry's data dir
+    assert registry.predictor.data_loader.data_dir == registry.data_dir
+    assert list(registry.fire_window_models) == ["Logistic"]
+    assert registry.data_loader is None  # created on first use
+    predictor = registry.predictor
+    registry.warm_up()
+    assert registry.predictor is predictor
+    assert registry.get_data_loader() is not None
+
+    status = registry.status()
+    assert status["loaded"]["boundary"] and not status["loaded"]["risk_model"]
+    assert {"boundary", "predictor", "fire_window_models", "data_loader",
+            "predictor.ml_model", "predictor.cv_analyzer"} <= set(status["warmup_seconds"])
+    assert status["errors"] == {}
+
+
+def test_missing_component_is_reported(tmp_path):
+    registry = ModelRegistry(boundary_path=tmp_path / "none.shp")
+    assert registry.get_boundary() is None
+    assert "not found" in registry.status()["errors"]["boundary"]
+    assert "boundary" not in registry.warmup_seconds
+
+
+def test_failed_load_is_retried(tmp_path, registry):
+    boundary_path = registry.boundary_path
+    registry.boundary_path = tmp_path / "late.shp"
+    registry.warm_up()
+    assert registry.boundary is None and "boundary" in registry.errors
+
+    registry.boundary_path = boundary_path
+    assert registry.get_boundary() is not None
+    assert "boundary" in registry.warmup_seconds
+    assert "boundary" not in registry.status()["errors"]
+
+
+class StubLoader:
+    def _download_fire_history(self, boundary, start_year, end_year):
+        return pd.DataFrame({"discovery_date": pd.to_datetime(["2020-07-03"])})
+
+    def __init__(self):
+        self.env_calls = 0
+
+    def load_environmental_data(self, bbox, start, end):
+        self.env_calls += 1
+        dates = pd.date_range(start, end, freq="D")
+        hot = dates.day >= 3
+        return pd.DataFrame({"date": dates, "TAVG": np.where(hot, 90, 55),
+                             "RHAV": np.where(hot, 20, 75), "AWND": np.where(hot, 10, 2)})
+
+
+def test_predict_fire_window_runs_inference_only(registry, monkeypatch):
+    from app.main import app
+    registry.warm_up()
+    registry.data_loader = loader = StubLoader()
+    registry.warmup_seconds["data_loader"] = 0.0
+    monkeypatch.setattr(fire_prediction, "registry", registry)
+    body = {"start_date": "2020-07-01", "end_date": "2020-07-05"}
+    response = TestClient(app).post("/api/v1/predict_fire_window", json=body)
+    assert response.status_code == 200
+    report = response.json()["reports"]["Logistic"]
+    # fire on the 3rd only; the model also flags the hot 4th and 5th
+    assert report["accuracy"] == pytest.approx(0.6)
+    assert loader.env_calls == 1  # one bulk fetch for the whole window
+
+    registry.fire_window_models = {}
+    assert TestClient(app).post("/api/v1/predict_fire_window", json=body).status_code == 503
+
+
+def test_lifespan_warms_shared_registry():
+    from app.main import app
+    from app.model_registry import registry
+    with TestClient(app) as client:
+        assert app.state.registry is registry
+        app.state.limiter.reset()
+        status = client.get("/api/v1/models/status").json()
+    assert "predictor" in status["warmup_seconds"]
+    assert "boundary" in status["loaded"]
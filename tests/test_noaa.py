@@ -0,0 +1,111 @@
+import asyncio
+from datetime import datetime
+
+import httpx
+import pandas as pd
+import pytest
+
+from app.data_processing.noaa import (
+    NoaaWeatherStore,
+    daily_frame,
+    date_windows,
+)
+from app.utils import run_sync
+
+BBOX = (-74.8, 39.4, -74.2, 40.2)
+
+
+class FakeCdo:
+    """CDO stand-in: two stations' TAVG per day, served in pages of ``page_size``."""
+
+    def __init__(self, page_size=3, fail_from=None):
+        self.page_size = page_size
+        self.fail_from = fail_from
+        self.requests = []
+
+    def __call__(self, request):
+        params = request.url.params
+        self.requests.append(dict(params))
+        if self.fail_from and params["startdate"] >= self.fail_from:
+            return httpx.Response(503)
+        days = pd.date_range(params["startdate"], params["enddate"], freq="D")
+        records = [{"date": f"{d:%Y-%m-%d}T00:00:00", "datatype": "TAVG", "station": s,
+                    "value": 20.0 + i}
+                   for d in days for i, s in enumerate(("A", "B"))]
+        offset = int(params["offset"])
+        page = records[offset - 1:offset - 1 + self.page_size]
+        return httpx.Response(200, json={
+            "metadata": {"resultset": {"offset": offset, "count": len(records),
+                                       "limit": self.page_size}},
+            "results": page
+        })
+
+
+@pytest.fixture
+def cdo(monkeypatch):
+    monkeypatch.setenv("NOAA_API_KEY", "dummy")
+    monkeypatch.setattr("app.data_processing.noaa.PAGE_LIMIT", 3)
+    fake = FakeCdo()
+    monkeypatch.setattr(NoaaWeatherStore, "transport", httpx.MockTransport(fake))
+    return fake
+
+
+def test_date_windows_split_gaps_and_long_runs():
+    days = pd.DatetimeIndex(list(pd.date_range("2020-01-01", "2020-01-10"))
+                            + [pd.Timestamp("2020-01-20")])
+    assert date_windows(days, 4) == [
+        (pd.Timestamp("2020-01-01"), pd.Timestamp("2020-01-04")),
+        (pd.Timestamp("2020-01-05"), pd.Timestamp("2020-01-08")),
+        (pd.Timestamp("2020-01-09"), pd.Timestamp("2020-01-10")),
+        (pd.Timestamp("2020-01-20"), pd.Timestamp("2020-01-20")),
+    ]
+
+
+def test_fetch_follows_pagination_across_windows(cdo, tmp_path):
+    store = NoaaWeatherStore(tmp_path, window_days=5)
+    records = store.fetch(BBOX, datetime(2020, 7, 1), datetime(2020, 7, 10))
+    assert len(records) == 20  # 10 days x 2 stations
+    windows = {(r["startdate"], r["enddate"]) for r in cdo.requests}
+    assert windows == {("2020-07-01", "2020-07-05"), ("2020-07-06", "2020-07-10")}
+    assert len(cdo.requests) == 8  # 10 records per window, pages of 3
+    daily = daily_frame(records)
+    assert list(daily["TAVG"].unique()) == [20.5]
+
+
+def test_overlapping_requests_fetch_only_missing_days(cdo, tmp_path):
+    store = NoaaWeatherStore(tmp_path, window_days=31)
+    store.fetch(BBOX, datetime(2020, 7, 1), datetime(2020, 7, 10))
+    cdo.requests.clear()
+    records = store.fetch(BBOX, datetime(2020, 7, 5), datetime(2020, 8, 3))
+    assert {(r["startdate"], r["enddate"]) for r in cdo.requests} == {("2020-07-11", "2020-08-03")}
+    assert records["date"].min() == pd.Timestamp("2020-07-05")
+    assert records["date"].max() == pd.Timestamp("2020-08-03")
+    assert len(list((tmp_path / NoaaWeatherStore.bbox_key(BBOX)).glob("*.parquet"))) == 2
+
+    cdo.requests.clear()
+    store.fetch(BBOX, datetime(2020, 7, 1), datetime(2020, 8, 3))
+    assert cdo.requests == []
+
+
+def test_failed_windows_are_retried_later(cdo, tmp_path):
+    cdo.fail_from = "2020-07-06"
+    store = NoaaWeatherStore(tmp_path, window_days=5)
+    records = store.fetch(BBOX, datetime(2020, 7, 1), datetime(2020, 7, 10))
+    assert records["date"].max() == pd.Timestamp("2020-07-05")
+    cdo.fail_from = None
+    cdo.requests.clear()
+    records = store.fetch(BBOX, datetime(2020, 7, 1), datetime(2020, 7, 10))
+    assert {r["startdate"] for r in cdo.requests} == {"2020-07-06"}
+    assert len(records) == 20
+
+
+def test_run_sync_refuses_a_running_event_loop():
+    async def value():
+        return 42
+
+    async def handler():
+        return run_sync(value())
+
+    assert run_sync(value()) == 42
+    with pytest.raises(RuntimeError):
+        asyncio.run(handler())
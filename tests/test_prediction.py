@@ -1,3 +1,6 @@
+import asyncio
+import time
+
 import pytest
 import numpy as np
 import pandas as pd
@@ -7,7 +10,6 @@ from unittest.mock import MagicMock
 from shapely.geometry import Point
 from app.prediction import WildfirePredictor
 from app.risk_category import RiskCategory
-import pytest
 
 @pytest.fixture
 def sample_data():
@@ -250,6 +252,36 @@ def test_analyze_area_professional(sample_data, tmp_path, mock_predictor):
     assert 'fuel_hazards' in result
     assert result['analysis_mode'] == 'professional'
 
+
+def test_professional_sources_load_concurrently_and_tolerate_timeouts(sample_data, mock_predictor):
+    """Slow sources overlap, and one that times out is reported instead of failing the analysis"""
+    def slow(value, delay=0.3):
+        def load(*args):
+            time.sleep(delay)
+            return value
+        return load
+
+    mock_predictor.data_loader.load_weather_data = slow(pd.DataFrame({'temperature': [25]}))
+    mock_predictor.data_loader.load_traffic_data = slow(pd.DataFrame({'congestion_risk': [0.2]}),
+                                                        delay=2)
+    mock_predictor.data_loader.load_buildings = slow(gpd.GeoDataFrame(geometry=[Point(0, 0)]))
+    mock_predictor.data_loader.load_camping_sites = slow(gpd.GeoDataFrame(geometry=[Point(0, 0)]))
+    mock_predictor.fuel_analyzer.analyze_fuel_hazards = MagicMock(
+        return_value={'recommendations': []})
+    mock_predictor.cv_analyzer.analyze_vegetation = MagicMock(return_value={'ndvi_mean': 0.6})
+
+    start = time.perf_counter()
+    result = asyncio.run(mock_predictor.analyze_area_async(
+        area_data=sample_data,
+        satellite_image=np.zeros((100, 100, 3)),
+        analysis_mode="professional",
+        source_timeouts={'traffic_data': 0.5}
+    ))
+    assert time.perf_counter() - start < 1.5
+    assert result['traffic_analysis'] is None
+    assert result['source_errors'] == {'traffic_data': 'timed out after 0.5s'}
+    mock_predictor.structure_analyzer.analyze_building_vulnerability.assert_called_once()
+
 def test_generate_recommendations(sample_data, mock_predictor):
     """Test recommendation generation"""
     
@@ -303,3 +335,20 @@ def test_model_save_load(sample_data, tmp_path, mock_predictor):
     
     mock_predictor.ml_model.save_model.assert_called_once_with(save_path)
     mock_predictor.ml_model.load_model.assert_called_once_with(save_path)
+
+
+def test_area_layers_come_from_the_data_loader(sample_data, mock_predictor):
+    """Weather means and the dominant land cover become the area's feature layers"""
+    mock_predictor.data_loader.load_weather_data = MagicMock(return_value=pd.DataFrame({
+        'TAVG': [30.0, 32.0], 'RHAV': [20.0, 30.0], 'AWND': [np.nan, np.nan]
+    }))
+    mock_predictor.data_loader.load_land_use_data = MagicMock(return_value=gpd.GeoDataFrame(
+        {'landcover': [42, 42, 71]}, geometry=[Point(0, 0)] * 3))
+    layers = asyncio.run(mock_predictor.area_layers(sample_data, pd.Timestamp('2024-07-01')))
+    assert layers == {'temperature': 31.0, 'humidity': 25.0, 'vegetation_type': 42}
+
+    mock_predictor.data_loader.load_land_use_data = MagicMock(side_effect=OSError("no land use"))
+    assert 'vegetation_type' not in asyncio.run(
+        mock_predictor.area_layers(sample_data, pd.Timestamp('2024-07-01')))
+    mock_predictor.data_loader = None
+    assert asyncio.run(mock_predictor.area_layers(sample_data, pd.Timestamp('2024-07-01'))) == {}
@@ -0,0 +1,179 @@
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.ml.bundle import ModelBundle
+from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
+from app.model_registry import registry
+from app.prediction import WildfirePredictor
+from app.risk_grid import (
+    RiskGrid,
+    build_cell_features,
+    clear_risk_grid_cache,
+    get_risk_grid,
+    grid_shape,
+    model_available,
+    score_risk_grid,
+)
+
+
+class StubModel:
+    """Scores cells by their scaled temperature and counts batched calls."""
+    is_fitted = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, features):
+        self.calls += 1
+        return pd.DataFrame({"risk_score": np.clip(features["temperature"].to_numpy() + 0.5, 0, 1)})
+
+
+@pytest.fixture
+def predictor(monkeypatch):
+    predictor = WildfirePredictor()
+    predictor.ml_model = StubModel()
+    clear_risk_grid_cache()
+    monkeypatch.setattr(registry, "predictor", predictor)
+    monkeypatch.setitem(registry.warmup_seconds, "predictor", 0.0)
+    yield predictor
+    clear_risk_grid_cache()
+
+
+def test_grid_shape_covers_bounds():
+    assert grid_shape(0.1) == (8, 6)
+    assert grid_shape(0.002) == (400, 300)
+    with pytest.raises(ValueError):
+        grid_shape(0)
+    with pytest.raises(ValueError):
+        grid_shape(0.0001)
+
+
+def test_build_cell_features_broadcasts_layers():
+    temperature = np.arange(6, dtype=float).reshape(2, 3)
+    features = build_cell_features((2, 3), {"temperature": temperature, "humidity": 20.0})
+    assert len(features) == 6
+    assert features["temperature"].tolist() == [0, 1, 2, 3, 4, 5]
+    assert (features["humidity"] == 20.0).all()
+    assert (features["vegetation_type"] == "pine_scrub_oak").all()
+
+
+def test_score_risk_grid_single_batched_call(predictor):
+    temperature = np.linspace(10, 30, 400 * 300)
+    grid = score_risk_grid(predictor, 0.002, pd.Timestamp("2025-06-01 12:34"),
+                           {"temperature": temperature})
+    assert predictor.ml_model.calls == 1
+    assert grid.shape == (400, 300)
+    assert grid.scores.dtype == np.float32
+    assert grid.valid_time == pd.Timestamp("2025-06-01 12:00")
+    # row-major layout: the last cell has the highest temperature
+    assert grid.scores[-1, -1] == pytest.approx(1.0)
+    assert grid.scores[0, 0] == pytest.approx(0.0)
+
+
+def test_get_risk_grid_caches_by_resolution_and_hour(predictor):
+    first = get_risk_grid(predictor, 0.05, pd.Timestamp("2025-06-01 12:05"))
+    same_hour = get_risk_grid(predictor, 0.05, pd.Timestamp("2025-06-01 12:55"))
+    assert same_hour is first
+    get_risk_grid(predictor, 0.05, pd.Timestamp("2025-06-01 13:00"))
+    get_risk_grid(predictor, 0.1, pd.Timestamp("2025-06-01 12:00"))
+    assert predictor.ml_model.calls == 3
+
+
+def test_risk_grid_window_and_top_cells():
+    scores = np.arange(12, dtype=np.float32).reshape(3, 4) / 12
+    grid = RiskGrid(scores, {"north": 40.0, "south": 39.7, "east": -74.4, "west": -74.8},
+                    0.1, pd.Timestamp("2025-06-01"))
+    assert grid.window(39.8, -74.7, 40.0, -74.5).shape == (2, 2)
+    assert grid.window(41.0, -74.7, 42.0, -74.6).size == 0
+    top = grid.top_cells(3)
+    assert top["riskScore"].tolist() == pytest.approx([11 / 12, 10 / 12, 9 / 12])
+    assert top.iloc[0]["lat"] == pytest.approx(39.75)
+    assert top.iloc[0]["lng"] == pytest.approx(-74.45)
+
+
+def test_get_risk_grid_caches_per_layers(predictor):
+    hour = pd.Timestamp("2025-06-01 12:00")
+    default = get_risk_grid(predictor, 0.1, hour)
+    hot = get_risk_grid(predictor, 0.1, hour, {"temperature": 30.0})
+    assert hot is not default and hot.run_id != default.run_id
+    assert hot.scores.mean() > default.scores.mean()
+    assert get_risk_grid(predictor, 0.1, hour, {"temperature": np.float64(30.0)}) is hot
+    assert predictor.ml_model.calls == 2
+
+
+def test_registry_reload_clears_cached_grids(predictor, monkeypatch):
+    hour = pd.Timestamp("2025-06-01 12:00")
+    first = get_risk_grid(predictor, 0.1, hour)
+    monkeypatch.setattr(registry, "_load", lambda name: None)
+    registry.reload("fire_window_models")  # e.g. after a fire-window job was promoted
+    assert get_risk_grid(predictor, 0.1, hour) is not first
+
+
+def test_risk_data_endpoint_serves_grid(predictor):
+    from api.main import app
+    client = TestClient(app)
+    response = client.get("/api/risk-data", params={"resolution": 0.002, "limit": 5})
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["data"]) == 5
+    assert data["grid"]["shape"] == [400, 300]
+    assert len(data["grid"]["riskScores"]) == 400
+    assert client.get("/api/risk-data", params={"resolution": -1}).status_code == 400
+
+
+def test_risk_data_endpoint_without_model(monkeypatch):
+    from api.main import app
+    monkeypatch.setattr(registry, "predictor", WildfirePredictor())
+    monkeypatch.setitem(registry.warmup_seconds, "predictor", 0.0)
+    response = TestClient(app).get("/api/risk-data")
+    assert response.status_code == 200
+    assert "grid" not in response.json()
+
+
+def test_risk_data_endpoint_scores_with_loaded_bundle(tmp_path, monkeypatch):
+    from api.main import app
+    rng = np.random.default_rng(0)
+    X = build_cell_features((60, 1), {"temperature": rng.uniform(10, 40, 60)})
+    y = (X["temperature"] > 25).astype(int).values
+    trained = EnsembleWildfireModel()
+    trained.fit_preprocessing(X)
+    for member in trained.models.values():
+        member.set_params(**{"iterations" if "catboost" in type(member).__module__
+                             else "n_estimators": 5})
+        member.fit(trained.preprocess(X), y)
+    ModelBundle(encoder=trained.encoder, members=trained.models).save(tmp_path / "risk_model")
+
+    predictor = WildfirePredictor(tmp_path / "risk_model")
+    assert model_available(predictor)
+    clear_risk_grid_cache()
+    monkeypatch.setattr(registry, "predictor", predictor)
+    monkeypatch.setitem(registry.warmup_seconds, "predictor", 0.0)
+    response = TestClient(app).get("/api/risk-data", params={"resolution": 0.1})
+    clear_risk_grid_cache()
+    assert response.status_code == 200
+    assert response.json()["grid"]["shape"] == [8, 6]
+    assert registry.status()["loaded"]["risk_model"]
+
+
+def test_model_available_without_predictor():
+    assert not model_available(None)
+    assert not model_available(WildfirePredictor())
+
+
+def test_predict_endpoint_uses_model_scores(predictor):
+    from app.main import app
+    app.state.limiter.reset()
+    area = {"area_geometry": {"type": "Polygon", "coordinates": [[
+        [-74.6, 39.7], [-74.6, 39.8], [-74.5, 39.8], [-74.5, 39.7], [-74.6, 39.7]
+    ]]}}
+    response = TestClient(app).post("/api/v1/predict", json=area)
+    assert response.status_code == 200
+    data = response.json()
+    # Default conditions are 20C, which the stub scores as 0.5
+    assert data["risk_factors"]["model"] == pytest.approx(0.5)
+    assert data["risk_score"] == pytest.approx(0.5)
+    # The predictor's area analysis contributes its report and recommendations
+    assert data["report"]
+    assert len(data["mitigation_recommendations"]) > 1
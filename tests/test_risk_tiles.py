@@ -0,0 +1,161 @@
+import struct
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+import app.api.risk_tiles as risk_tiles_api
+from app.model_registry import registry
+from app.prediction import WildfirePredictor
+from app.risk_grid import RiskGrid, clear_risk_grid_cache, risk_run_id
+from app.risk_tiles import TILE_SIZE, TileCache, encode_png, render_tile, tile_pixel_centers
+
+
+def decode_png(data):
+    """Minimal decoder for the unfiltered RGBA PNGs written by encode_png."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, idat = 8, b""
+    while pos < len(data):
+        length, tag = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        if tag == b"IHDR":
+            width, height = struct.unpack(">II", body[:8])
+        elif tag == b"IDAT":
+            idat += body
+        pos += 12 + length
+    raw = np.frombuffer(zlib.decompress(idat), dtype=np.uint8).reshape(height, width * 4 + 1)
+    assert (raw[:, 0] == 0).all()
+    return raw[:, 1:].reshape(height, width, 4)
+
+
+def make_grid(run_id="run1"):
+    scores = np.linspace(0, 1, 80 * 60, dtype=np.float32).reshape(80, 60)
+    bounds = {"north": 40.2, "south": 39.4, "east": -74.2, "west": -74.8}
+    return RiskGrid(scores, bounds, 0.01, pd.Timestamp("2025-06-01 12:00"), run_id=run_id)
+
+
+def test_encode_png_round_trip():
+    rgba = np.random.default_rng(0).integers(0, 255, (3, 5, 4), dtype=np.uint8)
+    np.testing.assert_array_equal(decode_png(encode_png(rgba)), rgba)
+
+
+def test_tile_pixel_centers():
+    lat, lng = tile_pixel_centers(0, 0, 0)
+    assert lng[0] == pytest.approx(-180 + 360 / 512)
+    assert lat[0] > 84.9 and lat[-1] < -84.9
+    assert lat[127] > 0 > lat[128]
+
+
+def test_render_tile_covers_grid_only():
+    grid = make_grid()
+    # zoom 8 tile containing the Pine Barrens (about 39.8N, 74.5W)
+    image = decode_png(render_tile(grid, 8, 75, 97))
+    assert image.shape == (TILE_SIZE, TILE_SIZE, 4)
+    opaque = image[..., 3] > 0
+    assert opaque.any() and not opaque.all()
+    # a tile on the other side of the world is fully transparent
+    assert not decode_png(render_tile(grid, 8, 0, 0))[..., 3].any()
+
+
+def test_render_tile_colors_follow_risk():
+    grid = make_grid()
+    grid.scores[:] = 0.0
+    grid.scores[:40] = 1.0  # northern half is high risk
+    image = decode_png(render_tile(grid, 10, 300, 388))
+    rows = np.flatnonzero(image[..., 3].any(axis=1))
+    north, south = image[rows[0]], image[rows[-1]]
+    assert north[north[:, 3] > 0][0, :3].tolist() == [178, 34, 34]
+    assert south[south[:, 3] > 0][0, :3].tolist() == [34, 139, 34]
+
+
+def test_tile_cache_memory_and_disk(tmp_path):
+    noon = risk_run_id("v1", 0.01, pd.Timestamp("2025-06-01 12:00"))
+    cache = TileCache(tmp_path, max_memory_tiles=2)
+    cache.ensure_run(noon)
+    assert cache.get(1, 0, 0) is None
+    for x in range(3):
+        cache.put(1, x, 0, b"tile%d" % x)
+    assert len(cache._memory) == 2
+    # evicted from memory but still on disk
+    assert cache.get(1, 0, 0) == b"tile0"
+    assert (tmp_path / noon / "1" / "0" / "0.png").exists()
+
+    # Another process's run for the same hour (e.g. a newer model) is left alone
+    sibling = risk_run_id("v2", 0.01, pd.Timestamp("2025-06-01 12:30"))
+    cache.ensure_run(sibling)
+    assert cache.get(1, 0, 0) is None
+    assert (tmp_path / noon).exists()
+
+    # Switching back finds the run's tiles on disk again
+    cache.ensure_run(noon)
+    assert cache.get(1, 0, 0) == b"tile0"
+
+    cache.ensure_run(risk_run_id("v1", 0.01, pd.Timestamp("2025-06-01 13:00")))
+    assert not (tmp_path / noon).exists() and not (tmp_path / sibling).exists()
+
+
+def test_run_id_is_deterministic():
+    hour = pd.Timestamp("2025-06-01 12:00")
+    assert risk_run_id("v1", 0.01, hour) == risk_run_id("v1", 0.01, hour + pd.Timedelta(minutes=59))
+    assert risk_run_id("v1", 0.01, hour).startswith("2025060112-")
+    assert risk_run_id("v1", 0.01, hour) != risk_run_id("v2", 0.01, hour)
+    assert risk_run_id("v1", 0.01, hour) != risk_run_id("v1", 0.02, hour)
+    assert make_grid("").run_id == risk_run_id(None, 0.01, hour)
+
+
+def test_tile_cache_disk_eviction(tmp_path):
+    cache = TileCache(tmp_path, max_memory_tiles=1, max_disk_bytes=250)
+    cache.ensure_run("a")
+    for x in range(5):
+        cache.put(2, x, 0, bytes(100))
+    files = list((tmp_path / "a").rglob("*.png"))
+    assert sum(f.stat().st_size for f in files) <= 250
+    assert (tmp_path / "a" / "2" / "4" / "0.png").exists()
+
+
+@pytest.fixture
+def tile_client(tmp_path, monkeypatch):
+    from app.main import app
+    predictor = WildfirePredictor()
+    predictor.ml_model = type("Model", (), {"is_fitted": True})()
+    monkeypatch.setattr(registry, "predictor", predictor)
+    monkeypatch.setitem(registry.warmup_seconds, "predictor", 0.0)
+    monkeypatch.setattr(risk_tiles_api, "tile_cache", TileCache(tmp_path))
+    calls = []
+
+    def fake_get_risk_grid(_predictor):
+        calls.append(1)
+        return grids[-1]
+
+    grids = [make_grid("run1")]
+    monkeypatch.setattr(risk_tiles_api, "get_risk_grid", fake_get_risk_grid)
+    yield TestClient(app), grids
+    clear_risk_grid_cache()
+
+
+def test_risk_tile_endpoint_caches_until_new_run(tile_client, monkeypatch):
+    client, grids = tile_client
+    cache = risk_tiles_api.tile_cache
+    response = client.get("/tiles/risk/8/75/97.png")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert client.get("/tiles/risk/8/75/97.png").content == response.content
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    grids.append(make_grid("run2"))
+    grids[-1].scores[:] = 1.0
+    fresh = client.get("/tiles/risk/8/75/97.png")
+    assert fresh.content != response.content
+    assert cache.run_id == "run2"
+    assert cache.misses == 2
+
+
+def test_risk_tile_endpoint_errors(tile_client, monkeypatch):
+    client, _ = tile_client
+    assert client.get("/tiles/risk/2/4/0.png").status_code == 404
+    assert client.get("/tiles/risk/30/0/0.png").status_code == 404
+    monkeypatch.setattr(registry, "predictor", WildfirePredictor())
+    monkeypatch.setitem(registry.warmup_seconds, "predictor", 0.0)
+    assert client.get("/tiles/risk/1/0/0.png").status_code == 503
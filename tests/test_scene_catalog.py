@@ -0,0 +1,108 @@
+import os
+import time
+from datetime import date, datetime
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from app.data_processing.data_loader import DataLoader
+from app.data_processing.imagery import is_cog
+from app.data_processing.scene_catalog import INSERT_SCENE, SceneCatalog
+
+
+def write_scene(path, west, north, value, size=100, res=0.01, tags=None):
+    """Single-band EPSG:4326 scene of ``size`` pixels filled with ``value``."""
+    with rasterio.open(path, "w", driver="GTiff", count=1, height=size, width=size, dtype="uint8",
+                       crs="EPSG:4326", transform=from_origin(west, north, res, res)) as dst:
+        dst.write(np.full((1, size, size), value, dtype=np.uint8))
+        if tags:
+            dst.update_tags(**tags)
+    return path
+
+
+def test_find_orders_by_date_and_filters_window(tmp_path):
+    write_scene(tmp_path / "scene_20240601.tif", -75.0, 40.0, 1)
+    write_scene(tmp_path / "scene_20240610.tif", -75.0, 40.0, 2)
+    write_scene(tmp_path / "other.tif", -75.0, 40.0, 3, tags={"ACQUISITION_DATE": "2024-06-08"})
+    write_scene(tmp_path / "far_20240609.tif", 10.0, 50.0, 4)
+    catalog = SceneCatalog(tmp_path / "scenes.sqlite")
+    assert catalog.scan(tmp_path) == 4
+    # Scanned scenes are rewritten as COGs, keeping the tags their dates come from
+    assert is_cog(tmp_path / "other.tif")
+
+    scenes = catalog.find((-74.6, 39.5, -74.4, 39.7), date(2024, 6, 9))
+    assert [s.path.name for s in scenes] == ["other.tif", "scene_20240610.tif",
+                                             "scene_20240601.tif"]
+    nearby = catalog.find((-74.6, 39.5, -74.4, 39.7), date(2024, 6, 9), max_days=3)
+    assert [s.path.name for s in nearby] == ["other.tif", "scene_20240610.tif"]
+    assert catalog.best((-80.0, 39.5, -74.4, 39.7), date(2024, 6, 9)) is None
+
+
+def test_scan_reindexes_changed_files_and_drops_removed_ones(tmp_path):
+    path = write_scene(tmp_path / "scene_20240601.tif", -75.0, 40.0, 1)
+    catalog = SceneCatalog(tmp_path / "scenes.sqlite")
+    catalog.scan(tmp_path)
+    assert catalog.scan(tmp_path) == 0
+
+    write_scene(path, -70.0, 45.0, 1)
+    os.utime(path, ns=(0, 0))
+    assert catalog.scan(tmp_path) == 1
+    assert catalog.best((-69.9, 44.5, -69.5, 44.9), date(2024, 6, 1)) is not None
+
+    path.unlink()
+    catalog.scan(tmp_path)
+    assert catalog.find((-180, -90, 180, 90), date(2024, 6, 1)) == []
+
+
+def test_refresh_rescans_at_most_once_per_interval(tmp_path, monkeypatch):
+    catalog = SceneCatalog(tmp_path / "scenes.sqlite")
+    scans = []
+    monkeypatch.setattr(catalog, "scan", lambda directory, pattern: scans.append(directory) or 0)
+    catalog.refresh(tmp_path, max_age=60)
+    catalog.refresh(tmp_path, max_age=60)
+    assert len(scans) == 1
+    catalog.refresh(tmp_path, max_age=0)
+    assert len(scans) == 2
+
+
+def test_lookup_is_fast_with_many_scenes(tmp_path):
+    catalog = SceneCatalog(tmp_path / "scenes.sqlite")
+    source = write_scene(tmp_path / "scene_20240601.tif", -75.0, 40.0, 1, size=10)
+    scene = catalog.add(source)
+    with catalog._connect() as conn:
+        for i in range(5000):
+            x, y = -120 + (i % 100) * 0.5, 30 + (i // 100) * 0.3
+            # A year earlier than the query, so fillers over the bbox never tie with the scene
+            cur = conn.execute(INSERT_SCENE, (f"/scenes/{i}.tif", f"2023-{1 + i % 12:02d}-01",
+                                              "EPSG:4326", 1, 0.01, x, y, x + 1, y + 1, 0, 0))
+            conn.execute("INSERT INTO scene_footprints VALUES (?, ?, ?, ?, ?)",
+                         (cur.lastrowid, x, x + 1, y, y + 1))
+    start = time.perf_counter()
+    best = catalog.best((-74.95, 39.95, -74.94, 39.96), date(2024, 6, 1))
+    assert time.perf_counter() - start < 0.05
+    assert best.path == scene.path
+    assert len(catalog.find((-74.95, 39.95, -74.94, 39.96), date(2024, 6, 1))) > 1
+
+
+def test_loader_mosaics_scenes_for_any_bbox(tmp_path, monkeypatch):
+    loader = DataLoader(tmp_path)
+    write_scene(loader.raw_dir / "west_20240601.tif", -75.0, 40.0, 10)
+    write_scene(loader.raw_dir / "east_20240603.tif", -74.0, 40.0, 20)
+
+    def no_download(self, bbox, when):
+        raise AssertionError("catalogued scenes should be used")
+
+    monkeypatch.setattr(DataLoader, "_download_satellite_imagery", no_download)
+
+    # Straddles the two scenes: left half from the west scene, right half from the east one
+    data = loader.load_satellite_imagery((-74.2, 39.5, -73.8, 39.6), datetime(2024, 6, 2))
+    assert data.shape == (1, 10, 40)
+    assert (data[0, :, :20] == 10).all() and (data[0, :, 20:] == 20).all()
+
+    inside = loader.load_satellite_imagery((-74.5, 39.5, -74.4, 39.6), datetime(2024, 6, 2))
+    assert inside.shape == (1, 10, 10) and (inside == 10).all()
+
+    # The second lookup reused the first scan of the imagery directory
+    monkeypatch.setattr(loader.scene_catalog, "scan", no_download)
+    loader.load_satellite_imagery((-74.5, 39.5, -74.4, 39.6), datetime(2024, 6, 2))
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.ml.ensemble_wildfire_model import EnsembleWildfireModel
+from app.ml.voting import combine, fit_weights, positive_column
+
+
+class FixedMember:
+    """Member returning a fixed probability per row, recording the rows it scored."""
+
+    classes_ = np.array([0, 1])
+
+    def __init__(self, probability):
+        self.probability = np.asarray(probability, dtype=float)
+        self.calls = []
+
+    def predict_proba(self, X):
+        self.calls.append(len(X))
+        p = self.probability[X["row"].astype(int).to_numpy()]
+        return np.column_stack([1 - p, p])
+
+
+def fitted_with(members, weights=None):
+    X = pd.DataFrame({"row": np.arange(4.0)})
+    model = EnsembleWildfireModel(n_jobs=3)
+    model.fit_preprocessing(X)
+    # Keep the row number readable after standardisation
+    model.encoder.mean[:] = 0
+    model.encoder.scale[:] = 1
+    model.models = members
+    model.member_weights = weights
+    return model, X
+
+
+def test_combine_weighs_members_and_skips_missing_cells():
+    probabilities = np.array([[0.2, 0.4, 0.6], [0.9, np.nan, np.nan]], dtype=np.float32)
+    np.testing.assert_allclose(combine(probabilities), [0.4, 0.9], rtol=1e-6)
+    np.testing.assert_allclose(combine(probabilities, np.array([2.0, 1.0, 1.0])), [0.35, 0.9],
+                               rtol=1e-6)
+    # Only zero-weighted members scored the second row: plain mean instead
+    np.testing.assert_allclose(combine(probabilities, np.array([0.0, 1.0, 1.0])), [0.5, 0.9],
+                               rtol=1e-6)
+
+
+def test_fit_weights_favours_the_informative_member():
+    rng = np.random.default_rng(0)
+    y = rng.integers(0, 2, 500)
+    informative = np.clip(y + rng.normal(0, 0.1, 500), 0, 1)
+    noise = rng.uniform(0, 1, 500)
+    weights = fit_weights(np.column_stack([noise, informative]), y)
+    assert weights.sum() == pytest.approx(1.0)
+    assert weights[1] > 0.8
+
+
+def test_positive_column_follows_classes():
+    member = FixedMember([0.0])
+    assert positive_column(member) == 1
+    member.classes_ = np.array([1, 0])
+    assert positive_column(member) == 0
+
+
+def test_predict_proba_soft_votes_with_learned_weights():
+    members = {"rf": FixedMember([0.1, 0.9, 0.5, 0.2]),
+               "lgbm": FixedMember([0.3, 0.7, 0.5, 0.4]),
+               "catboost": FixedMember([0.2, 0.8, 0.2, 0.9])}
+    model, X = fitted_with(members, {"rf": 0.5, "lgbm": 0.25, "catboost": 0.25})
+    proba = model.predict_proba(X)
+    assert proba.dtype == np.float32
+    np.testing.assert_allclose(proba, [0.175, 0.825, 0.425, 0.425], rtol=1e-6)
+    result = model.predict(X)
+    np.testing.assert_allclose(result["risk_score"], proba)
+    assert list(result["risk_category"]) == ["Very Low", "Very High", "Moderate", "Moderate"]
+
+
+def test_agreeing_members_stop_early():
+    members = {"rf": FixedMember([0.10, 0.90, 0.50, 0.20]),
+               "lgbm": FixedMember([0.12, 0.88, 0.10, 0.60]),
+               "catboost": FixedMember([0.0, 0.0, 0.30, 0.40])}
+    model, X = fitted_with(members)
+    proba = model.predict_proba(X, agreement=0.05)
+    # Rows 0 and 1 are settled by the first two members; only rows 2 and 3 reach the third
+    assert members["catboost"].calls == [2]
+    np.testing.assert_allclose(proba, [0.11, 0.89, 0.3, 0.4], rtol=1e-5)